@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+SolSolve Detector Auto-Labeling
+
+Bootstraps YOLO label files with a trained detector so that labeling
+becomes reviewing:
+1. Finds images with no label file (labeled images are never touched)
+2. Runs detector.tflite sharded across a process pool, or best.pt
+   through ultralytics in batches
+3. Writes a draft .txt per image as its shard finishes; images with no
+   detections get none and stay unlabeled
+4. Tags images with low-confidence (or no) detections for manual review,
+   listed in needs_review.txt next to the labels directory (or in
+   --review-dir), rewritten each run
+
+Every draft is recorded in .auto_labels.jsonl in the labels directory,
+so drafts can be told apart from hand-made labels later.
+
+Usage:
+    python auto_label.py --data-dir training_data --models-dir trained_models
+    python auto_label.py --image-dir raw_images --model models/detector/weights/best.pt --review-threshold 0.5
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from dataset_utils import find_images, place_file, LINK_MODES
+
+MANIFEST_NAME = ".auto_labels.jsonl"
+REVIEW_NAME = "needs_review.txt"
+DETECTOR_LABELS = ["card_face_up", "card_back", "pile_slot_tableau", "pile_slot_foundation"]
+DEFAULT_SHARD_SIZE = 64
+
+_WORKER = {}
+
+
+def label_dir_for(image_dir):
+    """YOLO convention: .../images/<split> → .../labels/<split>; else a sibling detection_labels/"""
+    image_dir = Path(image_dir)
+    parts = image_dir.parts
+    if "images" in parts:
+        i = len(parts) - 1 - parts[::-1].index("images")
+        return Path(*parts[:i], "labels", *parts[i + 1:])
+    return image_dir.parent / "detection_labels"
+
+
+def pending_images(image_dir, labels_dir):
+    """(image, label path) pairs for images without a label file"""
+    return [(img, labels_dir / f"{img.stem}.txt") for img in find_images(image_dir)
+            if not (labels_dir / f"{img.stem}.txt").exists()]
+
+
+def read_reduced(path, input_size):
+    """BGR image decoded at the smallest power-of-two scale still >= input_size"""
+    import cv2
+    from PIL import Image
+
+    path = str(path)
+    try:
+        with Image.open(path) as header:
+            max_dim = max(header.size)
+    except OSError:
+        return None
+    for factor, flag in ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4),
+                         (2, cv2.IMREAD_REDUCED_COLOR_2)):
+        if max_dim // factor >= input_size:
+            return cv2.imread(path, flag)
+    return cv2.imread(path)
+
+
+def format_labels(xywhn, class_ids):
+    """YOLO label lines for normalized xc, yc, w, h boxes"""
+    return "".join(f"{int(c)} {x:.6f} {y:.6f} {w:.6f} {h:.6f}\n"
+                   for c, (x, y, w, h) in zip(class_ids, np.asarray(xywhn, dtype=np.float64)))
+
+
+def write_label(label_path, text):
+    """Write atomically, so an interrupted run never leaves a half label that later runs would skip"""
+    tmp_path = label_path.with_suffix(".tmp")
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+    os.replace(tmp_path, label_path)
+
+
+def _record(image_path, label_path, scores, class_ids, review_threshold, elapsed_ms):
+    min_score = float(scores.min()) if len(scores) else None
+    review = review_threshold is not None and (min_score is None or min_score < review_threshold)
+    return {
+        "image": str(image_path),
+        "label": str(label_path),
+        "detections": int(len(scores)),
+        "per_class": np.bincount(np.asarray(class_ids, dtype=np.int64), minlength=len(DETECTOR_LABELS)).tolist(),
+        "min_score": round(min_score, 4) if min_score is not None else None,
+        "review": review,
+        "ms": round(elapsed_ms, 2),
+    }
+
+
+def _init_worker(model_path, input_size, confidence, nms_iou, threads):
+    """Load this worker's interpreter once"""
+    import cv2
+    from inference_engine import YoloDetector
+
+    _WORKER["detector"] = YoloDetector(model_path, input_size, confidence, nms_iou, threads)
+    _WORKER["input_size"] = input_size
+    cv2.setNumThreads(1)
+
+
+def _label_shard(args):
+    """Detect and write draft labels for a shard of (image, label) paths"""
+    jobs, review_threshold = args
+    detector = _WORKER["detector"]
+    records = []
+    for image_path, label_path in jobs:
+        image = read_reduced(image_path, _WORKER["input_size"])
+        if image is None:
+            records.append({"image": str(image_path), "error": "unreadable"})
+            continue
+        h, w = image.shape[:2]
+        start = time.perf_counter()
+        boxes, scores, class_ids = detector.detect(image)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        xywhn = np.stack([(boxes[:, 0] + boxes[:, 2]) / 2 / w, (boxes[:, 1] + boxes[:, 3]) / 2 / h,
+                          (boxes[:, 2] - boxes[:, 0]) / w, (boxes[:, 3] - boxes[:, 1]) / h], axis=1)
+        if len(scores):
+            write_label(Path(label_path), format_labels(xywhn, class_ids))
+        records.append(_record(image_path, label_path, scores, class_ids, review_threshold, elapsed_ms))
+    return records
+
+
+def _label_tflite(jobs, model_path, input_size, confidence, nms_iou, review_threshold,
+                  workers, threads, shard_size):
+    shards = [[(str(i), str(l)) for i, l in jobs[k:k + shard_size]] for k in range(0, len(jobs), shard_size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(str(model_path), input_size, confidence, nms_iou, threads)) as pool:
+        futures = [pool.submit(_label_shard, (shard, review_threshold)) for shard in shards]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def _label_ultralytics(jobs, model_path, input_size, confidence, nms_iou, review_threshold, batch_size):
+    from ultralytics import YOLO
+
+    model = YOLO(str(model_path))
+    # ultralytics batches on its own device and threads; chunks keep memory flat
+    for k in range(0, len(jobs), batch_size * 8):
+        chunk = jobs[k:k + batch_size * 8]
+        start = time.perf_counter()
+        results = model.predict([str(i) for i, _ in chunk], imgsz=input_size, conf=confidence, iou=nms_iou,
+                                 batch=batch_size, stream=True, verbose=False)
+        for (image_path, label_path), result in zip(chunk, results):
+            boxes = result.boxes
+            class_ids = boxes.cls.cpu().numpy().astype(np.int64)
+            scores = boxes.conf.cpu().numpy()
+            if len(scores):
+                write_label(Path(label_path), format_labels(boxes.xywhn.cpu().numpy(), class_ids))
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            yield _record(image_path, label_path, scores, class_ids, review_threshold, elapsed_ms)
+
+
+def auto_label(image_dirs, model_path, input_size=416, confidence=0.35, nms_iou=0.45,
+               review_threshold=None, workers=None, threads=1, shard_size=DEFAULT_SHARD_SIZE,
+               batch_size=32, labels_dirs=None, review_dir=None, link_mode="auto"):
+    """Draft labels for every unlabeled image in image_dirs. Returns the records"""
+    model_path = Path(model_path)
+    labels_dirs = labels_dirs or [label_dir_for(d) for d in image_dirs]
+
+    jobs = []
+    for image_dir, labels_dir in zip(image_dirs, labels_dirs):
+        labels_dir = Path(labels_dir)
+        labels_dir.mkdir(parents=True, exist_ok=True)
+        total = len(find_images(image_dir))
+        pending = pending_images(image_dir, labels_dir)
+        print(f"🔍 {image_dir}: {len(pending)} unlabeled of {total} images → {labels_dir}")
+        jobs += pending
+    if not jobs:
+        print("✓ Nothing to label")
+        return []
+
+    workers = workers or os.cpu_count() or 1
+    if model_path.suffix == ".pt":
+        print(f"🚀 Labeling {len(jobs)} images with {model_path.name} (batch {batch_size})...")
+        stream = _label_ultralytics(jobs, model_path, input_size, confidence, nms_iou, review_threshold, batch_size)
+    else:
+        print(f"🚀 Labeling {len(jobs)} images with {model_path.name} on {workers} workers...")
+        stream = _label_tflite(jobs, model_path, input_size, confidence, nms_iou, review_threshold,
+                               workers, threads, shard_size)
+
+    records = []
+    manifests = {}
+    start = time.perf_counter()
+    next_report = 500
+    try:
+        for record in stream:
+            records.append(record)
+            if "error" in record:
+                continue
+            manifest_dir = Path(record["label"]).parent
+            if manifest_dir not in manifests:
+                manifests[manifest_dir] = open(manifest_dir / MANIFEST_NAME, 'a')
+            manifests[manifest_dir].write(json.dumps(record) + "\n")
+            if len(records) >= next_report:
+                elapsed = time.perf_counter() - start
+                print(f"   {len(records)}/{len(jobs)} labeled ({len(records) / elapsed:.1f} images/s)")
+                next_report += 500
+    finally:
+        for f in manifests.values():
+            f.close()
+    elapsed = time.perf_counter() - start
+
+    labeled = [r for r in records if "error" not in r]
+    review = [r for r in labeled if r["review"]]
+    detections = sum(r["detections"] for r in labeled)
+    empty = sum(r["detections"] == 0 for r in labeled)
+    print(f"✓ {len(labeled) - empty} draft labels, {detections} boxes in {elapsed:.1f}s "
+          f"({len(labeled) / max(elapsed, 1e-9):.1f} images/s)")
+    if empty:
+        print(f"   {empty} images with no detections left unlabeled")
+    if len(labeled) < len(records):
+        print(f"⚠️  {len(records) - len(labeled)} unreadable images skipped")
+    if labeled:
+        per_class = np.sum([r["per_class"] for r in labeled], axis=0)
+        print("   " + ", ".join(f"{name}: {n}" for name, n in zip(DETECTOR_LABELS, per_class)))
+
+    if review_threshold is not None:
+        # Outside the label split directories, so it is never taken for a label file
+        review_path = Path(review_dir or Path(labels_dirs[0]).parent) / REVIEW_NAME
+        review_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(review_path, 'w') as f:
+            for r in review:
+                f.write(f"{r['image']}\t{r['min_score']}\n")
+        print(f"⚠️  {len(review)} images need review (a box below {review_threshold} or no boxes); "
+              f"listed in {review_path}")
+        if review_dir and review:
+            review_dir = Path(review_dir)
+            (review_dir / "images").mkdir(parents=True, exist_ok=True)
+            (review_dir / "labels").mkdir(parents=True, exist_ok=True)
+            for r in review:
+                image, label = Path(r["image"]), Path(r["label"])
+                place_file(image, review_dir / "images" / image.name, link_mode)
+                if label.exists():
+                    place_file(label, review_dir / "labels" / label.name, "copy")
+            print(f"✓ Review set placed in {review_dir}")
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SolSolve detector auto-labeling")
+    parser.add_argument("--data-dir", type=str, default=None,
+                        help="Training data root: labels detection_data/images/{train,val}")
+    parser.add_argument("--image-dir", type=str, action="append", default=[],
+                        help="Image directory to label (repeatable)")
+    parser.add_argument("--labels-dir", type=str, default=None,
+                        help="Label directory for a single --image-dir (default: images/→labels/, else ../detection_labels)")
+    parser.add_argument("--models-dir", type=str, default="trained_models",
+                        help="Folder with config.json and detector.tflite")
+    parser.add_argument("--model", type=str, default=None, help="detector .tflite or best.pt (overrides --models-dir)")
+    parser.add_argument("--input-size", type=int, default=None, help="Detector input size (default: from config.json)")
+    parser.add_argument("--confidence", type=float, default=None,
+                        help="Minimum score for a drafted box (default: config confidenceThreshold)")
+    parser.add_argument("--nms-iou", type=float, default=None, help="NMS IoU (default: config nmsIoU)")
+    parser.add_argument("--review-threshold", type=float, default=None,
+                        help="Tag images with any box below this score (or none) for review")
+    parser.add_argument("--review-dir", type=str, default=None, help="Also place tagged images and drafts here")
+    parser.add_argument("--link-mode", choices=LINK_MODES, default="auto", help="How to place review images")
+    parser.add_argument("--workers", type=int, default=None, help="Processes for .tflite (default: all cores)")
+    parser.add_argument("--threads", type=int, default=1, help="Interpreter threads per worker")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE, help="Images per worker task")
+    parser.add_argument("--batch-size", type=int, default=32, help="Batch size for best.pt")
+
+    args = parser.parse_args()
+
+    image_dirs = [Path(d) for d in args.image_dir]
+    if args.data_dir:
+        images_root = Path(args.data_dir) / "detection_data" / "images"
+        image_dirs += [images_root / split for split in ("train", "val") if (images_root / split).is_dir()]
+    if not image_dirs:
+        parser.error("give --data-dir or --image-dir")
+    if args.labels_dir and len(image_dirs) != 1:
+        parser.error("--labels-dir needs exactly one image directory")
+
+    config = {}
+    config_path = Path(args.models_dir) / "config.json"
+    if config_path.exists():
+        with open(config_path) as f:
+            config = json.load(f).get("detector", {})
+    model_path = Path(args.model) if args.model else Path(args.models_dir) / config.get("file", "detector.tflite")
+    if not model_path.exists():
+        print(f"❌ Detector not found: {model_path}")
+        sys.exit(1)
+
+    auto_label(
+        image_dirs, model_path,
+        input_size=args.input_size or int(config.get("inputSize", 416)),
+        confidence=args.confidence if args.confidence is not None else float(config.get("confidenceThreshold", 0.35)),
+        nms_iou=args.nms_iou if args.nms_iou is not None else float(config.get("nmsIoU", 0.45)),
+        review_threshold=args.review_threshold,
+        workers=args.workers,
+        threads=args.threads,
+        shard_size=args.shard_size,
+        batch_size=args.batch_size,
+        labels_dirs=[Path(args.labels_dir)] if args.labels_dir else None,
+        review_dir=args.review_dir,
+        link_mode=args.link_mode,
+    )
+
+
+if __name__ == "__main__":
+    main()
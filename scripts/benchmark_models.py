@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+SolSolve TFLite Benchmark Suite
+
+Measures every model listed in config.json on this machine:
+1. Sweeps interpreter threads, XNNPACK on/off and classifier batch sizes
+2. Reports warm-up time, p50/p90/p99 latency, model size and peak RSS
+3. Times the snapshot pipeline: detector + decode + 30 corner crops
+   through the classifiers, with an optional millisecond budget
+
+Each configuration runs in a fresh process so peak RSS and warm-up are
+not skewed by earlier runs. Results are written as sorted JSON, so two
+runs (e.g. before and after a model change) can be diffed directly or
+with --compare.
+
+Usage:
+    python benchmark_models.py --models-dir trained_models
+    python benchmark_models.py --models-dir trained_models --threads 1 4 --budget-ms 100
+    python benchmark_models.py --models-dir trained_models --compare old_benchmark.json
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import resource
+import multiprocessing
+from pathlib import Path
+
+import numpy as np
+
+CLASSIFIERS = ["rank", "suit", "card52"]
+BATCH_SIZES = [1, 8, 32]
+PIPELINE_CROPS = 30
+
+
+def _peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _percentiles(times):
+    return {f"p{q}_ms": round(float(np.percentile(times, q)), 3) for q in (50, 90, 99)}
+
+
+def _measure_model(job):
+    """Time one model configuration. Runs in its own process"""
+    from inference_engine import _interpreter_module, load_interpreter, quantize_input
+
+    _interpreter_module()
+    baseline_rss = _peak_rss_mb()
+    rng = np.random.default_rng(0)
+
+    start = time.perf_counter()
+    interpreter = load_interpreter(job["path"], job["threads"], job["xnnpack"])
+    detail = interpreter.get_input_details()[0]
+    shape = [job["batch"]] + list(detail["shape"][1:])
+    if int(detail["shape"][0]) != job["batch"]:
+        interpreter.resize_tensor_input(detail["index"], shape)
+        interpreter.allocate_tensors()
+        detail = interpreter.get_input_details()[0]
+    output_index = interpreter.get_output_details()[0]["index"]
+    x = quantize_input(rng.random(shape, dtype=np.float32), detail)
+    interpreter.set_tensor(detail["index"], x)
+    interpreter.invoke()
+    warmup_ms = (time.perf_counter() - start) * 1000
+
+    for _ in range(job["warmup"]):
+        interpreter.set_tensor(detail["index"], x)
+        interpreter.invoke()
+
+    times = []
+    for _ in range(job["runs"]):
+        start = time.perf_counter()
+        interpreter.set_tensor(detail["index"], x)
+        interpreter.invoke()
+        interpreter.get_tensor(output_index)
+        times.append((time.perf_counter() - start) * 1000)
+
+    peak_rss = _peak_rss_mb()
+    return {
+        "threads": job["threads"],
+        "xnnpack": job["xnnpack"],
+        "batch": job["batch"],
+        "warmup_ms": round(warmup_ms, 2),
+        **_percentiles(times),
+        "per_item_p50_ms": round(float(np.percentile(times, 50)) / job["batch"], 3),
+        "peak_rss_mb": round(peak_rss, 1),
+        "model_rss_mb": round(peak_rss - baseline_rss, 1),
+    }
+
+
+def _measure_pipeline(job):
+    """Time detector + decode + corner crops + classifiers for one snapshot"""
+    from inference_engine import SolSolveInference
+    from corner_crops import corner_rois, extract_crops
+
+    rng = np.random.default_rng(0)
+    engine = SolSolveInference(job["models_dir"], job["threads"])
+    image = rng.integers(0, 255, (720, 1280, 3), dtype=np.uint8)
+
+    # A fanned-out tableau's worth of face-up cards (normalized xywh)
+    cols = np.arange(PIPELINE_CROPS) % 7
+    rows = np.arange(PIPELINE_CROPS) // 7
+    boxes = np.stack([0.08 + cols * 0.13, 0.3 + rows * 0.08,
+                      np.full(PIPELINE_CROPS, 0.1), np.full(PIPELINE_CROPS, 0.3)], axis=1)
+    rois = corner_rois(boxes, image.shape[1], image.shape[0])
+
+    def snapshot():
+        engine.detect(image)
+        for classifier in engine.classifiers.values():
+            crops = extract_crops(image, rois, classifier.input_size)
+            classifier.classify(crops[..., ::-1].astype(np.float32) / 255.0)
+
+    for _ in range(job["warmup"] + 1):
+        snapshot()
+    times = []
+    for _ in range(job["runs"]):
+        start = time.perf_counter()
+        snapshot()
+        times.append((time.perf_counter() - start) * 1000)
+    return {"threads": job["threads"], "crops": PIPELINE_CROPS, **_percentiles(times),
+            "peak_rss_mb": round(_peak_rss_mb(), 1)}
+
+
+def _isolated(fn, job):
+    """Run fn(job) in a fresh interpreter process"""
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1, maxtasksperchild=1) as pool:
+        return pool.apply(fn, (job,))
+
+
+def benchmark_models(models_dir, threads=(1, 2, 4), batch_sizes=BATCH_SIZES, runs=50, warmup=5,
+                     xnnpack_modes=(True, False), models=None):
+    """Sweep every model in config.json. Returns the results dict"""
+    models_dir = Path(models_dir)
+    with open(models_dir / "config.json") as f:
+        config = json.load(f)
+
+    results = {
+        "environment": {
+            "machine": platform.machine(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "models": {},
+    }
+
+    names = models or [name for name in ["detector"] + CLASSIFIERS if name in config]
+    for name in names:
+        path = models_dir / config[name]["file"]
+        if not path.exists():
+            print(f"⚠️  Skipping {name}: {path} not found")
+            continue
+        batches = [1] if name == "detector" else list(batch_sizes)
+        print(f"⏱️  {name} ({path.stat().st_size / (1024 * 1024):.2f} MB)")
+        entry = {"file": path.name, "size_bytes": path.stat().st_size, "runs": []}
+        for xnnpack in xnnpack_modes:
+            for num_threads in threads:
+                for batch in batches:
+                    job = {"path": str(path), "threads": num_threads, "xnnpack": xnnpack,
+                           "batch": batch, "runs": runs, "warmup": warmup}
+                    try:
+                        run = _isolated(_measure_model, job)
+                    except Exception as e:
+                        print(f"   ⚠️  threads={num_threads} xnnpack={xnnpack} batch={batch} failed: {e}")
+                        continue
+                    entry["runs"].append(run)
+                    print(f"   threads={num_threads} xnnpack={'on ' if xnnpack else 'off'} batch={batch:<3}"
+                          f"p50 {run['p50_ms']:8.2f} ms  p99 {run['p99_ms']:8.2f} ms  "
+                          f"warm-up {run['warmup_ms']:7.1f} ms  peak RSS {run['peak_rss_mb']:.0f} MB")
+        results["models"][name] = entry
+
+    if "detector" in results["models"]:
+        results["pipeline"] = []
+        print(f"⏱️  Pipeline: detector + {PIPELINE_CROPS} crops")
+        for num_threads in threads:
+            job = {"models_dir": str(models_dir), "threads": num_threads, "runs": runs, "warmup": warmup}
+            try:
+                run = _isolated(_measure_pipeline, job)
+            except Exception as e:
+                print(f"   ⚠️  threads={num_threads} failed: {e}")
+                continue
+            results["pipeline"].append(run)
+            print(f"   threads={num_threads}  p50 {run['p50_ms']:8.2f} ms  p90 {run['p90_ms']:8.2f} ms  "
+                  f"p99 {run['p99_ms']:8.2f} ms")
+    return results
+
+
+def check_budget(results, budget_ms):
+    """True if the fastest pipeline p50 fits the budget"""
+    pipeline = results.get("pipeline") or []
+    if not pipeline:
+        print("⚠️  No pipeline measurement to check against the budget")
+        return False
+    best = min(pipeline, key=lambda run: run["p50_ms"])
+    results["budget"] = {"budget_ms": budget_ms, "threads": best["threads"], "p50_ms": best["p50_ms"],
+                         "passed": best["p50_ms"] <= budget_ms}
+    if best["p50_ms"] <= budget_ms:
+        print(f"✓ Detector + {PIPELINE_CROPS} crops: {best['p50_ms']:.1f} ms p50 "
+              f"({best['threads']} threads) is within the {budget_ms:.0f} ms budget")
+        return True
+    print(f"❌ Detector + {PIPELINE_CROPS} crops: {best['p50_ms']:.1f} ms p50 "
+          f"exceeds the {budget_ms:.0f} ms budget")
+    return False
+
+
+def compare_results(old, new):
+    """Print p50 changes between two benchmark files"""
+    print("\n📊 p50 change vs. previous benchmark")
+    for name, entry in new["models"].items():
+        old_runs = {(r["threads"], r["xnnpack"], r["batch"]): r
+                    for r in old.get("models", {}).get(name, {}).get("runs", [])}
+        for run in entry["runs"]:
+            prev = old_runs.get((run["threads"], run["xnnpack"], run["batch"]))
+            if prev:
+                change = (run["p50_ms"] - prev["p50_ms"]) / prev["p50_ms"] * 100 if prev["p50_ms"] else 0.0
+                print(f"   {name:<8} threads={run['threads']} xnnpack={'on ' if run['xnnpack'] else 'off'} "
+                      f"batch={run['batch']:<3}{prev['p50_ms']:8.2f} → {run['p50_ms']:8.2f} ms ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SolSolve TFLite models")
+    parser.add_argument("--models-dir", type=str, default="../app/src/main/assets/models",
+                        help="Directory with config.json and the .tflite models")
+    parser.add_argument("--models", nargs="+", choices=["detector"] + CLASSIFIERS, default=None,
+                        help="Models to benchmark (default: all in config.json)")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4], help="Interpreter thread counts")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=BATCH_SIZES, help="Classifier batch sizes")
+    parser.add_argument("--no-xnnpack-sweep", action="store_true", help="Only benchmark with XNNPACK enabled")
+    parser.add_argument("--runs", type=int, default=50, help="Timed invokes per configuration")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed invokes after the first one")
+    parser.add_argument("--output", type=str, default=None, help="Results JSON (default: benchmark.json in the current directory)")
+    parser.add_argument("--compare", type=str, default=None, help="Previous results JSON to compare against")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="Fail if detector + 30 crops exceeds this p50 latency")
+
+    args = parser.parse_args()
+
+    xnnpack_modes = (True,) if args.no_xnnpack_sweep else (True, False)
+    results = benchmark_models(args.models_dir, args.threads, args.batch_sizes, args.runs,
+                               args.warmup, xnnpack_modes, args.models)
+
+    ok = True
+    if args.budget_ms is not None:
+        ok = check_budget(results, args.budget_ms)
+
+    output = Path(args.output or "benchmark.json")
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"✓ Results saved to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare_results(json.load(f), results)
+
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+SolSolve Corner Crop Generator
+
+Builds classifier crops from labeled detection data:
+1. Reads the YOLO .txt labels of every image
+2. Computes the top-left corner ROI of each card_face_up box (vectorized)
+3. Resamples all crops of an image in one cv2.remap call
+4. Fans out across images with a process pool
+
+Crops land in corner_crops/ for sorting into card52_data/<code>/.
+Once sorted, --derive-rank-suit fills rank_data/ and suit_data/ from
+card52_data/ so one sorting pass feeds all three classifiers.
+
+Usage:
+    python corner_crops.py --data-dir training_data
+    python corner_crops.py --data-dir training_data --derive-rank-suit
+"""
+
+import os
+import csv
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from dataset_utils import find_images, place_file, LINK_MODES
+from dataset_catalog import DatasetCatalog
+
+FACE_UP_CLASS = 0
+CROP_SIZE = 64
+
+# Corner index region as fractions of the box *width*. Tableau fans cut
+# the box height short, but the card width (and so the corner) is fixed:
+# 0.42 of the width is ~0.30 of a full 2.5:3.5 card's height.
+CORNER_WIDTH_FRAC = 0.30
+CORNER_HEIGHT_FRAC = 0.42
+CORNER_MARGIN_FRAC = 0.02
+
+SUIT_NAMES = {"C": "clubs", "D": "diamonds", "H": "hearts", "S": "spades"}
+
+
+def read_yolo_labels(label_path):
+    """Return an (N, 5) float array of class, xc, yc, w, h"""
+    label_path = Path(label_path)
+    if not label_path.exists() or label_path.stat().st_size == 0:
+        return np.zeros((0, 5), dtype=np.float32)
+    labels = np.loadtxt(label_path, dtype=np.float32, ndmin=2)
+    return labels[:, :5]
+
+
+def corner_rois(boxes, img_w, img_h):
+    """Top-left corner ROIs for normalized xc, yc, w, h boxes.
+
+    Returns an (N, 4) float array of x0, y0, x1, y1 in pixels, clipped to
+    the image.
+    """
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    xc, yc, w, h = boxes[:, 0] * img_w, boxes[:, 1] * img_h, boxes[:, 2] * img_w, boxes[:, 3] * img_h
+    margin = w * CORNER_MARGIN_FRAC
+    x0 = xc - w / 2 - margin
+    y0 = yc - h / 2 - margin
+    x1 = x0 + w * CORNER_WIDTH_FRAC + margin
+    y1 = y0 + w * CORNER_HEIGHT_FRAC + margin
+    rois = np.stack([x0, y0, x1, y1], axis=1)
+    rois[:, [0, 2]] = np.clip(rois[:, [0, 2]], 0, img_w)
+    rois[:, [1, 3]] = np.clip(rois[:, [1, 3]], 0, img_h)
+    return rois
+
+
+def extract_crops(img, rois, size=CROP_SIZE):
+    """Resample every ROI to size x size with a single cv2.remap.
+
+    Returns an (N, size, size, C) uint8 array.
+    """
+    import cv2
+
+    rois = np.asarray(rois, dtype=np.float32).reshape(-1, 4)
+    n = len(rois)
+    if n == 0:
+        return np.zeros((0, size, size) + img.shape[2:], dtype=np.uint8)
+    steps = (np.arange(size, dtype=np.float32) + 0.5) / size
+    widths = rois[:, 2] - rois[:, 0]
+    heights = rois[:, 3] - rois[:, 1]
+    map_x = rois[:, 0, None, None] + widths[:, None, None] * steps[None, None, :] - 0.5
+    map_y = rois[:, 1, None, None] + heights[:, None, None] * steps[None, :, None] - 0.5
+    map_x = np.broadcast_to(map_x, (n, size, size)).reshape(n * size, size)
+    map_y = np.broadcast_to(map_y, (n, size, size)).reshape(n * size, size)
+    crops = cv2.remap(img, np.ascontiguousarray(map_x), np.ascontiguousarray(map_y),
+                      cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+    return crops.reshape((n, size, size) + img.shape[2:])
+
+
+def _oriented_size(image_path):
+    """(width, height) as displayed: cv2.imread applies EXIF orientation, and YOLO labels are relative to it"""
+    from PIL import Image
+
+    with Image.open(image_path) as im:
+        w, h = im.size
+        # Orientations 5-8 rotate by 90 degrees
+        if im.getexif().get(0x0112, 1) in (5, 6, 7, 8):
+            w, h = h, w
+    return w, h
+
+
+def _reduced_read(image_path, min_roi_px, size):
+    """Decode at the coarsest JPEG scale that still leaves crops >= size px"""
+    import cv2
+
+    flags = {1: cv2.IMREAD_COLOR, 2: cv2.IMREAD_REDUCED_COLOR_2,
+             4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+    factor = 1
+    for f in (8, 4, 2):
+        if min_roi_px / f >= size:
+            factor = f
+            break
+    return cv2.imread(str(image_path), flags[factor])
+
+
+def _crop_image_job(job):
+    image_path, label_path, output_dir, size, split = job
+    import cv2
+
+    labels = read_yolo_labels(label_path)
+    boxes = labels[labels[:, 0] == FACE_UP_CLASS, 1:5]
+    if len(boxes) == 0:
+        return []
+
+    # Image header only: full decode happens at a reduced scale below
+    full_w, full_h = _oriented_size(image_path)
+    rois = corner_rois(boxes, full_w, full_h)
+    min_roi_px = float(np.min(np.minimum(rois[:, 2] - rois[:, 0], rois[:, 3] - rois[:, 1])))
+
+    img = _reduced_read(image_path, min_roi_px, size)
+    if img is None:
+        return []
+    scale = img.shape[1] / full_w
+    crops = extract_crops(img, rois * scale, size)
+
+    rows = []
+    stem = Path(image_path).stem
+    for i, crop in enumerate(crops):
+        name = f"{stem}_{i:03d}.png"
+        ok, buf = cv2.imencode(".png", crop)
+        if ok:
+            buf.tofile(str(Path(output_dir) / name))
+            rows.append([name, str(image_path), split] + [f"{v:.1f}" for v in rois[i]])
+    return rows
+
+
+def create_corner_crops(data_dir, output_dir=None, size=CROP_SIZE, workers=None):
+    """Crop the corner of every labeled face-up card under detection_data/"""
+    data_dir = Path(data_dir)
+    detection_dir = data_dir / "detection_data"
+    output_dir = Path(output_dir) if output_dir else data_dir / "corner_crops"
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Labeled split images from the dataset catalog
+    with DatasetCatalog(data_dir, workers=workers or 8) as catalog:
+        catalog.update(["detection"])
+        jobs = [(str(data_dir / image), str(data_dir / label), str(output_dir), size, split)
+                for split in ("train", "val") for image, label in catalog.labeled_images(split)]
+
+    if not jobs:
+        print(f"❌ No labeled images found in {detection_dir}")
+        return False
+
+    print(f"🎯 Cropping card corners from {len(jobs)} labeled images...")
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, min(64, len(jobs) // (workers * 4)))
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for image_rows in pool.map(_crop_image_job, jobs, chunksize=chunksize):
+            rows.extend(image_rows)
+
+    with open(output_dir / "index.csv", 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["crop", "image", "split", "x0", "y0", "x1", "y1"])
+        writer.writerows(rows)
+
+    print(f"✓ {len(rows)} corner crops written to {output_dir}")
+    print("   Sort them into card52_data/<code>/ and run --derive-rank-suit")
+    return True
+
+
+def derive_rank_suit(data_dir, link_mode="auto"):
+    """Fill rank_data/ and suit_data/ from a sorted card52_data/ tree"""
+    data_dir = Path(data_dir)
+    card52_dir = data_dir / "card52_data"
+    if not card52_dir.exists():
+        print(f"❌ {card52_dir} not found")
+        return False
+
+    placed = 0
+    for class_dir in sorted(p for p in card52_dir.iterdir() if p.is_dir()):
+        code = class_dir.name
+        rank, suit = code[:-1], SUIT_NAMES.get(code[-1:])
+        if not rank or suit is None:
+            continue
+        rank_dir = data_dir / "rank_data" / rank
+        suit_dir = data_dir / "suit_data" / suit
+        rank_dir.mkdir(parents=True, exist_ok=True)
+        suit_dir.mkdir(parents=True, exist_ok=True)
+        for crop in find_images(class_dir):
+            name = f"{code}_{crop.name}"
+            for dst in (rank_dir / name, suit_dir / name):
+                if not dst.exists():
+                    place_file(crop, dst, link_mode)
+                    placed += 1
+
+    print(f"✓ Placed {placed} crops into rank_data/ and suit_data/")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SolSolve corner crop generator")
+    parser.add_argument("--data-dir", type=str, required=True, help="Training data directory (with detection_data/)")
+    parser.add_argument("--output-dir", type=str, default=None, help="Crop output directory (default: <data-dir>/corner_crops)")
+    parser.add_argument("--size", type=int, default=CROP_SIZE, help="Crop size in pixels")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--derive-rank-suit", action="store_true",
+                        help="Fill rank_data/ and suit_data/ from a sorted card52_data/ instead of cropping")
+    parser.add_argument("--link-mode", choices=LINK_MODES, default="auto", help="How to place derived crops")
+
+    args = parser.parse_args()
+
+    if args.derive_rank_suit:
+        derive_rank_suit(args.data_dir, args.link_mode)
+    else:
+        create_corner_crops(args.data_dir, args.output_dir, args.size, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+SolSolve Crop Shard Packer
+
+Packs a classification tree (rank_data/, suit_data/ or card52_data/)
+into a few fixed-size uint8 NumPy shards so training reads a handful of
+files sequentially instead of decoding thousands of tiny images:
+
+    <name>_shards/
+        index.json                # classes, crop size, shards, packed and undecodable files
+        shard_00000.images.npy    # N x S x S x 3 uint8 (RGB)
+        shard_00000.labels.npy    # N int16 class ids
+
+Shards are memory-mapped at train time. New crops are appended as new
+shards; a changed class list or modified/removed crops trigger a repack.
+
+Usage:
+    python crop_shards.py --data-dir training_data/rank_data
+    python crop_shards.py --data-dir training_data/suit_data --size 64
+"""
+
+import os
+import json
+import random
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from dataset_utils import list_class_files
+
+INDEX_NAME = "index.json"
+INDEX_VERSION = 1
+
+
+def default_shard_dir(data_dir):
+    """rank_data/ -> rank_shards/ next to it"""
+    data_dir = Path(data_dir)
+    name = data_dir.name[:-len("_data")] if data_dir.name.endswith("_data") else data_dir.name
+    return data_dir.parent / f"{name}_shards"
+
+
+def _load_crop(job):
+    path, size = job
+    import cv2
+    img = cv2.imread(path, cv2.IMREAD_COLOR)
+    if img is None:
+        return None
+    if img.shape[:2] != (size, size):
+        img = cv2.resize(img, (size, size), interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+
+def load_index(shard_dir):
+    index_path = Path(shard_dir) / INDEX_NAME
+    if not index_path.exists():
+        return None
+    with open(index_path) as f:
+        index = json.load(f)
+    return index if index.get("version") == INDEX_VERSION else None
+
+
+def _write_index(shard_dir, index):
+    index_path = Path(shard_dir) / INDEX_NAME
+    tmp_path = index_path.with_suffix(".tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f, indent=1)
+    os.replace(tmp_path, index_path)
+
+
+def pack_shards(data_dir, shard_dir=None, size=64, shard_size=8192, seed=42, workers=None):
+    """Pack new crops from data_dir into shards. Returns the index"""
+    data_dir = Path(data_dir)
+    shard_dir = Path(shard_dir) if shard_dir else default_shard_dir(data_dir)
+    shard_dir.mkdir(parents=True, exist_ok=True)
+
+    classes, files = list_class_files(data_dir)
+    stats = {}
+    for rel, _ in files:
+        stat = (data_dir / rel).stat()
+        stats[rel] = [stat.st_size, stat.st_mtime]
+
+    index = load_index(shard_dir)
+    repack = (index is None or index["classes"] != classes or index["size"] != size
+              or any(rel not in stats or stats[rel] != st for rel, st in index["files"].items()))
+    if repack:
+        if index is not None:
+            print("♻️  Class list, crop size or existing crops changed; repacking all shards")
+        for old in shard_dir.glob("shard_*.npy"):
+            old.unlink()
+        index = {"version": INDEX_VERSION, "classes": classes, "size": size, "shards": [], "files": {}}
+
+    # Crops that failed to decode are retried only once they change
+    failed = {rel: st for rel, st in index.setdefault("failed", {}).items() if stats.get(rel) == st}
+    index["failed"] = failed
+    new_files = [(rel, class_id) for rel, class_id in files if rel not in index["files"] and rel not in failed]
+    if not new_files:
+        print(f"✓ Shards up to date ({sum(s['count'] for s in index['shards'])} crops)")
+        return index
+
+    # Shuffle so that every shard (and any index-based split) mixes classes
+    random.Random(seed + len(index["shards"])).shuffle(new_files)
+    print(f"📦 Packing {len(new_files)} new crops from {data_dir} into {shard_dir}...")
+
+    workers = workers or os.cpu_count() or 1
+    for start in range(0, len(new_files), shard_size):
+        chunk = new_files[start:start + shard_size]
+        jobs = [(str(data_dir / rel), size) for rel, _ in chunk]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            crops = list(pool.map(_load_crop, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+        keep = [i for i, crop in enumerate(crops) if crop is not None]
+        for i, crop in enumerate(crops):
+            if crop is None:
+                failed[chunk[i][0]] = stats[chunk[i][0]]
+        if not keep:
+            _write_index(shard_dir, index)
+            continue
+        name = f"shard_{len(index['shards']):05d}"
+        images = np.lib.format.open_memmap(shard_dir / f"{name}.images.npy", mode='w+',
+                                           dtype=np.uint8, shape=(len(keep), size, size, 3))
+        for row, i in enumerate(keep):
+            images[row] = crops[i]
+        images.flush()
+        del images
+        labels = np.array([chunk[i][1] for i in keep], dtype=np.int16)
+        np.save(shard_dir / f"{name}.labels.npy", labels)
+
+        index["shards"].append({"name": name, "count": len(keep)})
+        for i in keep:
+            index["files"][chunk[i][0]] = stats[chunk[i][0]]
+        _write_index(shard_dir, index)
+
+    total = sum(s["count"] for s in index["shards"])
+    print(f"✓ {total} crops in {len(index['shards'])} shard(s)")
+    if failed:
+        print(f"⚠️  {len(failed)} crops could not be decoded; skipped until they change")
+    return index
+
+
+def load_shards(shard_dir):
+    """Memory-map all shards. Returns (index, [(images, labels)])"""
+    shard_dir = Path(shard_dir)
+    index = load_index(shard_dir)
+    if index is None:
+        return None, []
+    shards = []
+    for shard in index["shards"]:
+        images = np.load(shard_dir / f"{shard['name']}.images.npy", mmap_mode='r')
+        labels = np.load(shard_dir / f"{shard['name']}.labels.npy", mmap_mode='r')
+        shards.append((images, labels))
+    return index, shards
+
+
+def load_rows(shard_dir):
+    """Address all shards without reading them: (classes, images, rows, labels, names).
+
+    images is the list of per-shard image memmaps and rows[i] the
+    (shard, row) of crop i, so a batch is gathered from the memmaps on
+    demand. names[i] is the crop's path relative to the class tree;
+    rows are in index order, so it lines up with rows and labels.
+    """
+    index, shards = load_shards(shard_dir)
+    if not shards:
+        return None, None, None, None, None
+    rows = np.concatenate([np.stack([np.full(len(labels), i), np.arange(len(labels))], axis=1)
+                           for i, (_, labels) in enumerate(shards)]).astype(np.int64)
+    labels = np.concatenate([np.asarray(labels, dtype=np.int32) for _, labels in shards])
+    return index["classes"], [images for images, _ in shards], rows, labels, list(index["files"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack SolSolve classification crops into NumPy shards")
+    parser.add_argument("--data-dir", type=str, required=True, help="Class directory tree, e.g. training_data/rank_data")
+    parser.add_argument("--shard-dir", type=str, default=None, help="Output directory (default: <name>_shards next to data-dir)")
+    parser.add_argument("--size", type=int, default=64, help="Crop size in pixels")
+    parser.add_argument("--shard-size", type=int, default=8192, help="Crops per shard")
+    parser.add_argument("--workers", type=int, default=None, help="Decoder processes (default: all cores)")
+
+    args = parser.parse_args()
+
+    pack_shards(args.data_dir, args.shard_dir, args.size, args.shard_size, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
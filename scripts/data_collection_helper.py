@@ -6,10 +6,14 @@ This script helps you prepare training data for the SolSolve ML models.
 """
 
 import os
-import cv2
-import numpy as np
+import time
 from pathlib import Path
 import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# cv2 and numpy are imported by the functions that need them, so --setup
+# and --sample-config start instantly
 
 def create_directory_structure():
     """Create the recommended directory structure for training data."""
@@ -40,31 +44,126 @@ def create_directory_structure():
         for suit in suits:
             Path(f"classification_crops/card52/{rank}{suit}").mkdir(exist_ok=True)
 
-def extract_frames_from_video(video_path, output_dir, frame_interval=30):
-    """Extract frames from a video file for training data collection."""
+def _scene_signature(frame):
+    """Tiny grayscale thumbnail used to detect visible table changes."""
+    import cv2
+    import numpy as np
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return cv2.resize(gray, (64, 36), interpolation=cv2.INTER_AREA).astype(np.float32)
+
+def _extract_segment(job):
+    """Decode one [start, end) frame range and write the sampled frames.
+
+    Frames that are skipped are only grab()bed, never decoded or color
+    converted. JPEG encoding runs on a small thread pool (cv2 releases the
+    GIL while encoding) so decoding never waits on disk; at most
+    2 * writer_threads frames wait for a writer, so decoding ahead of slow
+    writers cannot pile up full-resolution frames.
+    """
+    import cv2
+    import numpy as np
+    
+    video_path, output_dir, start, end, frame_interval, scene_threshold, jpeg_quality, writer_threads = job
+    cap = cv2.VideoCapture(video_path)
+    if start > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    
+    stem = Path(video_path).stem
+    params = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality]
+    last_signature = None
+    sampled = 0
+    written = []
+    
+    with ThreadPoolExecutor(max_workers=writer_threads) as writers:
+        pending = deque()
+        frame_idx = start
+        while end is None or frame_idx < end:
+            if not cap.grab():
+                break
+            if frame_idx % frame_interval == 0:
+                ok, frame = cap.retrieve()
+                if ok:
+                    sampled += 1
+                    emit = True
+                    if scene_threshold is not None:
+                        signature = _scene_signature(frame)
+                        emit = (last_signature is None or
+                                float(np.mean(np.abs(signature - last_signature))) > scene_threshold)
+                        if emit:
+                            last_signature = signature
+                    if emit:
+                        output_path = os.path.join(output_dir, f"{stem}_{frame_idx:06d}.jpg")
+                        pending.append(writers.submit(cv2.imwrite, output_path, frame, params))
+                        written.append(output_path)
+                        while pending and pending[0].done():
+                            pending.popleft().result()
+                        if len(pending) > 2 * writer_threads:
+                            pending.popleft().result()
+            frame_idx += 1
+        for future in pending:
+            future.result()
+    
+    cap.release()
+    return start, frame_idx, sampled, len(written)
+
+def extract_frames_from_video(video_path, output_dir, frame_interval=30, workers=None,
+                              scene_threshold=None, jpeg_quality=95, min_segment_frames=3000,
+                              writer_threads=4):
+    """Extract frames from a video file for training data collection.
+
+    Every frame_interval-th frame is sampled. Long recordings are split
+    into time segments that are decoded by separate processes. With
+    scene_threshold set, a sampled frame is only written when its
+    downscaled grayscale thumbnail differs from the last written one by
+    more than that mean absolute difference (0-255), so static table
+    states produce a single frame.
+    """
+    import cv2
+    import numpy as np
+    
     if not os.path.exists(video_path):
         print(f"Video file not found: {video_path}")
         return
     
-    cap = cv2.VideoCapture(video_path)
-    frame_count = 0
-    extracted_count = 0
-    
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-            
-        if frame_count % frame_interval == 0:
-            output_path = os.path.join(output_dir, f"frame_{extracted_count:04d}.jpg")
-            cv2.imwrite(output_path, frame)
-            extracted_count += 1
-            print(f"Extracted frame {extracted_count} to {output_path}")
-        
-        frame_count += 1
+    os.makedirs(output_dir, exist_ok=True)
+    frame_interval = max(1, frame_interval)
     
+    cap = cv2.VideoCapture(video_path)
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 0
     cap.release()
-    print(f"Extracted {extracted_count} frames from video")
+    
+    workers = workers or os.cpu_count() or 1
+    if total_frames <= 0:
+        # Unknown length (some containers): decode as a single segment
+        segments = [(0, None)]
+    else:
+        n_segments = max(1, min(workers, total_frames // max(1, min_segment_frames)))
+        bounds = np.linspace(0, total_frames, n_segments + 1).astype(int)
+        segments = list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+    
+    duration = f"{total_frames / fps:.0f}s, " if total_frames > 0 and fps > 0 else ""
+    print(f"Extracting from {video_path} ({duration}{total_frames} frames) "
+          f"in {len(segments)} segment(s), every {frame_interval} frames"
+          + (f", scene threshold {scene_threshold}" if scene_threshold is not None else ""))
+    
+    jobs = [(video_path, output_dir, start, end, frame_interval, scene_threshold, jpeg_quality, writer_threads)
+            for start, end in segments]
+    started = time.perf_counter()
+    if len(jobs) == 1:
+        results = [_extract_segment(jobs[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=len(jobs)) as pool:
+            results = list(pool.map(_extract_segment, jobs))
+    elapsed = time.perf_counter() - started
+    
+    decoded = sum(end - start for start, end, _, _ in results)
+    sampled = sum(r[2] for r in results)
+    extracted_count = sum(r[3] for r in results)
+    speed = f", {decoded / fps / elapsed:.1f}x real-time" if fps > 0 and elapsed > 0 else ""
+    print(f"Extracted {extracted_count} frames from video "
+          f"({sampled} sampled, {elapsed:.1f}s{speed}) to {output_dir}")
+    return extracted_count
 
 def create_sample_config():
     """Create a sample config.json for reference."""
@@ -106,6 +205,11 @@ def main():
     parser.add_argument("--setup", action="store_true", help="Create directory structure")
     parser.add_argument("--extract-video", type=str, help="Extract frames from video file")
     parser.add_argument("--frame-interval", type=int, default=30, help="Frame interval for extraction")
+    parser.add_argument("--output-dir", type=str, default="raw_images", help="Where extracted frames are written")
+    parser.add_argument("--workers", type=int, default=None, help="Decoder processes for long videos (default: all cores)")
+    parser.add_argument("--scene-threshold", type=float, default=None,
+                        help="Only keep sampled frames that differ visibly from the last kept one (e.g. 6.0)")
+    parser.add_argument("--jpeg-quality", type=int, default=95, help="JPEG quality of extracted frames")
     parser.add_argument("--sample-config", action="store_true", help="Create sample config.json")
     
     args = parser.parse_args()
@@ -120,7 +224,9 @@ def main():
         print("4. Train your models using the TRAINING_GUIDE.md")
     
     if args.extract_video:
-        extract_frames_from_video(args.extract_video, "raw_images", args.frame_interval)
+        extract_frames_from_video(args.extract_video, args.output_dir, args.frame_interval,
+                                  workers=args.workers, scene_threshold=args.scene_threshold,
+                                  jpeg_quality=args.jpeg_quality)
     
     if args.sample_config:
         create_sample_config()
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+SolSolve Dataset Catalog
+
+One SQLite file that indexes a training data directory, so scripts query
+it instead of walking the trees again:
+
+    <data-dir>/catalog.sqlite
+        images    detection_data/images/{train,val}: content hash, size in
+                  pixels, split, label file and box count
+        boxes     per-class box counts of each image's YOLO label
+        classes   class directories of rank_data/, suit_data/, card52_data/
+                  (empty ones too, they still take a class id)
+        crops     every crop with its tree, class and content hash
+
+update() stats every file (os.scandir) and only re-reads files whose size
+or mtime changed; image hashes are reused from the split manifest. After
+that, class balance, unlabeled images or a split's images are indexed
+queries.
+
+Usage:
+    python dataset_catalog.py --data-dir training_data                  # update and summarize
+    python dataset_catalog.py --data-dir training_data --unlabeled      # images without a label file
+    python dataset_catalog.py --data-dir training_data --split val --json
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from dataset_utils import file_hash, load_manifest, IMAGE_EXTENSIONS, MANIFEST_NAME
+
+CATALOG_NAME = "catalog.sqlite"
+CATALOG_VERSION = 1
+SPLITS = ("train", "val")
+CLASS_TREES = ("rank", "suit", "card52")
+PARTS = ("detection",) + CLASS_TREES
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS images (
+    path TEXT PRIMARY KEY, split TEXT, size INTEGER, mtime REAL, sha1 TEXT, width INTEGER, height INTEGER,
+    label TEXT, label_size INTEGER, label_mtime REAL, label_sha1 TEXT, boxes INTEGER);
+CREATE INDEX IF NOT EXISTS images_split ON images (split, label);
+CREATE TABLE IF NOT EXISTS boxes (path TEXT, class_id INTEGER, count INTEGER, PRIMARY KEY (path, class_id));
+CREATE TABLE IF NOT EXISTS classes (tree TEXT, class TEXT, PRIMARY KEY (tree, class));
+CREATE TABLE IF NOT EXISTS crops (path TEXT PRIMARY KEY, tree TEXT, class TEXT, size INTEGER, mtime REAL, sha1 TEXT);
+CREATE INDEX IF NOT EXISTS crops_tree ON crops (tree, class);
+"""
+
+
+def _scan_files(folder, suffixes=None):
+    """{name: (size, mtime)} of the files in folder, from one os.scandir pass"""
+    files = {}
+    try:
+        entries = os.scandir(folder)
+    except FileNotFoundError:
+        return files
+    with entries:
+        for entry in entries:
+            if suffixes and os.path.splitext(entry.name)[1].lower() not in suffixes:
+                continue
+            if entry.is_file():
+                stat = entry.stat()
+                files[entry.name] = (stat.st_size, stat.st_mtime)
+    return files
+
+
+def _image_size(path):
+    """(width, height) from the image header, or (None, None)"""
+    from PIL import Image
+
+    try:
+        with Image.open(path) as img:
+            return img.size
+    except OSError:
+        return None, None
+
+
+def _count_boxes(path):
+    """{class id: boxes} in a YOLO label file; malformed lines are skipped"""
+    counts = {}
+    with open(path) as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 5 and parts[0].isdigit():
+                counts[int(parts[0])] = counts.get(int(parts[0]), 0) + 1
+    return counts
+
+
+class DatasetCatalog:
+    """SQLite index of a training data directory"""
+
+    def __init__(self, root, path=None, workers=8):
+        self.root = Path(root)
+        self.path = Path(path) if path else self.root / CATALOG_NAME
+        self.workers = workers
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Concurrent classifier jobs update their own trees in the same file
+        self.db = sqlite3.connect(str(self.path), timeout=60)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        # Check and create the schema under a write lock, so two processes
+        # opening a new catalog at once don't both create it
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            version = None
+            if self.db.execute("SELECT name FROM sqlite_master WHERE name = 'meta'").fetchone():
+                row = self.db.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+                version = row and int(row[0])
+            if version != CATALOG_VERSION:
+                for table in ("meta", "images", "boxes", "classes", "crops"):
+                    self.db.execute(f"DROP TABLE IF EXISTS {table}")
+                # executescript() would commit and drop the lock
+                for statement in SCHEMA.split(";"):
+                    if statement.strip():
+                        self.db.execute(statement)
+                self.db.execute("INSERT INTO meta VALUES ('version', ?)", (str(CATALOG_VERSION),))
+            self.db.commit()
+        except BaseException:
+            self.db.rollback()
+            raise
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _run_all(self, jobs):
+        """Run (key, fn, path) jobs in a thread pool. Returns {key: result}"""
+        if not jobs:
+            return {}
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as pool:
+            return dict(zip([key for key, _, _ in jobs], pool.map(lambda job: job[1](job[2]), jobs)))
+
+    def update(self, parts=None):
+        """Bring the given parts ("detection", "rank", "suit", "card52"; default all) up to date.
+
+        Returns {part: {"unchanged", "updated", "removed"}}.
+        """
+        stats = {}
+        for part in parts or PARTS:
+            if part == "detection":
+                stats[part] = self._update_detection()
+            else:
+                stats[part] = self._update_tree(part)
+        return stats
+
+    def _update_detection(self):
+        detection_dir = self.root / "detection_data"
+        manifest = load_manifest(detection_dir / MANIFEST_NAME)["files"]
+        old = {row[0]: row[1:] for row in self.db.execute(
+            "SELECT path, size, mtime, label, label_size, label_mtime FROM images")}
+
+        rows, pending, labels = {}, [], {}
+        for split in SPLITS:
+            label_files = {os.path.splitext(name)[0]: stat
+                           for name, stat in _scan_files(detection_dir / "labels" / split, {".txt"}).items()}
+            for name, (size, mtime) in _scan_files(detection_dir / "images" / split, IMAGE_EXTENSIONS).items():
+                rel = f"detection_data/images/{split}/{name}"
+                stem = os.path.splitext(name)[0]
+                label = f"detection_data/labels/{split}/{stem}.txt" if stem in label_files else None
+                label_size, label_mtime = label_files.get(stem, (None, None))
+                rows[rel] = (split, size, mtime, label, label_size, label_mtime)
+                entry = old.get(rel)
+                if not entry or entry[:2] != (size, mtime):
+                    pending.append(rel)
+                if label and (not entry or entry[2:] != (label, label_size, label_mtime)):
+                    labels[rel] = label
+
+        known = {}
+        for rel in pending:
+            entry = manifest.get(rel.rsplit("/", 1)[1])
+            split, size, mtime = rows[rel][:3]
+            if entry and (entry.get("split"), entry["size"], entry["mtime"]) == (split, size, mtime):
+                known[rel] = entry["sha1"]
+        hashes = self._run_all([(rel, file_hash, self.root / rel) for rel in pending if rel not in known])
+        hashes.update(known)
+        sizes = self._run_all([(rel, _image_size, self.root / rel) for rel in pending])
+        label_hashes = self._run_all([(rel, file_hash, self.root / label) for rel, label in labels.items()])
+        box_counts = self._run_all([(rel, _count_boxes, self.root / label) for rel, label in labels.items()])
+
+        removed = [rel for rel in old if rel not in rows]
+        unlabeled = [rel for rel, row in rows.items() if row[3] is None and rel in old and old[rel][2] is not None]
+        with self.db:
+            for rel in removed:
+                self.db.execute("DELETE FROM images WHERE path = ?", (rel,))
+                self.db.execute("DELETE FROM boxes WHERE path = ?", (rel,))
+            for rel in pending:
+                split, size, mtime = rows[rel][:3]
+                width, height = sizes[rel]
+                self.db.execute("INSERT INTO images (path, split, size, mtime, sha1, width, height, boxes) "
+                                "VALUES (?, ?, ?, ?, ?, ?, ?, 0) ON CONFLICT (path) DO UPDATE SET "
+                                "split = excluded.split, size = excluded.size, mtime = excluded.mtime, "
+                                "sha1 = excluded.sha1, width = excluded.width, height = excluded.height",
+                                (rel, split, size, mtime, hashes[rel], width, height))
+            for rel, label in labels.items():
+                _, _, _, _, label_size, label_mtime = rows[rel]
+                counts = box_counts[rel]
+                self.db.execute("UPDATE images SET label = ?, label_size = ?, label_mtime = ?, label_sha1 = ?, "
+                                "boxes = ? WHERE path = ?",
+                                (label, label_size, label_mtime, label_hashes[rel], sum(counts.values()), rel))
+                self.db.execute("DELETE FROM boxes WHERE path = ?", (rel,))
+                self.db.executemany("INSERT INTO boxes VALUES (?, ?, ?)",
+                                    [(rel, class_id, count) for class_id, count in counts.items()])
+            for rel in unlabeled:
+                self.db.execute("UPDATE images SET label = NULL, label_size = NULL, label_mtime = NULL, "
+                                "label_sha1 = NULL, boxes = 0 WHERE path = ?", (rel,))
+                self.db.execute("DELETE FROM boxes WHERE path = ?", (rel,))
+        return {"unchanged": len(rows) - len(pending), "updated": len(pending), "removed": len(removed),
+                "labels": len(labels) + len(unlabeled)}
+
+    def _update_tree(self, tree):
+        data_dir = self.root / f"{tree}_data"
+        try:
+            classes = sorted(entry.name for entry in os.scandir(data_dir) if entry.is_dir())
+        except FileNotFoundError:
+            classes = []
+        old = {row[0]: row[1:] for row in self.db.execute(
+            "SELECT path, size, mtime FROM crops WHERE tree = ?", (tree,))}
+
+        rows, pending = {}, []
+        for class_name in classes:
+            for name, stat in _scan_files(data_dir / class_name, IMAGE_EXTENSIONS).items():
+                rel = f"{tree}_data/{class_name}/{name}"
+                rows[rel] = (class_name,) + stat
+                if old.get(rel) != stat:
+                    pending.append(rel)
+        hashes = self._run_all([(rel, file_hash, self.root / rel) for rel in pending])
+
+        removed = [rel for rel in old if rel not in rows]
+        with self.db:
+            self.db.execute("DELETE FROM classes WHERE tree = ?", (tree,))
+            self.db.executemany("INSERT INTO classes VALUES (?, ?)", [(tree, name) for name in classes])
+            self.db.executemany("DELETE FROM crops WHERE path = ?", [(rel,) for rel in removed])
+            self.db.executemany("INSERT OR REPLACE INTO crops VALUES (?, ?, ?, ?, ?, ?)",
+                                [(rel, tree) + rows[rel] + (hashes[rel],) for rel in pending])
+        return {"unchanged": len(rows) - len(pending), "updated": len(pending), "removed": len(removed)}
+
+    # Queries
+
+    def class_files(self, tree):
+        """(sorted class names, [(path relative to the tree, class id)]), like dataset_utils.list_class_files"""
+        classes = [row[0] for row in self.db.execute(
+            "SELECT class FROM classes WHERE tree = ? ORDER BY class", (tree,))]
+        ids = {name: i for i, name in enumerate(classes)}
+        prefix = len(tree) + len("_data/")
+        files = [(path[prefix:], ids[class_name]) for path, class_name in self.db.execute(
+            "SELECT path, class FROM crops WHERE tree = ? ORDER BY class, path", (tree,))]
+        return classes, files
+
+    def crop_hashes(self, tree):
+        """{path relative to the tree: sha1}"""
+        prefix = len(tree) + len("_data/")
+        return {path[prefix:]: sha1 for path, sha1 in self.db.execute(
+            "SELECT path, sha1 FROM crops WHERE tree = ?", (tree,))}
+
+    def class_balance(self, tree):
+        """{class: crops}, including empty classes"""
+        balance = {row[0]: 0 for row in self.db.execute(
+            "SELECT class FROM classes WHERE tree = ? ORDER BY class", (tree,))}
+        balance.update(self.db.execute(
+            "SELECT class, COUNT(*) FROM crops WHERE tree = ? GROUP BY class", (tree,)))
+        return balance
+
+    def detection_hashes(self):
+        """{path relative to detection_data/: sha1} for split images and their labels"""
+        prefix = len("detection_data/")
+        hashes = {}
+        for path, sha1, label, label_sha1 in self.db.execute(
+                "SELECT path, sha1, label, label_sha1 FROM images"):
+            hashes[path[prefix:]] = sha1
+            if label:
+                hashes[label[prefix:]] = label_sha1
+        return hashes
+
+    def images(self, split=None, labeled=None):
+        """Image paths relative to the root, optionally of one split and with or without a label"""
+        query, params = "SELECT path FROM images WHERE 1", []
+        if split:
+            query += " AND split = ?"
+            params.append(split)
+        if labeled is not None:
+            query += " AND label IS NOT NULL" if labeled else " AND label IS NULL"
+        return [row[0] for row in self.db.execute(query + " ORDER BY path", params)]
+
+    def labeled_images(self, split=None):
+        """[(image, label file)] paths relative to the root, optionally of one split"""
+        query, params = "SELECT path, label FROM images WHERE label IS NOT NULL", []
+        if split:
+            query += " AND split = ?"
+            params.append(split)
+        return list(self.db.execute(query + " ORDER BY path", params))
+
+    def box_counts(self, split=None):
+        """{class id: boxes} over the labeled images"""
+        query = "SELECT class_id, SUM(count) FROM boxes"
+        params = []
+        if split:
+            query += " JOIN images USING (path) WHERE images.split = ?"
+            params.append(split)
+        return dict(self.db.execute(query + " GROUP BY class_id ORDER BY class_id", params))
+
+    def summary(self):
+        splits = {}
+        for split, images, labeled, boxes in self.db.execute(
+                "SELECT split, COUNT(*), COUNT(label), SUM(boxes) FROM images GROUP BY split"):
+            splits[split] = {"images": images, "labeled": labeled, "boxes": boxes or 0,
+                             "box_counts": self.box_counts(split)}
+        return {"detection": splits,
+                "crops": {tree: self.class_balance(tree) for tree in CLASS_TREES}}
+
+
+def print_summary(summary, class_names=None):
+    detection = summary["detection"]
+    if detection:
+        print("📊 Detection split:")
+        for split in SPLITS:
+            info = detection.get(split)
+            if not info:
+                continue
+            boxes = ", ".join(f"{class_names[c] if class_names and c < len(class_names) else c}: {n}"
+                              for c, n in info["box_counts"].items())
+            print(f"   {split}: {info['images']} images, {info['labeled']} labeled, "
+                  f"{info['boxes']} boxes{f' ({boxes})' if boxes else ''}")
+    for tree, balance in summary["crops"].items():
+        if not balance:
+            continue
+        counts = list(balance.values())
+        if not sum(counts):
+            print(f"📊 {tree}: no crops yet")
+            continue
+        print(f"📊 {tree}: {sum(counts)} crops in {len(balance)} classes "
+              f"(min {min(counts)}, max {max(counts)})")
+        empty = [name for name, count in balance.items() if count == 0]
+        if empty:
+            print(f"   ⚠️  No crops for {', '.join(empty)}")
+
+
+def detection_class_names(root):
+    """Class names from detection_data/data.yaml, if it can be read"""
+    try:
+        import yaml
+        with open(Path(root) / "detection_data" / "data.yaml") as f:
+            return yaml.safe_load(f).get("names")
+    except (ImportError, OSError, AttributeError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index a SolSolve training data directory in SQLite")
+    parser.add_argument("--data-dir", type=str, required=True, help="Directory with detection_data/ and class trees")
+    parser.add_argument("--catalog", type=str, default=None, help=f"Catalog file (default: <data-dir>/{CATALOG_NAME})")
+    parser.add_argument("--no-update", action="store_true", help="Query the catalog as it is, without rescanning")
+    parser.add_argument("--unlabeled", action="store_true", help="List images without a label file")
+    parser.add_argument("--split", choices=SPLITS, default=None, help="List the images of a split")
+    parser.add_argument("--balance", choices=CLASS_TREES, default=None, help="Crops per class of a tree")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    parser.add_argument("--workers", type=int, default=8, help="Threads used for hashing")
+
+    args = parser.parse_args()
+    if not Path(args.data_dir).is_dir():
+        print(f"❌ Data directory not found: {args.data_dir}")
+        sys.exit(1)
+
+    with DatasetCatalog(args.data_dir, args.catalog, args.workers) as catalog:
+        if not args.no_update:
+            stats = catalog.update()
+            if not args.json:
+                changed = {part: s for part, s in stats.items() if s["updated"] or s["removed"] or s.get("labels")}
+                print(f"✓ Catalog {catalog.path}: " + (", ".join(
+                    f"{part} {s['updated']} updated, {s['removed']} removed"
+                    + (f", {s['labels']} labels changed" if s.get("labels") else "") for part, s in changed.items())
+                    or "unchanged"))
+
+        if args.unlabeled or args.split:
+            result = catalog.images(args.split, False if args.unlabeled else None)
+            if args.json:
+                print(json.dumps(result, indent=2))
+            else:
+                print("\n".join(result))
+        elif args.balance:
+            result = catalog.class_balance(args.balance)
+            if args.json:
+                print(json.dumps(result, indent=2))
+            else:
+                for name, count in result.items():
+                    print(f"   {name:<10} {count}")
+        elif args.json:
+            print(json.dumps(catalog.summary(), indent=2))
+        else:
+            print_summary(catalog.summary(), detection_class_names(args.data_dir))
+
+
+if __name__ == "__main__":
+    main()
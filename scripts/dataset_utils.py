@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+SolSolve Dataset Utilities
+
+Shared helpers for organizing training images:
+1. Finding images in a directory or class tree
+2. Seeded, stable train/val splitting
+3. Placing files with hardlinks, reflinks or a threaded copy
+4. A manifest so re-runs only touch new or changed files
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import zlib
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff']
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+LINK_MODES = ["copy", "auto", "hardlink", "reflink"]
+
+# Linux FICLONE ioctl: share extents copy-on-write (btrfs, xfs, ...)
+_FICLONE = 0x40049409
+
+
+def find_images(image_dir):
+    """Return all image files in a directory, sorted by name"""
+    image_dir = Path(image_dir)
+    if not image_dir.is_dir():
+        return []
+    return sorted(
+        p for p in image_dir.iterdir()
+        if p.is_file() and p.suffix.lower() in IMAGE_EXTENSIONS
+    )
+
+
+def list_class_files(data_dir):
+    """Return (sorted class names, [(relative path, class id)]) for a class tree"""
+    data_dir = Path(data_dir)
+    classes = sorted(p.name for p in data_dir.iterdir() if p.is_dir())
+    files = []
+    for class_id, class_name in enumerate(classes):
+        for path in find_images(data_dir / class_name):
+            files.append((f"{class_name}/{path.name}", class_id))
+    return classes, files
+
+
+def split_class_files(files, validation_split=0.2, seed=42):
+    """Split (relative path, class id) pairs into stable train/val lists"""
+    train, val = [], []
+    for item in files:
+        if stable_split(item[0], 1.0 - validation_split, seed) == "train":
+            train.append(item)
+        else:
+            val.append(item)
+    return train, val
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """SHA-1 of a file's contents"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def stable_split(name, train_split=0.8, seed=42):
+    """Assign a file name to "train" or "val".
+
+    The split depends only on the name and the seed, so adding images
+    never moves existing ones between splits.
+    """
+    bucket = zlib.crc32(f"{seed}:{name}".encode("utf-8")) / 0xFFFFFFFF
+    return "train" if bucket < train_split else "val"
+
+
+def _reflink(src, dst):
+    import fcntl
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+    shutil.copystat(src, dst)
+
+
+def place_file(src, dst, mode="copy"):
+    """Put src at dst using the requested mode.
+
+    "auto" tries a hardlink, then a reflink, then falls back to a copy.
+    Returns the method that was actually used.
+    """
+    if dst.exists() or dst.is_symlink():
+        dst.unlink()
+
+    if mode in ("auto", "hardlink"):
+        try:
+            os.link(src, dst)
+            return "hardlink"
+        except OSError:
+            if mode == "hardlink":
+                raise
+
+    if mode in ("auto", "reflink"):
+        try:
+            _reflink(src, dst)
+            return "reflink"
+        except (OSError, ImportError):
+            if dst.exists():
+                dst.unlink()
+            if mode == "reflink":
+                raise
+
+    shutil.copy2(src, dst)
+    return "copy"
+
+
+def load_manifest(path):
+    """Load a manifest, returning an empty one if missing or unreadable"""
+    path = Path(path)
+    if path.exists():
+        try:
+            with open(path) as f:
+                manifest = json.load(f)
+            if manifest.get("version") == MANIFEST_VERSION:
+                return manifest
+        except (OSError, ValueError):
+            pass
+    return {"version": MANIFEST_VERSION, "files": {}}
+
+
+def save_manifest(path, manifest):
+    """Atomically write a manifest"""
+    path = Path(path)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def sync_split(image_files, detection_dir, train_split=0.8, seed=42,
+               mode="copy", workers=8):
+    """Sync images into detection_dir/images/{train,val} incrementally.
+
+    Files whose source path, size and mtime match the manifest and whose
+    destination still exists are left alone. Everything else is hashed
+    and placed in parallel. Destinations for images that are no longer
+    part of the source set are removed.
+
+    Returns (train_count, val_count, stats) or None if no images.
+    """
+    detection_dir = Path(detection_dir)
+    manifest_path = detection_dir / MANIFEST_NAME
+    manifest = load_manifest(manifest_path)
+    old_files = manifest["files"]
+    if manifest.get("seed") != seed or manifest.get("train_split") != train_split:
+        # A different split definition invalidates every placement
+        old_files = {name: dict(entry, split=None) for name, entry in old_files.items()}
+
+    for split in ("train", "val"):
+        (detection_dir / "images" / split).mkdir(parents=True, exist_ok=True)
+
+    new_files = {}
+    pending = []
+    counts = {"train": 0, "val": 0}
+    for src in image_files:
+        src = Path(src)
+        stat = src.stat()
+        split = stable_split(src.name, train_split, seed)
+        counts[split] += 1
+        dst = detection_dir / "images" / split / src.name
+        entry = old_files.get(src.name)
+        if (entry and entry.get("split") == split
+                and entry["source"] == str(src.absolute())
+                and entry["size"] == stat.st_size
+                and entry["mtime"] == stat.st_mtime
+                and dst.exists()):
+            new_files[src.name] = entry
+            continue
+        pending.append((src, dst, split, stat))
+
+    def _place(job):
+        src, dst, split, stat = job
+        method = place_file(src, dst, mode)
+        return src.name, method, {
+            "source": str(src.absolute()),
+            "split": split,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "sha1": file_hash(src),
+        }
+
+    stats = {"unchanged": len(new_files), "placed": 0, "removed": 0,
+             "hardlink": 0, "reflink": 0, "copy": 0}
+    if pending:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for name, method, entry in pool.map(_place, pending):
+                new_files[name] = entry
+                stats["placed"] += 1
+                stats[method] += 1
+
+    # Drop stale placements: removed sources or files that changed split
+    for name, entry in old_files.items():
+        for split in ("train", "val"):
+            if name in new_files and new_files[name]["split"] == split:
+                continue
+            stale = detection_dir / "images" / split / name
+            if stale.exists():
+                stale.unlink()
+                stats["removed"] += 1
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "seed": seed,
+        "train_split": train_split,
+        "files": new_files,
+    }
+    save_manifest(manifest_path, manifest)
+    return counts["train"], counts["val"], stats
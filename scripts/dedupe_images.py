@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+SolSolve Near-Duplicate Image Detection
+
+Video frames and burst snapshots are mostly near-identical table states.
+This script:
+1. Computes perceptual hashes (dHash or pHash) in a process pool
+2. Clusters images whose hashes are within a Hamming radius using a BK-tree
+3. Keeps one representative per cluster
+
+The index is persisted next to the images, so re-runs only hash new files.
+
+Usage:
+    python dedupe_images.py --image-dir raw_images
+    python dedupe_images.py --image-dir raw_images --output-dir deduped --link-mode auto
+"""
+
+import os
+import sys
+import json
+import pickle
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from dataset_utils import find_images, place_file, LINK_MODES
+
+INDEX_NAME = ".dedupe_index.pkl"
+INDEX_VERSION = 1
+HASH_KINDS = ["dhash", "phash"]
+
+
+def hamming(a, b):
+    """Number of differing bits between two hashes"""
+    return bin(a ^ b).count("1")
+
+
+def _bits_to_int(bits):
+    value = 0
+    for bit in bits.ravel():
+        value = (value << 1) | int(bit)
+    return value
+
+
+def image_hash(path, kind="dhash"):
+    """64-bit perceptual hash of an image, or None if it can't be read"""
+    import cv2
+    import numpy as np
+
+    # Reduced decode lets libjpeg skip most of the IDCT work
+    img = cv2.imread(str(path), cv2.IMREAD_REDUCED_GRAYSCALE_4)
+    if img is None:
+        return None
+
+    if kind == "phash":
+        small = cv2.resize(img, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+        low = cv2.dct(small)[:8, :8]
+        median = np.median(low.ravel()[1:])
+        return _bits_to_int(low > median)
+
+    small = cv2.resize(img, (9, 8), interpolation=cv2.INTER_AREA)
+    return _bits_to_int(small[:, 1:] > small[:, :-1])
+
+
+def _hash_job(args):
+    path, kind = args
+    try:
+        return path, image_hash(path, kind)
+    except Exception:
+        return path, None
+
+
+def compute_hashes(paths, kind="dhash", workers=None):
+    """Hash images in a process pool. Returns {path: hash}"""
+    paths = [str(p) for p in paths]
+    if not paths:
+        return {}
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, min(256, len(paths) // (workers * 4)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return dict(pool.map(_hash_job, [(p, kind) for p in paths], chunksize=chunksize))
+
+
+class BKTree:
+    """BK-tree over 64-bit hashes under Hamming distance.
+
+    Stored as flat lists so it pickles compactly and queries iteratively.
+    """
+
+    def __init__(self):
+        self.hashes = []
+        self.items = []
+        self.children = []
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def to_state(self):
+        return {"hashes": self.hashes, "items": self.items, "children": self.children}
+
+    @classmethod
+    def from_state(cls, state):
+        tree = cls()
+        tree.hashes = state["hashes"]
+        tree.items = state["items"]
+        tree.children = state["children"]
+        return tree
+
+    def add(self, h, item):
+        node_id = len(self.hashes)
+        self.hashes.append(h)
+        self.items.append(item)
+        self.children.append({})
+        if node_id == 0:
+            return
+        node = 0
+        while True:
+            d = hamming(h, self.hashes[node])
+            child = self.children[node].get(d)
+            if child is None:
+                self.children[node][d] = node_id
+                return
+            node = child
+
+    def search(self, h, radius):
+        """Return [(distance, item)] for all hashes within radius"""
+        if not self.hashes:
+            return []
+        found = []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            d = hamming(h, self.hashes[node])
+            if d <= radius:
+                found.append((d, self.items[node]))
+            for child_d, child in self.children[node].items():
+                if d - radius <= child_d <= d + radius:
+                    stack.append(child)
+        return found
+
+    def nearest(self, h, radius):
+        """Closest item within radius, or None"""
+        found = self.search(h, radius)
+        return min(found)[1] if found else None
+
+
+class DedupeIndex:
+    """Persistent hash cache + representative BK-tree + cluster map.
+
+    Only plain containers are pickled, so the index loads from any script.
+    """
+
+    def __init__(self, kind="dhash", threshold=6):
+        self.kind = kind
+        self.threshold = threshold
+        self.entries = {}   # path -> (size, mtime, hash)
+        self.tree = BKTree()
+        self.clusters = {}  # representative path -> [member paths]
+
+    @classmethod
+    def load(cls, path, kind="dhash", threshold=6):
+        path = Path(path)
+        if path.exists():
+            try:
+                with open(path, 'rb') as f:
+                    state = pickle.load(f)
+                if state.get("version") == INDEX_VERSION and state["kind"] == kind:
+                    index = cls(kind, state["threshold"])
+                    index.entries = state["entries"]
+                    index.tree = BKTree.from_state(state["tree"])
+                    index.clusters = state["clusters"]
+                    if state["threshold"] != threshold:
+                        # Hashes are still valid, only clustering changes
+                        index.threshold = threshold
+                        index._recluster()
+                    return index
+            except (OSError, pickle.UnpicklingError, KeyError, EOFError):
+                pass
+        return cls(kind, threshold)
+
+    def save(self, path):
+        path = Path(path)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({
+                "version": INDEX_VERSION,
+                "kind": self.kind,
+                "threshold": self.threshold,
+                "entries": self.entries,
+                "tree": self.tree.to_state(),
+                "clusters": self.clusters,
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def _assign(self, path, h):
+        rep = self.tree.nearest(h, self.threshold)
+        if rep is None:
+            self.tree.add(h, path)
+            self.clusters[path] = [path]
+        else:
+            self.clusters[rep].append(path)
+
+    def _recluster(self):
+        self.tree = BKTree()
+        self.clusters = {}
+        for path in sorted(self.entries):
+            self._assign(path, self.entries[path][2])
+
+    def update(self, image_files, workers=None):
+        """Bring the index in line with image_files. Returns number hashed"""
+        current = {}
+        for p in image_files:
+            stat = Path(p).stat()
+            current[str(p)] = (stat.st_size, stat.st_mtime)
+
+        removed = [p for p in self.entries if p not in current]
+        changed = [p for p, (size, mtime) in current.items()
+                   if p not in self.entries or self.entries[p][:2] != (size, mtime)]
+        modified = [p for p in changed if p in self.entries]
+
+        hashes = compute_hashes(changed, self.kind, workers)
+        for p in changed:
+            h = hashes.get(p)
+            if h is None:
+                self.entries.pop(p, None)
+                continue
+            self.entries[p] = current[p] + (h,)
+        for p in removed:
+            del self.entries[p]
+
+        if removed or modified:
+            self._recluster()
+        else:
+            for p in sorted(changed):
+                if p in self.entries:
+                    self._assign(p, self.entries[p][2])
+        return len(changed)
+
+    def representatives(self):
+        return sorted(self.clusters)
+
+
+def select_representatives(image_files, threshold=6, kind="dhash", index_path=None, workers=None):
+    """Return one image per near-duplicate cluster (plus the index)"""
+    image_files = [Path(p) for p in image_files]
+    if index_path is None:
+        index_path = image_files[0].parent / INDEX_NAME if image_files else INDEX_NAME
+    index = DedupeIndex.load(index_path, kind, threshold)
+    hashed = index.update(image_files, workers)
+    index.save(index_path)
+    print(f"🔍 Hashed {hashed} new/changed images, "
+          f"{len(image_files) - hashed} from cache ({kind}, radius {threshold})")
+    keep = set(str(p) for p in image_files)
+    reps = [Path(p) for p in index.representatives() if p in keep]
+    return reps, index
+
+
+def print_report(index, top=10):
+    sizes = sorted(((len(m), rep) for rep, m in index.clusters.items()), reverse=True)
+    total = sum(size for size, _ in sizes)
+    print(f"📊 {total} images in {len(sizes)} clusters "
+          f"({total - len(sizes)} near-duplicates)")
+    for size, rep in sizes[:top]:
+        if size > 1:
+            print(f"   {size:5d}  {Path(rep).name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SolSolve near-duplicate image detection")
+    parser.add_argument("--image-dir", type=str, required=True, help="Directory of raw images / frames")
+    parser.add_argument("--threshold", type=int, default=6, help="Max Hamming distance (of 64 bits) for duplicates")
+    parser.add_argument("--hash", choices=HASH_KINDS, default="dhash", help="Perceptual hash type")
+    parser.add_argument("--workers", type=int, default=None, help="Hashing processes (default: all cores)")
+    parser.add_argument("--index", type=str, default=None, help=f"Index file (default: <image-dir>/{INDEX_NAME})")
+    parser.add_argument("--clusters-json", type=str, default=None, help="Write the cluster map to this JSON file")
+    parser.add_argument("--output-dir", type=str, default=None, help="Place one representative per cluster here")
+    parser.add_argument("--link-mode", choices=LINK_MODES, default="auto", help="How to place representatives")
+
+    args = parser.parse_args()
+
+    image_files = find_images(args.image_dir)
+    if not image_files:
+        print(f"❌ No images found in {args.image_dir}")
+        sys.exit(1)
+
+    index_path = args.index or Path(args.image_dir) / INDEX_NAME
+    reps, index = select_representatives(image_files, args.threshold, args.hash, index_path, args.workers)
+    print_report(index)
+
+    if args.clusters_json:
+        with open(args.clusters_json, 'w') as f:
+            json.dump(index.clusters, f, indent=1)
+        print(f"✓ Cluster map written to {args.clusters_json}")
+
+    if args.output_dir:
+        output_dir = Path(args.output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        for rep in reps:
+            place_file(rep, output_dir / rep.name, args.link_mode)
+        print(f"✓ {len(reps)} representatives placed in {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
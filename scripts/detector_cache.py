@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+SolSolve Detector Image Cache
+
+Keeps a copy of the detection split with every image pre-resized to the
+detector's training size, so YOLO epochs decode small images instead of
+re-reading full-resolution photos:
+
+    detection_data/cache_<size>/
+        manifest.json               # source sha1 and split of each cached image
+        data.yaml                   # the split's classes, pointing at the cache
+        images/{train,val}/<stem>.png   # long side = size (smaller images kept as is), lossless
+        labels/{train,val}/<stem>.txt   # copies; YOLO boxes are normalized, so resizing keeps them valid
+
+Images are validated by their content hash in the dataset catalog
+(dataset_catalog.py): only new, changed or re-split images are resized,
+and images that left the split are dropped.
+
+Usage:
+    python detector_cache.py --data-dir training_data/detection_data
+    python detector_cache.py --data-dir training_data/detection_data --size 320
+"""
+
+import os
+import shutil
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from dataset_utils import load_manifest, save_manifest, MANIFEST_NAME
+from dataset_catalog import DatasetCatalog
+
+SPLITS = ("train", "val")
+
+
+def default_cache_dir(detection_dir, size):
+    return Path(detection_dir) / f"cache_{size}"
+
+
+def _resize_image(job):
+    """Decode at a reduced scale, shrink the long side to size and write a PNG atomically"""
+    src, dst, size = job
+    import cv2
+    from auto_label import read_reduced
+
+    img = read_reduced(src, size)
+    if img is None:
+        return dst, None
+    h, w = img.shape[:2]
+    scale = size / max(h, w)
+    if scale < 1:
+        img = cv2.resize(img, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+    tmp_path = dst.with_name(dst.stem + ".tmp.png")
+    if not cv2.imwrite(str(tmp_path), img, [cv2.IMWRITE_PNG_COMPRESSION, 1]):
+        return dst, None
+    os.replace(tmp_path, dst)
+    return dst, img.shape[:2]
+
+
+def _sync_labels(detection_dir, cache_dir):
+    """Mirror labels/{train,val} into the cache, copying only changed files"""
+    copied = 0
+    for split in SPLITS:
+        src_dir = detection_dir / "labels" / split
+        dst_dir = cache_dir / "labels" / split
+        dst_dir.mkdir(parents=True, exist_ok=True)
+        wanted = set()
+        if src_dir.is_dir():
+            for src in src_dir.glob("*.txt"):
+                wanted.add(src.name)
+                dst = dst_dir / src.name
+                stat = src.stat()
+                if dst.exists():
+                    dst_stat = dst.stat()
+                    if dst_stat.st_size == stat.st_size and dst_stat.st_mtime == stat.st_mtime:
+                        continue
+                shutil.copy2(src, dst)
+                copied += 1
+        for stale in dst_dir.glob("*.txt"):
+            if stale.name not in wanted:
+                stale.unlink()
+    return copied
+
+
+def _write_data_yaml(detection_dir, cache_dir):
+    import yaml
+
+    with open(detection_dir / "data.yaml") as f:
+        config = yaml.safe_load(f)
+    config.update(path=str(cache_dir.absolute()), train="images/train", val="images/val")
+    with open(cache_dir / "data.yaml", 'w') as f:
+        yaml.dump(config, f, default_flow_style=False)
+    return cache_dir / "data.yaml"
+
+
+def build_image_cache(detection_dir, size, cache_dir=None, workers=None, hashes=None):
+    """Bring the resized copy of detection_dir up to date.
+
+    hashes are the catalog's detection_hashes(); without them the catalog
+    of detection_dir's parent is updated and read. Returns (data.yaml of
+    the cache, stats) or (None, stats) if the split has no images or no
+    data.yaml.
+    """
+    detection_dir = Path(detection_dir)
+    cache_dir = Path(cache_dir) if cache_dir else default_cache_dir(detection_dir, size)
+    stats = {"unchanged": 0, "resized": 0, "removed": 0, "failed": 0, "labels": 0}
+
+    if hashes is None:
+        with DatasetCatalog(detection_dir.parent, workers=workers or 8) as catalog:
+            catalog.update(["detection"])
+            hashes = catalog.detection_hashes()
+    rel_paths = sorted(rel for rel in hashes if rel.startswith("images/"))
+    if not rel_paths or not (detection_dir / "data.yaml").exists():
+        return None, stats
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = cache_dir / MANIFEST_NAME
+    manifest = load_manifest(manifest_path)
+    if manifest.get("size") != size:
+        manifest = {"version": manifest["version"], "size": size, "files": {}}
+    old_files = manifest["files"]
+
+    new_files, pending = {}, []
+    for rel in rel_paths:
+        cached = str(Path(rel).with_suffix('.png'))
+        entry = old_files.get(rel)
+        if entry and entry["sha1"] == hashes[rel] and (cache_dir / cached).exists():
+            new_files[rel] = entry
+            stats["unchanged"] += 1
+        else:
+            pending.append((rel, cached))
+
+    keep = {entry["cached"] for entry in new_files.values()} | {cached for _, cached in pending}
+    for split in SPLITS:
+        image_dir = cache_dir / "images" / split
+        image_dir.mkdir(parents=True, exist_ok=True)
+        for old in image_dir.iterdir():
+            if f"images/{split}/{old.name}" not in keep:
+                old.unlink()
+                stats["removed"] += 1
+
+    if pending:
+        print(f"🖼️  Resizing {len(pending)} detection images to {size}px into {cache_dir}...")
+        workers = workers or os.cpu_count() or 1
+        by_dst = {cache_dir / cached: (rel, cached) for rel, cached in pending}
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_resize_image, (str(detection_dir / rel), cache_dir / cached, size))
+                           for rel, cached in pending]
+                for future in as_completed(futures):
+                    dst, shape = future.result()
+                    rel, cached = by_dst[dst]
+                    if shape is None:
+                        print(f"⚠️  Could not decode {rel}; left out of the cache")
+                        stats["failed"] += 1
+                        continue
+                    new_files[rel] = {"sha1": hashes[rel], "cached": cached,
+                                      "width": shape[1], "height": shape[0]}
+                    stats["resized"] += 1
+        finally:
+            # An interrupted build keeps what it finished
+            manifest["files"] = new_files
+            save_manifest(manifest_path, manifest)
+    elif len(new_files) != len(old_files):
+        manifest["files"] = new_files
+        save_manifest(manifest_path, manifest)
+
+    stats["labels"] = _sync_labels(detection_dir, cache_dir)
+    data_yaml = _write_data_yaml(detection_dir, cache_dir)
+    print(f"✓ Image cache {cache_dir.name}: {stats['unchanged']} unchanged, {stats['resized']} resized, "
+          f"{stats['removed']} removed, {stats['labels']} labels updated")
+    return data_yaml, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-resize SolSolve detection images for training")
+    parser.add_argument("--data-dir", type=str, required=True, help="Detection split, e.g. training_data/detection_data")
+    parser.add_argument("--size", type=int, default=416, help="Training input size in pixels (long side)")
+    parser.add_argument("--cache-dir", type=str, default=None, help="Output directory (default: <data-dir>/cache_<size>)")
+    parser.add_argument("--workers", type=int, default=None, help="Resize processes (default: all cores)")
+
+    args = parser.parse_args()
+
+    data_yaml, _ = build_image_cache(args.data_dir, args.size, args.cache_dir, args.workers)
+    if data_yaml is None:
+        print(f"❌ No images or data.yaml in {args.data_dir}")
+        return
+    print(f"   Train on it with data={data_yaml}")
+
+
+if __name__ == "__main__":
+    main()
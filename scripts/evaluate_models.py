@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+SolSolve Model Evaluation
+
+Measures trained models on the validation split:
+1. Detector: per-class precision/recall, AP@0.5 and mAP@0.5:0.95 on
+   detection_data/images/val
+2. Classifiers: accuracy and per-class recall on the val split of
+   rank_data/, suit_data/ (and card52_data/)
+
+The validation set is sharded across a process pool; every worker loads
+one TFLite interpreter per model once and keeps it for all its shards.
+Per-image (and per-crop) results stream to a JSONL file as shards
+finish, and the aggregated metrics plus images/sec are written at the end.
+
+Usage:
+    python evaluate_models.py --data-dir training_data --models-dir trained_models
+    python evaluate_models.py --data-dir training_data --models detector --workers 8
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from dataset_utils import split_class_files
+from dataset_catalog import DatasetCatalog
+
+# Low score floor for AP, as in ultralytics val; precision/recall are
+# reported at the config's confidenceThreshold
+EVAL_CONFIDENCE = 0.001
+IOU_THRESHOLDS = np.round(np.linspace(0.5, 0.95, 10), 2)
+CLASSIFIERS = ["rank", "suit", "card52"]
+
+_WORKER = {}
+
+
+def _init_worker(kind, model_path, input_size, labels, nms_iou, threads):
+    """Load this worker's interpreter once"""
+    import cv2
+    from inference_engine import YoloDetector, BatchedClassifier
+
+    if kind == "detector":
+        _WORKER["model"] = YoloDetector(model_path, input_size, EVAL_CONFIDENCE, nms_iou, threads)
+    else:
+        _WORKER["model"] = BatchedClassifier(model_path, labels, input_size, 0.0, threads)
+    _WORKER["input_size"] = input_size
+    # One interpreter per core already saturates the machine
+    cv2.setNumThreads(1)
+
+
+def match_detections(boxes, scores, class_ids, gt_boxes, gt_classes, iou_thresholds=IOU_THRESHOLDS):
+    """Greedy score-ordered matching per class. Returns an (N, T) true-positive matrix"""
+    from yolo_postprocess import box_iou_matrix
+
+    tp = np.zeros((len(scores), len(iou_thresholds)), dtype=bool)
+    for cls in np.unique(class_ids):
+        dets = np.flatnonzero(class_ids == cls)
+        gts = np.flatnonzero(gt_classes == cls)
+        if len(gts) == 0:
+            continue
+        dets = dets[np.argsort(-scores[dets], kind="stable")]
+        ious = box_iou_matrix(boxes[dets], gt_boxes[gts])
+        for t, threshold in enumerate(iou_thresholds):
+            taken = np.zeros(len(gts), dtype=bool)
+            for row, det in enumerate(dets):
+                candidates = np.where(taken | (ious[row] < threshold), -1.0, ious[row])
+                best = int(np.argmax(candidates))
+                if candidates[best] >= 0:
+                    taken[best] = True
+                    tp[det, t] = True
+    return tp
+
+
+def _detect_shard(jobs):
+    """Run the detector on a shard of (image, label) paths"""
+    import cv2
+    from corner_crops import read_yolo_labels
+
+    detector = _WORKER["model"]
+    records = []
+    for image_path, label_path in jobs:
+        image = cv2.imread(image_path)
+        if image is None:
+            continue
+        h, w = image.shape[:2]
+        start = time.perf_counter()
+        boxes, scores, class_ids = detector.detect(image)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        labels = read_yolo_labels(label_path)
+        gt_classes = labels[:, 0].astype(np.int64)
+        xc, yc, bw, bh = labels[:, 1] * w, labels[:, 2] * h, labels[:, 3] * w, labels[:, 4] * h
+        gt_boxes = np.stack([xc - bw / 2, yc - bh / 2, xc + bw / 2, yc + bh / 2], axis=1)
+        tp = match_detections(boxes, scores, class_ids, gt_boxes, gt_classes)
+
+        records.append({
+            "image": Path(image_path).name,
+            "ms": round(elapsed_ms, 2),
+            "ground_truth": gt_classes.tolist(),
+            "detections": [
+                {"class": int(c), "score": round(float(s), 4),
+                 "box": [round(float(v), 1) for v in b], "tp": t.astype(int).tolist()}
+                for b, s, c, t in zip(boxes, scores, class_ids, tp)
+            ],
+        })
+    return records
+
+
+def _classify_shard(jobs):
+    """Classify a shard of (crop path, relative name, true label) jobs"""
+    from crop_shards import _load_crop
+
+    classifier = _WORKER["model"]
+    size = _WORKER["input_size"]
+    crops, kept = [], []
+    for path, name, label in jobs:
+        crop = _load_crop((path, size))
+        if crop is not None:
+            crops.append(crop)
+            kept.append((name, label))
+    if not crops:
+        return []
+
+    start = time.perf_counter()
+    predictions, confidences = classifier.classify(np.stack(crops).astype(np.float32) / 255.0)
+    elapsed_ms = (time.perf_counter() - start) * 1000 / len(crops)
+    return [
+        {"file": name, "label": label, "prediction": pred, "confidence": round(float(conf), 4),
+         "ms": round(elapsed_ms, 3)}
+        for (name, label), pred, conf in zip(kept, predictions, confidences)
+    ]
+
+
+def average_precision(tp, scores, num_gt):
+    """COCO-style 101-point AP for each column of an (N, T) true-positive matrix"""
+    if num_gt == 0 or len(scores) == 0:
+        return np.zeros(tp.shape[1])
+    order = np.argsort(-scores, kind="stable")
+    tp = tp[order].astype(np.float64)
+    tp_cum = np.cumsum(tp, axis=0)
+    fp_cum = np.cumsum(1.0 - tp, axis=0)
+    recall = tp_cum / num_gt
+    precision = tp_cum / (tp_cum + fp_cum)
+    # Monotone precision envelope, then sample at 101 recall points
+    precision = np.flip(np.maximum.accumulate(np.flip(precision, axis=0), axis=0), axis=0)
+    points = np.linspace(0, 1, 101)
+    ap = np.zeros(tp.shape[1])
+    for t in range(tp.shape[1]):
+        idx = np.searchsorted(recall[:, t], points, side="left")
+        valid = idx < len(recall)
+        ap[t] = np.where(valid, precision[np.minimum(idx, len(recall) - 1), t], 0.0).mean()
+    return ap
+
+
+def summarize_detector(records, labels, conf_threshold):
+    """Per-class AP, precision and recall from streamed detector records"""
+    scores, classes, tps = [], [], []
+    gt_counts = np.zeros(len(labels), dtype=np.int64)
+    for record in records:
+        for cls in record["ground_truth"]:
+            gt_counts[cls] += 1
+        for det in record["detections"]:
+            scores.append(det["score"])
+            classes.append(det["class"])
+            tps.append(det["tp"])
+    scores = np.array(scores, dtype=np.float32)
+    classes = np.array(classes, dtype=np.int64)
+    tps = np.array(tps, dtype=bool).reshape(-1, len(IOU_THRESHOLDS))
+
+    per_class = {}
+    for cls, name in enumerate(labels):
+        mask = classes == cls
+        ap = average_precision(tps[mask], scores[mask], gt_counts[cls])
+        confident = mask & (scores >= conf_threshold)
+        true_positives = int(tps[confident, 0].sum())
+        per_class[name] = {
+            "instances": int(gt_counts[cls]),
+            "precision": true_positives / max(int(confident.sum()), 1),
+            "recall": true_positives / max(int(gt_counts[cls]), 1),
+            "ap50": float(ap[0]) if gt_counts[cls] else None,
+            "ap50_95": float(np.mean(ap)) if gt_counts[cls] else None,
+        }
+
+    present = [m for m in per_class.values() if m["instances"] > 0]
+    return {
+        "images": len(records),
+        "conf_threshold": conf_threshold,
+        "map50": float(np.mean([m["ap50"] for m in present])) if present else 0.0,
+        "map50_95": float(np.mean([m["ap50_95"] for m in present])) if present else 0.0,
+        "per_class": per_class,
+    }
+
+
+def summarize_classifier(records, classes):
+    """Accuracy and per-class precision/recall from streamed classifier records"""
+    per_class = {}
+    for name in classes:
+        truth = [r for r in records if r["label"] == name]
+        predicted = [r for r in records if r["prediction"] == name]
+        correct = sum(r["prediction"] == name for r in truth)
+        per_class[name] = {
+            "instances": len(truth),
+            "precision": correct / max(len(predicted), 1),
+            "recall": correct / max(len(truth), 1),
+        }
+    correct = sum(r["prediction"] == r["label"] for r in records)
+    return {
+        "crops": len(records),
+        "accuracy": correct / max(len(records), 1),
+        "per_class": per_class,
+    }
+
+
+def _run_pool(kind, model_path, input_size, labels, nms_iou, shards, worker_fn, workers, threads, out):
+    """Fan shards out to workers, streaming records to out. Returns (records, seconds)"""
+    records = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(kind, str(model_path), input_size, labels, nms_iou, threads)) as pool:
+        futures = [pool.submit(worker_fn, shard) for shard in shards]
+        for future in as_completed(futures):
+            for record in future.result():
+                out.write(json.dumps({"model": kind, **record}) + "\n")
+                records.append(record)
+    return records, time.perf_counter() - start
+
+
+def evaluate_detector(data_dir, models_dir, config, catalog, workers, threads, shard_size, out):
+    detector = config["detector"]
+    model_path = models_dir / detector["file"]
+    if not model_path.exists():
+        print(f"⚠️  Skipping detector: {model_path} not found")
+        return None
+
+    catalog.update(["detection"])
+    jobs = [(str(data_dir / image), str(data_dir / label)) for image, label in catalog.labeled_images("val")]
+    if not jobs:
+        print(f"⚠️  Skipping detector: no labeled images in {data_dir / 'detection_data' / 'images' / 'val'}")
+        return None
+
+    shards = [jobs[i:i + shard_size] for i in range(0, len(jobs), shard_size)]
+    print(f"🔍 Detector: {len(jobs)} val images in {len(shards)} shards on {workers} workers...")
+    records, elapsed = _run_pool(
+        "detector", model_path, int(detector["inputSize"]), detector["labels"],
+        float(detector.get("nmsIoU", 0.45)), shards, _detect_shard, workers, threads, out)
+
+    summary = summarize_detector(records, detector["labels"], float(detector.get("confidenceThreshold", 0.35)))
+    summary["seconds"] = round(elapsed, 2)
+    summary["images_per_sec"] = round(len(records) / elapsed, 1) if elapsed else 0.0
+    summary["mean_inference_ms"] = round(float(np.mean([r["ms"] for r in records])), 2) if records else 0.0
+    return summary
+
+
+def evaluate_classifier(name, data_dir, models_dir, config, catalog, workers, threads, shard_size,
+                        validation_split, seed, out):
+    class_dir = data_dir / f"{name}_data"
+    model_path = models_dir / config.get(name, {}).get("file", f"{name}.tflite")
+    if not model_path.exists() or not class_dir.exists():
+        print(f"⚠️  Skipping {name}: {model_path.name} or {class_dir.name}/ not found")
+        return None
+
+    # Model outputs follow the sorted class directories, as in train_models.py
+    catalog.update([name])
+    classes, files = catalog.class_files(name)
+    _, val_files = split_class_files(files, validation_split, seed)
+    if not val_files:
+        print(f"⚠️  Skipping {name}: no validation crops")
+        return None
+
+    jobs = [(str(class_dir / rel), rel, classes[class_id]) for rel, class_id in val_files]
+    shards = [jobs[i:i + shard_size] for i in range(0, len(jobs), shard_size)]
+    input_size = int(config.get(name, {}).get("inputSize", 64))
+    print(f"🔍 {name}: {len(jobs)} val crops in {len(shards)} shards on {workers} workers...")
+    records, elapsed = _run_pool(name, model_path, input_size, classes, None, shards,
+                                 _classify_shard, workers, threads, out)
+
+    summary = summarize_classifier(records, classes)
+    summary["seconds"] = round(elapsed, 2)
+    summary["images_per_sec"] = round(len(records) / elapsed, 1) if elapsed else 0.0
+    return summary
+
+
+def print_summary(results):
+    """Print the aggregated metrics"""
+    print("\n📊 Evaluation results")
+    print("=" * 60)
+    detector = results.get("detector")
+    if detector:
+        print(f"Detector: mAP@0.5 {detector['map50']:.3f}, mAP@0.5:0.95 {detector['map50_95']:.3f} "
+              f"({detector['images']} images, {detector['images_per_sec']} images/sec)")
+        print(f"   {'class':<22}{'inst':>6}{'P':>8}{'R':>8}{'AP50':>8}{'AP50-95':>9}")
+        for name, m in detector["per_class"].items():
+            if m["instances"] == 0:
+                print(f"   {name:<22}{0:>6}{'-':>8}{'-':>8}{'-':>8}{'-':>9}")
+                continue
+            print(f"   {name:<22}{m['instances']:>6}{m['precision']:>8.3f}{m['recall']:>8.3f}"
+                  f"{m['ap50']:>8.3f}{m['ap50_95']:>9.3f}")
+    for name in CLASSIFIERS:
+        summary = results.get(name)
+        if not summary:
+            continue
+        print(f"{name.capitalize()}: accuracy {summary['accuracy']:.3f} "
+              f"({summary['crops']} crops, {summary['images_per_sec']} crops/sec)")
+        weakest = sorted(summary["per_class"].items(), key=lambda kv: kv[1]["recall"])[:3]
+        print("   lowest recall: " + ", ".join(f"{k} {v['recall']:.2f}" for k, v in weakest))
+
+
+def evaluate_models(data_dir, models_dir="trained_models", models=None, workers=None, threads=1,
+                    validation_split=0.2, seed=42, results_path=None, detector_shard=8, classifier_shard=256):
+    """Evaluate the selected models and write JSONL records plus a summary"""
+    data_dir = Path(data_dir)
+    models_dir = Path(models_dir)
+    config_path = models_dir / "config.json"
+    if not config_path.exists():
+        print(f"❌ {config_path} not found")
+        return None
+    with open(config_path) as f:
+        config = json.load(f)
+
+    models = models or ["detector"] + [name for name in CLASSIFIERS if name in config]
+    workers = workers or os.cpu_count() or 1
+    results_path = Path(results_path) if results_path else models_dir / "eval_results.jsonl"
+
+    results = {}
+    with open(results_path, 'w') as out, DatasetCatalog(data_dir, workers=workers) as catalog:
+        for name in models:
+            if name == "detector":
+                summary = evaluate_detector(data_dir, models_dir, config, catalog, workers, threads,
+                                            detector_shard, out)
+            else:
+                summary = evaluate_classifier(name, data_dir, models_dir, config, catalog, workers, threads,
+                                              classifier_shard, validation_split, seed, out)
+            if summary:
+                results[name] = summary
+
+    summary_path = results_path.with_name("eval_summary.json")
+    with open(summary_path, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    print_summary(results)
+    print(f"\n✓ Per-image results: {results_path}")
+    print(f"✓ Summary: {summary_path}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate SolSolve models on the validation split")
+    parser.add_argument("--data-dir", type=str, required=True, help="Training data directory")
+    parser.add_argument("--models-dir", type=str, default="trained_models", help="Directory with config.json and .tflite models")
+    parser.add_argument("--models", nargs="+", choices=["detector"] + CLASSIFIERS, default=None,
+                        help="Models to evaluate (default: all in config.json)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--threads", type=int, default=1, help="Interpreter threads per worker")
+    parser.add_argument("--validation-split", type=float, default=0.2, help="Classifier validation fraction")
+    parser.add_argument("--seed", type=int, default=42, help="Seed of the stable train/val split")
+    parser.add_argument("--results", type=str, default=None, help="JSONL output (default: <models-dir>/eval_results.jsonl)")
+
+    args = parser.parse_args()
+
+    results = evaluate_models(args.data_dir, args.models_dir, args.models, args.workers, args.threads,
+                              args.validation_split, args.seed, args.results)
+    if results is None:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+SolSolve Reference Inference Engine
+
+Runs the on-device model chain offline, driven by the app's config.json:
+1. detector.tflite at its inputSize (letterboxed, like ultralytics),
+   decoded with yolo_postprocess
+2. top-left corner crop of every face-up card
+3. rank + suit (or card52) classification of all crops in one batched invoke
+
+Interpreters are created once per model and reused across snapshots.
+
+Usage:
+    python inference_engine.py --models-dir ../app/src/main/assets/models snapshot.jpg
+    python inference_engine.py --models-dir trained_models --benchmark 50 snapshot.jpg
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+import yolo_postprocess
+from corner_crops import corner_rois, extract_crops
+
+SUIT_CODES = {"clubs": "C", "diamonds": "D", "hearts": "H", "spades": "S"}
+LETTERBOX_COLOR = (114, 114, 114)
+
+
+def _interpreter_module():
+    """Prefer the lightweight tflite_runtime; fall back to TensorFlow"""
+    try:
+        import tflite_runtime.interpreter as tflite
+        return tflite
+    except ImportError:
+        import tensorflow as tf
+        return tf.lite
+
+
+def load_interpreter(model_path, num_threads=None, use_xnnpack=True):
+    """Create and allocate a TFLite interpreter"""
+    tflite = _interpreter_module()
+    kwargs = {"model_path": str(model_path), "num_threads": num_threads}
+    if not use_xnnpack:
+        resolver = getattr(tflite, "OpResolverType", None) or tflite.experimental.OpResolverType
+        kwargs["experimental_op_resolver_type"] = resolver.BUILTIN_WITHOUT_DEFAULT_DELEGATES
+    interpreter = tflite.Interpreter(**kwargs)
+    interpreter.allocate_tensors()
+    return interpreter
+
+
+def quantize_input(x, detail):
+    """Map float inputs to the interpreter's input dtype"""
+    dtype = detail["dtype"]
+    if dtype in (np.int8, np.uint8):
+        scale, zero_point = detail["quantization"]
+        info = np.iinfo(dtype)
+        return np.clip(np.round(x / scale + zero_point), info.min, info.max).astype(dtype)
+    return x.astype(dtype)
+
+
+def dequantize_output(y, detail):
+    """Map a quantized output tensor back to float32"""
+    if detail["dtype"] in (np.int8, np.uint8):
+        scale, zero_point = detail["quantization"]
+        return (y.astype(np.float32) - zero_point) * scale
+    return y.astype(np.float32)
+
+
+def letterbox(image, size):
+    """Resize keeping aspect ratio and pad to size x size.
+
+    Returns (padded image, scale, (pad_x, pad_y)).
+    """
+    h, w = image.shape[:2]
+    scale = min(size / w, size / h)
+    new_w, new_h = int(round(w * scale)), int(round(h * scale))
+    resized = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+    padded = np.full((size, size, 3), LETTERBOX_COLOR, dtype=np.uint8)
+    padded[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = resized
+    return padded, scale, (pad_x, pad_y)
+
+
+class BatchedClassifier:
+    """One interpreter per classifier; all crops of a snapshot in one invoke.
+
+    The batch dimension only ever grows to the next power of two, so after
+    warm-up no call has to reallocate tensors.
+    """
+
+    def __init__(self, model_path, labels, input_size, confidence_threshold, num_threads=None):
+        self.labels = labels
+        self.input_size = input_size
+        self.confidence_threshold = confidence_threshold
+        self.interpreter = load_interpreter(model_path, num_threads)
+        self.input_detail = self.interpreter.get_input_details()[0]
+        self.output_index = self.interpreter.get_output_details()[0]["index"]
+        self.batch_capacity = int(self.input_detail["shape"][0])
+
+    def _ensure_capacity(self, n):
+        if n <= self.batch_capacity:
+            return
+        capacity = 1 << (n - 1).bit_length()
+        self.interpreter.resize_tensor_input(
+            self.input_detail["index"], [capacity, self.input_size, self.input_size, 3])
+        self.interpreter.allocate_tensors()
+        self.input_detail = self.interpreter.get_input_details()[0]
+        self.batch_capacity = capacity
+
+    def classify(self, crops):
+        """crops: (N, S, S, 3) float32 RGB in [0, 1]. Returns (labels, confidences)"""
+        n = len(crops)
+        if n == 0:
+            return [], np.zeros((0,), np.float32)
+        self._ensure_capacity(n)
+        batch = np.zeros((self.batch_capacity,) + crops.shape[1:], dtype=np.float32)
+        batch[:n] = crops
+        self.interpreter.set_tensor(self.input_detail["index"], quantize_input(batch, self.input_detail))
+        self.interpreter.invoke()
+        output_detail = self.interpreter.get_output_details()[0]
+        probs = dequantize_output(self.interpreter.get_tensor(self.output_index)[:n], output_detail)
+        ids = np.argmax(probs, axis=1)
+        return [self.labels[i] for i in ids], probs[np.arange(n), ids]
+
+
+class YoloDetector:
+    """detector.tflite with letterboxing and yolo_postprocess decoding"""
+
+    def __init__(self, model_path, input_size, confidence_threshold=yolo_postprocess.DEFAULT_CONFIDENCE,
+                 nms_iou=yolo_postprocess.DEFAULT_NMS_IOU, num_threads=None):
+        self.input_size = input_size
+        self.confidence_threshold = confidence_threshold
+        self.nms_iou = nms_iou
+        self.interpreter = load_interpreter(model_path, num_threads)
+        self.input_detail = self.interpreter.get_input_details()[0]
+        self.output_detail = self.interpreter.get_output_details()[0]
+
+    def detect(self, image):
+        """Run on a BGR image. Returns boxes (xyxy, pixels), scores, class ids"""
+        padded, scale, (pad_x, pad_y) = letterbox(image, self.input_size)
+        x = cv2.cvtColor(padded, cv2.COLOR_BGR2RGB).astype(np.float32)[None] / 255.0
+        self.interpreter.set_tensor(self.input_detail["index"], quantize_input(x, self.input_detail))
+        self.interpreter.invoke()
+        raw = self.interpreter.get_tensor(self.output_detail["index"])
+        boxes, scores, class_ids = yolo_postprocess.decode(
+            raw, self.input_size, self.confidence_threshold, self.nms_iou,
+            quantization=self.output_detail["quantization"])
+        boxes = (boxes - np.array([pad_x, pad_y, pad_x, pad_y], np.float32)) / scale
+        h, w = image.shape[:2]
+        boxes[:, [0, 2]] = np.clip(boxes[:, [0, 2]], 0, w)
+        boxes[:, [1, 3]] = np.clip(boxes[:, [1, 3]], 0, h)
+        return boxes, scores, class_ids
+
+
+class SolSolveInference:
+    """Detector → corner crops → rank/suit (or card52) for a snapshot"""
+
+    def __init__(self, models_dir, num_threads=None):
+        self.models_dir = Path(models_dir)
+        with open(self.models_dir / "config.json") as f:
+            self.config = json.load(f)
+
+        detector = self.config["detector"]
+        self.detector_labels = detector["labels"]
+        self.detector = YoloDetector(
+            self.models_dir / detector["file"], int(detector["inputSize"]),
+            float(detector.get("confidenceThreshold", yolo_postprocess.DEFAULT_CONFIDENCE)),
+            float(detector.get("nmsIoU", yolo_postprocess.DEFAULT_NMS_IOU)), num_threads)
+        self.face_up_class = self.detector_labels.index("card_face_up")
+
+        self.classifiers = {}
+        names = ["card52"] if "card52" in self.config else ["rank", "suit"]
+        for name in names:
+            section = self.config[name]
+            self.classifiers[name] = BatchedClassifier(
+                self.models_dir / section["file"], section["labels"], int(section["inputSize"]),
+                float(section.get("confidenceThreshold", 0.6)), num_threads)
+
+    def detect(self, image):
+        """Run the detector on a BGR image. Returns boxes (xyxy, pixels), scores, class ids"""
+        return self.detector.detect(image)
+
+    def crop_cards(self, image, boxes, size):
+        """Corner crops for xyxy pixel boxes as (N, size, size, 3) float32 RGB in [0, 1]"""
+        h, w = image.shape[:2]
+        xywh = np.stack([(boxes[:, 0] + boxes[:, 2]) / 2 / w, (boxes[:, 1] + boxes[:, 3]) / 2 / h,
+                         (boxes[:, 2] - boxes[:, 0]) / w, (boxes[:, 3] - boxes[:, 1]) / h], axis=1)
+        crops = extract_crops(image, corner_rois(xywh, w, h), size)
+        return crops[..., ::-1].astype(np.float32) / 255.0
+
+    def analyze(self, image):
+        """Full chain on a BGR image. Returns a dict of cards, detections and timings"""
+        timings = {}
+        start = time.perf_counter()
+        boxes, scores, class_ids = self.detect(image)
+        timings["detect_ms"] = (time.perf_counter() - start) * 1000
+
+        face_up = class_ids == self.face_up_class
+        card_boxes, card_scores = boxes[face_up], scores[face_up]
+
+        start = time.perf_counter()
+        results = {}
+        for name, classifier in self.classifiers.items():
+            crops = self.crop_cards(image, card_boxes, classifier.input_size)
+            results[name] = classifier.classify(crops)
+        timings["classify_ms"] = (time.perf_counter() - start) * 1000
+
+        cards = []
+        for i, box in enumerate(card_boxes):
+            card = {"box": [round(float(v), 1) for v in box], "detector_confidence": round(float(card_scores[i]), 3)}
+            if "card52" in results:
+                labels, confs = results["card52"]
+                code, confidence = labels[i], float(confs[i])
+                card["confident"] = confidence >= self.classifiers["card52"].confidence_threshold
+            else:
+                rank, rank_conf = results["rank"][0][i], float(results["rank"][1][i])
+                suit, suit_conf = results["suit"][0][i], float(results["suit"][1][i])
+                code = f"{rank}{SUIT_CODES.get(suit, suit)}"
+                confidence = min(rank_conf, suit_conf)
+                card.update(rank=rank, suit=suit, rank_confidence=round(rank_conf, 3),
+                            suit_confidence=round(suit_conf, 3))
+                card["confident"] = (rank_conf >= self.classifiers["rank"].confidence_threshold and
+                                     suit_conf >= self.classifiers["suit"].confidence_threshold)
+            card.update(card=code, confidence=round(confidence, 3))
+            cards.append(card)
+
+        detections = [{"label": self.detector_labels[c], "confidence": round(float(s), 3),
+                       "box": [round(float(v), 1) for v in b]}
+                      for b, s, c in zip(boxes, scores, class_ids) if c != self.face_up_class]
+        return {"cards": cards, "detections": detections,
+                "timing_ms": {k: round(v, 2) for k, v in timings.items()}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the SolSolve model chain on snapshots")
+    parser.add_argument("images", nargs="+", help="Snapshot image files")
+    parser.add_argument("--models-dir", type=str, default="../app/src/main/assets/models",
+                        help="Directory with config.json and the .tflite models")
+    parser.add_argument("--threads", type=int, default=None, help="Interpreter threads per model")
+    parser.add_argument("--benchmark", type=int, default=0, help="Run N passes over the images and report snapshots/sec")
+
+    args = parser.parse_args()
+
+    engine = SolSolveInference(args.models_dir, args.threads)
+    images = []
+    for path in args.images:
+        image = cv2.imread(path)
+        if image is None:
+            print(f"⚠️  Could not read {path}", file=sys.stderr)
+            continue
+        images.append((path, image))
+    if not images:
+        print("❌ None of the images could be read")
+        sys.exit(1)
+
+    if args.benchmark:
+        # Warm up once so interpreter allocation isn't counted
+        for _, image in images:
+            engine.analyze(image)
+        start = time.perf_counter()
+        for _ in range(args.benchmark):
+            for _, image in images:
+                engine.analyze(image)
+        elapsed = time.perf_counter() - start
+        count = args.benchmark * len(images)
+        print(f"⏱️  {count} snapshots in {elapsed:.2f}s: {count / elapsed:.1f} snapshots/sec "
+              f"({elapsed / count * 1000:.1f} ms/snapshot)")
+        return
+
+    for path, image in images:
+        print(json.dumps({"image": path, **engine.analyze(image)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+"""
+SolSolve Klondike Draw-3 solver.
+
+    from klondike import deal, solve
+    result = solve(deal(7), max_nodes=200_000, time_limit=10)
+    for step in result.moves:
+        print(step)              # "Move 7♥ from Tableau 3 to 8♠", ...
+"""
+
+from .cards import card_name, parse_card
+from .state import KlondikeState, deal
+from .moves import generate_moves, apply_move, format_move, reachable_positions
+from .search import SolveResult, TranspositionTable, solve
+
+__all__ = [
+    "card_name", "parse_card",
+    "KlondikeState", "deal",
+    "generate_moves", "apply_move", "format_move", "reachable_positions",
+    "SolveResult", "TranspositionTable", "solve",
+]
@@ -0,0 +1,48 @@
+"""
+Card encoding for the Klondike solver.
+
+A card is an int 0..51: suit * 13 + rank, with ranks 0 (A) .. 12 (K) and
+suits in the app's order ♣ ♦ ♥ ♠. Piles are bytes of cards, bottom first.
+"""
+
+RANKS = ["A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K"]
+SUITS = ["♣", "♦", "♥", "♠"]
+SUIT_LETTERS = "CDHS"
+KING = 12
+
+RANK_OF = bytes(c % 13 for c in range(52))
+SUIT_OF = bytes(c // 13 for c in range(52))
+RED = bytes(1 if c // 13 in (1, 2) else 0 for c in range(52))
+
+# The two cards each card can be stacked on in the tableau (one rank up,
+# opposite colour); kings have none
+PARENTS = tuple(
+    () if c % 13 == KING else tuple(s * 13 + c % 13 + 1 for s in range(4) if (s in (1, 2)) != bool(RED[c]))
+    for c in range(52)
+)
+
+
+def make_card(rank, suit):
+    return suit * 13 + rank
+
+
+def card_name(card):
+    """7♥, 10♠, ..."""
+    return RANKS[RANK_OF[card]] + SUITS[SUIT_OF[card]]
+
+
+def parse_card(text):
+    """Parse "7♥", "7H" or "10s" into a card id"""
+    text = text.strip()
+    rank, suit = text[:-1].upper(), text[-1:]
+    if suit in SUITS:
+        suit_index = SUITS.index(suit)
+    elif suit.upper() in SUIT_LETTERS:
+        suit_index = SUIT_LETTERS.index(suit.upper())
+    else:
+        raise ValueError(f"Unknown suit in card {text!r}")
+    if rank == "1":
+        rank = "A"
+    if rank not in RANKS:
+        raise ValueError(f"Unknown rank in card {text!r}")
+    return make_card(RANKS.index(rank), suit_index)
@@ -0,0 +1,208 @@
+"""
+Move generation for Klondike Draw 3.
+
+A move is a plain tuple (kind, src, dst, card, count, draws):
+- T2F / T2T: src and dst are column indexes, count the cards moved
+- W2F / W2T: src is the talon position whose top card is played and
+  draws the stock turns (draws of three, plus recycles) needed first
+- F2T: src is the suit, dst the column
+
+Which waste cards are reachable by drawing three at a time, including
+recycling the waste, depends only on the talon length and position, so
+reachable_positions() is cached across the whole search.
+"""
+
+from functools import lru_cache
+
+from .cards import RANK_OF, SUIT_OF, RED, PARENTS, KING, card_name
+from .state import KlondikeState, Z_UP, Z_DOWN, Z_FOUND, Z_TALON, Z_POS
+
+T2F, T2T, W2F, W2T, F2T = range(5)
+DRAW = 3
+
+
+@lru_cache(maxsize=None)
+def reachable_positions(length, pos):
+    """(position, draws) pairs whose waste top can be played next.
+
+    The first pass draws through the rest of the stock; after one
+    recycle the second pass reaches positions 3, 6, ... A third pass
+    would repeat the second, so nothing else is reachable.
+    """
+    out = []
+    seen = set()
+    if pos:
+        out.append((pos, 0))
+        seen.add(pos)
+    q, draws = pos, 0
+    while q < length:
+        q = min(q + DRAW, length)
+        draws += 1
+        out.append((q, draws))
+        seen.add(q)
+    if length:
+        q, draws = 0, draws + 1
+        while q < length:
+            q = min(q + DRAW, length)
+            draws += 1
+            if q not in seen:
+                out.append((q, draws))
+                seen.add(q)
+    return tuple(out)
+
+
+def _safe_to_foundation(card, found):
+    """No card that could still go on top of this one is left in play"""
+    rank = RANK_OF[card]
+    if rank <= 1:
+        return True
+    if RED[card]:
+        return found[0] >= rank and found[3] >= rank
+    return found[1] >= rank and found[2] >= rank
+
+
+def generate_moves(state):
+    """Legal, pruned moves for a state; a lone safe foundation move if any"""
+    cols, down, found, talon, pos = state.cols, state.down, state.found, state.talon, state.pos
+
+    moves = []
+    top_col = {}
+    empty_col = None
+    for i, col in enumerate(cols):
+        if col:
+            c = col[-1]
+            top_col[c] = i
+            if found[SUIT_OF[c]] == RANK_OF[c]:
+                if _safe_to_foundation(c, found):
+                    return [(T2F, i, -1, c, 1, 0)]
+                moves.append((T2F, i, -1, c, 1, 0))
+        elif empty_col is None:
+            empty_col = i
+
+    if pos:
+        c = talon[pos - 1]
+        if found[SUIT_OF[c]] == RANK_OF[c] and _safe_to_foundation(c, found):
+            return [(W2F, pos, -1, c, 1, 0)]
+
+    # Tableau to tableau: whole face-up runs, or partial runs that free
+    # the card underneath for its foundation
+    for i, col in enumerate(cols):
+        n, d = len(col), down[i]
+        for start in range(d, n):
+            c = col[start]
+            if start > d:
+                below = col[start - 1]
+                if found[SUIT_OF[below]] != RANK_OF[below]:
+                    continue
+            if RANK_OF[c] == KING:
+                if start and empty_col is not None:
+                    moves.append((T2T, i, empty_col, c, n - start, 0))
+                continue
+            for parent in PARENTS[c]:
+                j = top_col.get(parent)
+                if j is not None:
+                    moves.append((T2T, i, j, c, n - start, 0))
+
+    # Waste, after however many draws it takes to expose each card
+    for q, draws in reachable_positions(len(talon), pos):
+        c = talon[q - 1]
+        if found[SUIT_OF[c]] == RANK_OF[c]:
+            moves.append((W2F, q, -1, c, 1, draws))
+        if RANK_OF[c] == KING:
+            if empty_col is not None:
+                moves.append((W2T, q, empty_col, c, 1, draws))
+            continue
+        for parent in PARENTS[c]:
+            j = top_col.get(parent)
+            if j is not None:
+                moves.append((W2T, q, j, c, 1, draws))
+
+    # Foundation back to tableau, to hold a card of the other colour
+    for suit, height in enumerate(found):
+        if height > 1:
+            c = suit * 13 + height - 1
+            for parent in PARENTS[c]:
+                j = top_col.get(parent)
+                if j is not None:
+                    moves.append((F2T, suit, j, c, 1, 0))
+    return moves
+
+
+def apply_move(state, move):
+    """Return the state after a move, updating the Zobrist key incrementally"""
+    kind, src, dst, card, count, draws = move
+    cols, down, found = state.cols, state.down, state.found
+    talon, pos, key = state.talon, state.pos, state.key
+
+    if kind == T2F or kind == T2T:
+        col = cols[src]
+        start = len(col) - count
+        run = col[start:]
+        for i, c in enumerate(run):
+            key ^= Z_UP[c][start + i]
+        cols = list(cols)
+        cols[src] = col[:start]
+        if start and down[src] == start:
+            # Turn over the newly exposed card
+            c = col[start - 1]
+            key ^= Z_DOWN[c][start - 1] ^ Z_UP[c][start - 1]
+            down = down[:src] + (start - 1,) + down[src + 1:]
+        if kind == T2F:
+            suit = SUIT_OF[card]
+            key ^= Z_FOUND[suit][found[suit]] ^ Z_FOUND[suit][found[suit] + 1]
+            found = found[:suit] + (found[suit] + 1,) + found[suit + 1:]
+        else:
+            base = len(cols[dst])
+            for i, c in enumerate(run):
+                key ^= Z_UP[c][base + i]
+            cols[dst] += run
+        return KlondikeState(tuple(cols), down, found, talon, pos, key)
+
+    if kind == W2F or kind == W2T:
+        # Cards after the played one shift down by one talon slot
+        i = src - 1
+        key ^= Z_POS[pos] ^ Z_POS[i]
+        for k in range(i, len(talon)):
+            key ^= Z_TALON[k][talon[k]]
+        talon = talon[:i] + talon[i + 1:]
+        for k in range(i, len(talon)):
+            key ^= Z_TALON[k][talon[k]]
+        pos = i
+        if kind == W2F:
+            suit = SUIT_OF[card]
+            key ^= Z_FOUND[suit][found[suit]] ^ Z_FOUND[suit][found[suit] + 1]
+            found = found[:suit] + (found[suit] + 1,) + found[suit + 1:]
+            return KlondikeState(cols, down, found, talon, pos, key)
+        key ^= Z_UP[card][len(cols[dst])]
+        cols = cols[:dst] + (cols[dst] + bytes((card,)),) + cols[dst + 1:]
+        return KlondikeState(cols, down, found, talon, pos, key)
+
+    # F2T
+    suit = src
+    key ^= Z_FOUND[suit][found[suit]] ^ Z_FOUND[suit][found[suit] - 1]
+    found = found[:suit] + (found[suit] - 1,) + found[suit + 1:]
+    key ^= Z_UP[card][len(cols[dst])]
+    cols = cols[:dst] + (cols[dst] + bytes((card,)),) + cols[dst + 1:]
+    return KlondikeState(cols, down, found, talon, pos, key)
+
+
+def move_cost(move):
+    """Moves a player makes: the play itself plus every stock turn before it"""
+    return 1 + move[5]
+
+
+def format_move(state, move):
+    """The app's step text for a move made from state"""
+    kind, src, dst, card, count, draws = move
+    name = card_name(card)
+    target = state.cols[dst][-1:] if dst >= 0 else b""
+    onto = card_name(target[0]) if target else f"Tableau {dst + 1}"
+    if kind == T2F:
+        return f"Move {name} from Tableau {src + 1} to Foundation"
+    if kind == T2T:
+        return f"Move {name} from Tableau {src + 1} to {onto}"
+    if kind == W2F:
+        return f"Reveal stock and play {name} to Foundation" if draws else f"Move {name} to Foundation"
+    if kind == W2T:
+        return f"Reveal stock and play {name} to Tableau {dst + 1}" if draws else f"Move {name} to Tableau {dst + 1}"
+    return f"Move {name} from Foundation to {onto}"
@@ -0,0 +1,134 @@
+"""
+Weighted A* search for the shortest Klondike Draw-3 solution.
+
+Nodes are ordered by f = g + weight * h, where g counts player moves
+(every stock turn included) and h is the number of cards not yet on the
+foundations plus hidden_weight per face-down card. With weight=1 and
+hidden_weight=0, h never overestimates and this is plain A*, returning
+the fewest moves. The defaults find a solution with far fewer nodes, at
+the cost of a possibly somewhat longer one.
+
+Visited states are kept in a transposition table keyed by the Zobrist
+key; it is bounded and drops its oldest quarter when full.
+"""
+
+import time
+import heapq
+from collections import namedtuple
+from itertools import islice
+
+from .cards import RANK_OF, SUIT_OF
+from .moves import T2F, generate_moves, apply_move, move_cost, format_move
+
+DEFAULT_WEIGHT = 3.0
+DEFAULT_HIDDEN_WEIGHT = 2
+DEFAULT_TABLE_SIZE = 1 << 20
+
+SolveResult = namedtuple("SolveResult", "solved moves steps num_moves nodes seconds reason")
+
+
+class TranspositionTable:
+    """Zobrist key → fewest moves a state was reached with, bounded in size"""
+
+    __slots__ = ("capacity", "entries", "evictions")
+
+    def __init__(self, capacity=DEFAULT_TABLE_SIZE):
+        self.capacity = capacity
+        self.entries = {}
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def visit(self, key, g):
+        """Record key at cost g. False if it was already reached as cheaply"""
+        best = self.entries.get(key)
+        if best is not None and best <= g:
+            return False
+        self.entries[key] = g
+        if len(self.entries) > self.capacity:
+            # Insertion order is discovery order: drop the oldest quarter
+            stale = list(islice(self.entries, self.capacity // 4))
+            for old in stale:
+                del self.entries[old]
+            self.evictions += len(stale)
+        return True
+
+    def is_stale(self, key, g):
+        best = self.entries.get(key)
+        return best is not None and best < g
+
+
+def _finish(state):
+    """Moves that clear a board with no hidden cards and an empty talon.
+
+    None if a pass over the columns finds no card for the foundations,
+    which only a layout with out-of-sequence face-up runs can produce.
+    """
+    steps = []
+    while not state.is_won():
+        for i, col in enumerate(state.cols):
+            if col and state.found[SUIT_OF[col[-1]]] == RANK_OF[col[-1]]:
+                move = (T2F, i, -1, col[-1], 1, 0)
+                steps.append((state, move))
+                state = apply_move(state, move)
+                break
+        else:
+            return None
+    return steps
+
+
+def _path(node):
+    steps = []
+    while node is not None:
+        node, state, move = node
+        steps.append((state, move))
+    steps.reverse()
+    return steps
+
+
+def solve(state, max_nodes=500_000, time_limit=30.0, weight=DEFAULT_WEIGHT,
+          hidden_weight=DEFAULT_HIDDEN_WEIGHT, table_size=DEFAULT_TABLE_SIZE):
+    """Search for a solution within the node and time budgets.
+
+    Returns a SolveResult; moves are the app's step strings.
+    """
+    start = time.perf_counter()
+    deadline = start + time_limit if time_limit else None
+    table = TranspositionTable(table_size)
+    table.visit(state.key, 0)
+
+    counter = 0
+    heap = [(weight * (state.remaining + hidden_weight * state.hidden), 0, 0, state, None)]
+    nodes = 0
+    reason = "exhausted"
+    while heap:
+        _, _, g, state, node = heapq.heappop(heap)
+        if table.is_stale(state.key, g):
+            continue
+
+        finish = _finish(state) if not state.hidden and len(state.talon) == 0 else None
+        if finish is not None:
+            steps = _path(node) + finish
+            moves = [format_move(s, m) for s, m in steps]
+            return SolveResult(True, moves, steps, sum(move_cost(m) for _, m in steps), nodes,
+                               time.perf_counter() - start, "solved")
+
+        nodes += 1
+        if nodes >= max_nodes:
+            reason = "node budget"
+            break
+        if deadline and not nodes & 1023 and time.perf_counter() > deadline:
+            reason = "time budget"
+            break
+
+        for move in generate_moves(state):
+            child = apply_move(state, move)
+            child_g = g + 1 + move[5]
+            if not table.visit(child.key, child_g):
+                continue
+            counter -= 1
+            h = child.remaining + hidden_weight * child.hidden
+            heapq.heappush(heap, (child_g + weight * h, counter, child_g, child, (node, state, move)))
+
+    return SolveResult(False, [], [], 0, nodes, time.perf_counter() - start, reason)
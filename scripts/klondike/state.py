@@ -0,0 +1,160 @@
+"""
+Compact Klondike Draw-3 game state with an incrementally maintained
+Zobrist key.
+
+The stock and waste are stored together as one "talon" sequence in draw
+order plus a position: talon[:pos] is the waste (top = talon[pos - 1])
+and talon[pos:] is the stock. Drawing three cards advances pos by three
+and recycling the waste resets it to 0, so the order never changes.
+
+The key XORs per-card random numbers that depend on the card's depth in
+its column but not on the column's index, so states that only differ by
+column order share a key.
+"""
+
+import random
+
+from .cards import RANK_OF, RED, card_name, parse_card
+
+NUM_COLUMNS = 7
+MAX_DEPTH = 20
+MAX_TALON = 24
+
+_rng = random.Random(0x5015017E)
+
+
+def _table(*shape):
+    if len(shape) == 1:
+        return tuple(_rng.getrandbits(64) for _ in range(shape[0]))
+    return tuple(_table(*shape[1:]) for _ in range(shape[0]))
+
+
+Z_UP = _table(52, MAX_DEPTH)
+Z_DOWN = _table(52, MAX_DEPTH)
+Z_FOUND = _table(4, 14)
+Z_TALON = _table(MAX_TALON, 52)
+Z_POS = _table(MAX_TALON + 1)
+
+
+def column_key(col, down):
+    key = 0
+    for depth, card in enumerate(col):
+        key ^= (Z_DOWN if depth < down else Z_UP)[card][depth]
+    return key
+
+
+def talon_key(talon, start=0):
+    key = 0
+    for i in range(start, len(talon)):
+        key ^= Z_TALON[i][talon[i]]
+    return key
+
+
+class KlondikeState:
+    """Immutable game state: 7 columns, face-down counts, foundations, talon"""
+
+    __slots__ = ("cols", "down", "found", "talon", "pos", "key")
+
+    def __init__(self, cols, down, found, talon, pos, key=None):
+        self.cols = cols      # tuple of 7 bytes, bottom card first
+        self.down = down      # tuple of 7 face-down counts
+        self.found = found    # tuple of 4 foundation heights, by suit
+        self.talon = talon    # bytes, in draw order
+        self.pos = pos        # cards of talon currently in the waste
+        if key is None:
+            key = Z_POS[pos] ^ talon_key(talon)
+            for col, n in zip(cols, down):
+                key ^= column_key(col, n)
+            for suit, height in enumerate(found):
+                key ^= Z_FOUND[suit][height]
+        self.key = key
+
+    @classmethod
+    def from_piles(cls, tableau, down=None, foundation=None, stock=(), waste=()):
+        """Build a state from card names.
+
+        tableau: 7 lists of cards, bottom first; down: face-down counts;
+        foundation: top card (or None) per suit in ♣ ♦ ♥ ♠ order; stock:
+        cards in draw order; waste: cards bottom first.
+        """
+        cols = tuple(bytes(parse_card(c) for c in col) for col in tableau)
+        down = tuple(down) if down is not None else (0,) * NUM_COLUMNS
+        found = tuple(RANK_OF[parse_card(c)] + 1 if c else 0 for c in (foundation or [None] * 4))
+        waste = bytes(parse_card(c) for c in waste)
+        talon = waste + bytes(parse_card(c) for c in stock)
+        cards = b"".join(cols) + talon + bytes(s * 13 + r for s, h in enumerate(found) for r in range(h))
+        if sorted(cards) != list(range(52)):
+            raise ValueError("Layout must contain each of the 52 cards exactly once")
+        if len(talon) > MAX_TALON:
+            raise ValueError(f"Stock and waste hold {len(talon)} cards, at most {MAX_TALON} fit")
+        for i, (col, n) in enumerate(zip(cols, down)):
+            if not 0 <= n <= max(0, len(col) - 1):
+                raise ValueError(f"Tableau {i + 1} has {n} face-down cards but {len(col)} cards")
+            for under, over in zip(col[n:], col[n + 1:]):
+                if RANK_OF[over] != RANK_OF[under] - 1 or RED[over] == RED[under]:
+                    raise ValueError(f"Tableau {i + 1}: {card_name(over)} cannot lie on {card_name(under)}")
+        return cls(cols, down, found, talon, len(waste))
+
+    def pack(self):
+        """Serialize to bytes: columns, face-down counts, foundations, talon"""
+        out = bytearray()
+        for col, n in zip(self.cols, self.down):
+            out += bytes((len(col), n)) + col
+        out += bytes(self.found) + bytes((len(self.talon), self.pos)) + self.talon
+        return bytes(out)
+
+    @classmethod
+    def unpack(cls, data):
+        cols, down, i = [], [], 0
+        for _ in range(NUM_COLUMNS):
+            length, n = data[i], data[i + 1]
+            cols.append(bytes(data[i + 2:i + 2 + length]))
+            down.append(n)
+            i += 2 + length
+        found = tuple(data[i:i + 4])
+        length, pos = data[i + 4], data[i + 5]
+        talon = bytes(data[i + 6:i + 6 + length])
+        return cls(tuple(cols), tuple(down), found, talon, pos)
+
+    @property
+    def remaining(self):
+        """Cards not yet on the foundations"""
+        return 52 - sum(self.found)
+
+    @property
+    def hidden(self):
+        return sum(self.down)
+
+    def is_won(self):
+        return self.found == (13, 13, 13, 13)
+
+    def waste_top(self):
+        return self.talon[self.pos - 1] if self.pos else None
+
+    def __eq__(self, other):
+        return isinstance(other, KlondikeState) and self.pack() == other.pack()
+
+    def __hash__(self):
+        return self.key
+
+    def __str__(self):
+        lines = []
+        for i, (col, n) in enumerate(zip(self.cols, self.down)):
+            cards = ["##"] * n + [card_name(c) for c in col[n:]]
+            lines.append(f"Tableau {i + 1}: {' '.join(cards)}")
+        found = [card_name(s * 13 + h - 1) if h else "--" for s, h in enumerate(self.found)]
+        waste = card_name(self.talon[self.pos - 1]) if self.pos else "--"
+        lines.append(f"Foundation: {' '.join(found)}  Waste: {waste}  Stock: {len(self.talon) - self.pos}")
+        return "\n".join(lines)
+
+
+def deal(seed):
+    """Seeded random deal: column i gets i + 1 cards, the top one face up"""
+    deck = list(range(52))
+    random.Random(seed).shuffle(deck)
+    cols, down = [], []
+    for i in range(NUM_COLUMNS):
+        cols.append(bytes(deck[:i + 1]))
+        down.append(i)
+        deck = deck[i + 1:]
+    return KlondikeState(tuple(cols), tuple(down), (0, 0, 0, 0), bytes(deck), 0)
@@ -8,15 +8,14 @@ This script helps prepare your 196 images for model training by:
 3. Setting up YOLO format detection data
 """
 
-import os
-import shutil
 import argparse
 from pathlib import Path
-import cv2
-import numpy as np
-from PIL import Image
 import random
 
+from dataset_utils import find_images, sync_split, LINK_MODES
+from telemetry import start_run
+from dataset_catalog import DatasetCatalog, print_summary, detection_class_names
+
 def create_training_structure(output_dir="training_data"):
     """Create the complete training directory structure"""
     base_dir = Path(output_dir)
@@ -53,17 +52,20 @@ def create_training_structure(output_dir="training_data"):
     print(f"✓ Created training directory structure in {output_dir}")
     return base_dir
 
-def organize_images(image_dir, output_dir, train_split=0.8):
-    """Organize images into train/val split for detection training"""
+def organize_images(image_dir, output_dir, train_split=0.8, seed=42, link_mode="copy", workers=8,
+                    dedupe_threshold=None):
+    """Organize images into train/val split for detection training
+
+    The split is seeded and stable, and a manifest in detection_data/
+    records what was placed so re-runs only touch new or changed files.
+    With dedupe_threshold set, only one image per near-duplicate cluster
+    is kept so bursts don't leak between train and val.
+    """
     image_dir = Path(image_dir)
     detection_dir = Path(output_dir) / "detection_data"
     
     # Find all image files
-    image_extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff']
-    image_files = []
-    for ext in image_extensions:
-        image_files.extend(image_dir.glob(f"*{ext}"))
-        image_files.extend(image_dir.glob(f"*{ext.upper()}"))
+    image_files = find_images(image_dir)
     
     if not image_files:
         print(f"❌ No images found in {image_dir}")
@@ -71,28 +73,29 @@ def organize_images(image_dir, output_dir, train_split=0.8):
     
     print(f"📊 Found {len(image_files)} images")
     
-    # Shuffle and split
-    random.shuffle(image_files)
-    split_idx = int(len(image_files) * train_split)
-    train_files = image_files[:split_idx]
-    val_files = image_files[split_idx:]
-    
-    print(f"   Training: {len(train_files)} images")
-    print(f"   Validation: {len(val_files)} images")
+    if dedupe_threshold is not None:
+        from dedupe_images import select_representatives
+        image_files, _ = select_representatives(image_files, threshold=dedupe_threshold)
+        print(f"   Keeping {len(image_files)} after near-duplicate removal")
     
-    # Copy training images
-    for img_file in train_files:
-        shutil.copy2(img_file, detection_dir / "images" / "train" / img_file.name)
+    train_count, val_count, stats = sync_split(
+        image_files, detection_dir,
+        train_split=train_split, seed=seed, mode=link_mode, workers=workers
+    )
     
-    # Copy validation images
-    for img_file in val_files:
-        shutil.copy2(img_file, detection_dir / "images" / "val" / img_file.name)
+    print(f"   Training: {train_count} images")
+    print(f"   Validation: {val_count} images")
+    print(f"   Unchanged: {stats['unchanged']}, placed: {stats['placed']} "
+          f"(hardlink {stats['hardlink']}, reflink {stats['reflink']}, copy {stats['copy']}), "
+          f"removed: {stats['removed']}")
     
     print("✓ Images organized into train/val split")
     return True
 
 def create_sample_crops(image_dir, output_dir, num_samples=10):
     """Create sample crops from images for classification training"""
+    import cv2
+    
     image_dir = Path(image_dir)
     output_dir = Path(output_dir)
     
@@ -216,12 +219,16 @@ suit_data/clubs/, suit_data/diamonds/, suit_data/hearts/, suit_data/spades/
 - LabelImg: https://github.com/heartexlabs/labelImg
 - Roboflow: https://roboflow.com
 - CVAT: https://cvat.org
+- After a first detector is trained, draft labels for the unlabeled images
+  and review them instead of drawing every box:
+  python auto_label.py --data-dir training_data --models-dir trained_models --review-threshold 0.5
 
 ### Classification Crops:
-- Use detection model to find cards first
-- Crop top-left corner of each detected card
-- Resize to 64x64 pixels
-- Sort into appropriate class folders
+- Once detection labels exist, generate corner crops automatically:
+  python corner_crops.py --data-dir training_data
+- Sort the crops in corner_crops/ into card52_data/<code>/ (e.g. QH/)
+- Fill rank_data/ and suit_data/ from the sorted card52_data/:
+  python corner_crops.py --data-dir training_data --derive-rank-suit
 
 ## Next Steps
 
@@ -246,28 +253,53 @@ def main():
     parser.add_argument("--output-dir", type=str, default="training_data", help="Output directory for organized training data")
     parser.add_argument("--create-samples", action="store_true", help="Create sample crops for classification")
     parser.add_argument("--num-samples", type=int, default=10, help="Number of sample crops to create")
+    parser.add_argument("--train-split", type=float, default=0.8, help="Fraction of images used for training")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the stable train/val split")
+    parser.add_argument("--link-mode", choices=LINK_MODES, default="copy",
+                        help="How to place images: copy, hardlink, reflink, or auto (hardlink → reflink → copy)")
+    parser.add_argument("--workers", type=int, default=8, help="Threads used for hashing and copying")
+    parser.add_argument("--dedupe", action="store_true", help="Keep one image per near-duplicate cluster before splitting")
+    parser.add_argument("--dedupe-threshold", type=int, default=6, help="Max perceptual-hash distance for near-duplicates")
+    parser.add_argument("--telemetry", type=str, default=None, help="Append per-step timings to this JSONL run log")
     
     args = parser.parse_args()
     
+    log = start_run(args.telemetry)
     print("🎯 SolSolve Training Data Preparation")
     print("=" * 50)
     
     # Create directory structure
-    base_dir = create_training_structure(args.output_dir)
+    with log.stage("structure"):
+        base_dir = create_training_structure(args.output_dir)
     
     # Organize images
-    if not organize_images(args.image_dir, args.output_dir):
+    with log.stage("organize", dedupe=args.dedupe, link_mode=args.link_mode) as info:
+        info["organized"] = organize_images(args.image_dir, args.output_dir, args.train_split,
+                                             args.seed, args.link_mode, args.workers,
+                                             args.dedupe_threshold if args.dedupe else None)
+    if not info["organized"]:
+        log.close(ok=False)
         return
     
     # Create YOLO config
-    create_yolo_config(args.output_dir)
+    with log.stage("yolo_config"):
+        create_yolo_config(args.output_dir)
+    
+    # Index the organized data so training scripts don't walk the trees again
+    with log.stage("catalog") as info:
+        with DatasetCatalog(args.output_dir, workers=args.workers) as catalog:
+            info.update(catalog.update()["detection"])
+            print_summary(catalog.summary(), detection_class_names(args.output_dir))
     
     # Create sample crops if requested
     if args.create_samples:
-        create_sample_crops(args.image_dir, args.output_dir, args.num_samples)
+        with log.stage("sample_crops", num_samples=args.num_samples):
+            create_sample_crops(args.image_dir, args.output_dir, args.num_samples)
     
     # Create labeling guide
-    create_labeling_guide(args.output_dir)
+    with log.stage("labeling_guide"):
+        create_labeling_guide(args.output_dir)
+    log.close(ok=True)
     
     print("\n✅ Training data preparation complete!")
     print(f"\n📁 Your training data is organized in: {args.output_dir}")
@@ -4,13 +4,25 @@ SolSolve Quick Start Training Script
 
 This script automates the entire training pipeline for quick setup.
 Run this after preparing your labeled data.
+
+Everything runs in one process, so TensorFlow and ultralytics are
+imported once and training output appears live. The rank and suit
+classifiers are independent and train at the same time, each in a
+worker process with half of the CPU threads.
 """
 
 import os
 import sys
-import subprocess
+import io
+import json
+import time
 import argparse
+import multiprocessing
+from queue import Empty
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from dataset_catalog import DatasetCatalog, print_summary, detection_class_names
 
 def check_dependencies():
     """Check if required packages are installed"""
@@ -38,24 +50,95 @@ def check_dependencies():
     print("✓ All required packages are installed")
     return True
 
-def run_command(command, description):
-    """Run a command and handle errors"""
-    print(f"\n🚀 {description}")
-    print(f"Command: {command}")
-    
-    try:
-        result = subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
-        print("✓ Command completed successfully")
+class _QueueWriter(io.TextIOBase):
+    """stdout replacement in a worker: forwards complete lines, prefixed, to the parent"""
+
+    def __init__(self, queue, prefix):
+        self.queue = queue
+        self.prefix = prefix
+        self.buffer = ""
+
+    def writable(self):
         return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Command failed with error code {e.returncode}")
-        print(f"Error output: {e.stderr}")
-        return False
 
-def quick_start_training(data_dir, output_dir="trained_models"):
-    """Run the complete training pipeline"""
+    def write(self, text):
+        # Progress bars redraw with \r; forward each redraw as a line
+        self.buffer += text.replace("\r", "\n")
+        *lines, self.buffer = self.buffer.split("\n")
+        for line in lines:
+            if line.strip():
+                self.queue.put(f"{self.prefix} {line}")
+        return len(text)
+
+    def flush(self):
+        if self.buffer.strip():
+            self.queue.put(f"{self.prefix} {self.buffer}")
+        self.buffer = ""
+
+
+def _train_classifier_job(job):
+    """Train one classifier in a worker process. Returns (model type, ok, seconds)"""
+    model_type, data_dir, output_dir, threads, queue = job
+    sys.stdout = sys.stderr = _QueueWriter(queue, f"[{model_type}]")
+    start = time.perf_counter()
+    try:
+        from train_models import SolSolveTrainer
+        trainer = SolSolveTrainer(data_dir, output_dir, thread_budget=threads)
+        ok = trainer.train_classifier(model_type)
+    finally:
+        sys.stdout.flush()
+    return model_type, bool(ok), time.perf_counter() - start
+
+
+def train_classifiers_concurrently(data_dir, output_dir, model_types=("rank", "suit")):
+    """Train independent classifiers at once, each in its own process with a share of the cores.
+
+    Worker output is streamed live, prefixed with the model type.
+    Returns ({model type: ok}, {model type: seconds}, wall seconds).
+    """
+    threads = max(1, (os.cpu_count() or 1) // len(model_types))
+    print(f"🚀 Training {', '.join(model_types)} concurrently ({threads} threads each)...")
+
+    # Spawned, not forked: the parent may already be running TensorFlow
+    ctx = multiprocessing.get_context("spawn")
+    manager = ctx.Manager()
+    queue = manager.Queue()
+    results, seconds = {}, {}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=len(model_types), mp_context=ctx) as pool:
+        futures = [pool.submit(_train_classifier_job, (name, str(data_dir), str(output_dir), threads, queue))
+                   for name in model_types]
+        pending = set(futures)
+        while pending:
+            try:
+                print(queue.get(timeout=0.2), flush=True)
+            except Empty:
+                pass
+            for future in [f for f in pending if f.done()]:
+                pending.discard(future)
+                try:
+                    name, ok, elapsed = future.result()
+                except Exception as e:
+                    name = model_types[futures.index(future)]
+                    print(f"❌ {name} worker crashed: {e}")
+                    ok, elapsed = False, time.perf_counter() - start
+                results[name], seconds[name] = ok, elapsed
+                print(f"{'✓' if ok else '❌'} {name} classifier finished in {elapsed:.0f}s")
+    while not queue.empty():
+        print(queue.get())
+    manager.shutdown()
+    return results, seconds, time.perf_counter() - start
+
+
+def quick_start_training(data_dir, output_dir="trained_models", evaluate=False, serial=False, card52=False):
+    """Run the complete training pipeline in this process.
+
+    With card52, the 52-class classifier is trained alongside rank and
+    suit and compared with them before the config is written.
+    """
     print("🎯 SolSolve Quick Start Training Pipeline")
     print("=" * 60)
+    pipeline_start = time.perf_counter()
     
     # Check dependencies
     if not check_dependencies():
@@ -66,70 +149,86 @@ def quick_start_training(data_dir, output_dir="trained_models"):
         print(f"❌ Data directory not found: {data_dir}")
         return False
     
-    # Check if data is properly organized
-    required_dirs = [
-        "detection_data/images/train",
-        "detection_data/images/val",
-        "rank_data",
-        "suit_data"
-    ]
+    # Check that the split is labeled and every classifier has crops
+    trees = ["rank", "suit", "card52"] if card52 else ["rank", "suit"]
+    with DatasetCatalog(data_path) as catalog:
+        catalog.update(["detection"] + trees)
+        summary = catalog.summary()
+        unlabeled = len(catalog.images(labeled=False))
     
-    missing_dirs = []
-    for dir_path in required_dirs:
-        if not (data_path / dir_path).exists():
-            missing_dirs.append(dir_path)
+    missing = []
+    for split in ("train", "val"):
+        if not summary["detection"].get(split, {}).get("labeled"):
+            missing.append(f"labeled images in detection_data/images/{split}")
+    for tree in trees:
+        if not sum(summary["crops"][tree].values()):
+            missing.append(f"crops in {tree}_data/")
     
-    if missing_dirs:
+    if missing:
         print("❌ Data directory is not properly organized. Missing:")
-        for dir_path in missing_dirs:
-            print(f"   - {dir_path}")
+        for item in missing:
+            print(f"   - {item}")
         print("\nRun data preparation first:")
         print(f"python prepare_training_data.py --image-dir {data_dir}")
         return False
     
+    print_summary({"detection": summary["detection"], "crops": {tree: summary["crops"][tree] for tree in trees}},
+                  detection_class_names(data_path))
+    if unlabeled:
+        print(f"⚠️  {unlabeled} detection images have no label yet; they train as background "
+              f"(list them with: python dataset_catalog.py --data-dir {data_dir} --unlabeled)")
     print("✓ Data directory structure looks good")
     
     # Create output directory
     output_path = Path(output_dir)
     output_path.mkdir(exist_ok=True)
     
+    # TensorFlow and ultralytics are imported once, here, for every step
+    from train_models import SolSolveTrainer
+    trainer = SolSolveTrainer(data_dir, output_dir)
+    
     # Step 1: Train detection model
     print("\n" + "="*60)
     print("STEP 1: Training Detection Model")
     print("="*60)
     
-    detection_cmd = f"python train_models.py --data-path {data_dir} --output-dir {output_dir} --train-detector"
-    if not run_command(detection_cmd, "Training detection model..."):
+    step_start = time.perf_counter()
+    if not trainer.train_detector():
         print("❌ Detection training failed. Check the error above.")
         return False
+    print(f"⏱️  Detector: {time.perf_counter() - step_start:.0f}s")
     
-    # Step 2: Train rank classifier
+    # Step 2: Train rank and suit (and card52) classifiers
+    model_types = ("rank", "suit", "card52") if card52 else ("rank", "suit")
     print("\n" + "="*60)
-    print("STEP 2: Training Rank Classifier")
+    print(f"STEP 2: Training {', '.join(name.capitalize() for name in model_types)} Classifiers")
     print("="*60)
     
-    rank_cmd = f"python train_models.py --data-path {data_dir} --output-dir {output_dir} --train-rank"
-    if not run_command(rank_cmd, "Training rank classifier..."):
-        print("❌ Rank training failed. Check the error above.")
-        return False
+    # With one core the jobs would only take turns
+    if serial or (os.cpu_count() or 1) < 2:
+        wall_start = time.perf_counter()
+        results = {model_type: trainer.train_classifier(model_type) for model_type in model_types}
+        print(f"⏱️  Classifiers: {time.perf_counter() - wall_start:.0f}s one after the other")
+    else:
+        results, seconds, wall = train_classifiers_concurrently(data_dir, output_dir, model_types)
+        # Each job ran on a share of the cores; back to back, each would get them all and
+        # finish sooner, so the sum only bounds the serial time (time with --serial to measure it)
+        serial_bound = sum(seconds.values())
+        print(f"⏱️  Classifiers: {wall:.0f}s wall clock; one after the other would take at most "
+              f"{serial_bound:.0f}s (saved at most {serial_bound - wall:.0f}s, compare with --serial)")
     
-    # Step 3: Train suit classifier
-    print("\n" + "="*60)
-    print("STEP 3: Training Suit Classifier")
-    print("="*60)
-    
-    suit_cmd = f"python train_models.py --data-path {data_dir} --output-dir {output_dir} --train-suit"
-    if not run_command(suit_cmd, "Training suit classifier..."):
-        print("❌ Suit training failed. Check the error above.")
+    failed = [name for name, ok in results.items() if not ok]
+    if failed:
+        print(f"❌ {' and '.join(failed)} training failed. Check the errors above.")
         return False
     
-    # Step 4: Create final config
+    # Step 3: Create final config
     print("\n" + "="*60)
-    print("STEP 4: Creating Final Configuration")
+    print("STEP 3: Creating Final Configuration")
     print("="*60)
     
     # Check if all models were created
-    model_files = ["detector.tflite", "rank.tflite", "suit.tflite"]
+    model_files = ["detector.tflite"] + [f"{name}.tflite" for name in model_types]
     missing_models = []
     
     for model_file in model_files:
@@ -140,9 +239,21 @@ def quick_start_training(data_dir, output_dir="trained_models"):
         print(f"❌ Missing trained models: {missing_models}")
         return False
     
-    # Create config.json
-    config_cmd = f"python train_models.py --data-path {data_dir} --output-dir {output_dir}"
-    run_command(config_cmd, "Creating final configuration...")
+    if card52:
+        trainer.compare_card52()
+    
+    trainer.create_config(list(model_types))
+    
+    if evaluate:
+        print("\n" + "="*60)
+        print("STEP 4: Evaluating Models")
+        print("="*60)
+        
+        from evaluate_models import evaluate_models
+        if evaluate_models(data_dir, output_dir) is None:
+            print("⚠️  Evaluation failed; the trained models are still usable")
+    
+    print(f"\n⏱️  Total: {time.perf_counter() - pipeline_start:.0f}s")
     
     print("\n" + "="*60)
     print("🎉 TRAINING COMPLETE!")
@@ -160,6 +271,17 @@ def quick_start_training(data_dir, output_dir="trained_models"):
     if config_path.exists():
         print(f"   ✓ config.json")
     
+    summary_path = output_path / "eval_summary.json"
+    if evaluate and summary_path.exists():
+        with open(summary_path) as f:
+            summary = json.load(f)
+        print("\n📊 Validation metrics:")
+        if "detector" in summary:
+            print(f"   detector mAP@0.5: {summary['detector']['map50']:.3f}")
+        for name in ("rank", "suit", "card52"):
+            if name in summary:
+                print(f"   {name} accuracy: {summary[name]['accuracy']:.3f}")
+    
     print(f"\n🚀 Next steps:")
     print(f"1. Copy models to: app/src/main/assets/models/")
     print(f"2. Test in your SolSolve app")
@@ -171,10 +293,15 @@ def main():
     parser = argparse.ArgumentParser(description="SolSolve Quick Start Training")
     parser.add_argument("--data-dir", type=str, required=True, help="Path to your organized training data directory")
     parser.add_argument("--output-dir", type=str, default="trained_models", help="Output directory for trained models")
+    parser.add_argument("--evaluate", action="store_true", help="Evaluate the models on the validation split afterwards")
+    parser.add_argument("--serial", action="store_true",
+                        help="Train the classifiers one after the other in this process")
+    parser.add_argument("--card52", action="store_true",
+                        help="Also train the 52-class card classifier and compare it with rank + suit")
     
     args = parser.parse_args()
     
-    if not quick_start_training(args.data_dir, args.output_dir):
+    if not quick_start_training(args.data_dir, args.output_dir, args.evaluate, args.serial, args.card52):
         print("\n❌ Training pipeline failed. Please check the errors above.")
         sys.exit(1)
 
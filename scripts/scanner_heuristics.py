@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+SolSolve Scanner Heuristics
+
+Python port of the scanner's pre-model checks (SolitaireScannerScreen:
+estimateHeuristics and detectCardsWithOpenCv), used to reject unusable
+captures before labeling. For every image it reports the same numbers
+the app logs:
+1. Edge and white ratios from a 16-px luma grid
+2. Card-shaped contours (Canny → findContours → approxPolyDP)
+3. Tableau columns, by clustering contour x positions
+4. The app's "partial" flag, plus the cost of each stage
+
+Images are decoded the way the app loads snapshots: power-of-two
+subsampling towards 1024 px and RGB_565 colour depth.
+
+Usage:
+    python scanner_heuristics.py --image-dir raw_images
+    python scanner_heuristics.py --image-dir raw_images --keep-dir usable --workers 8
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from dataset_utils import find_images, place_file, LINK_MODES
+
+RESULTS_NAME = "scanner_heuristics.jsonl"
+TARGET_MAX_DIM = 1024
+SAMPLE_STEP = 16
+EDGE_DELTA = 25
+WHITE_LEVEL = 200
+MIN_EDGE_RATIO = 0.06
+MIN_WHITE_RATIO = 0.12
+MIN_COLUMNS = 5
+CONTOUR_MAX_WIDTH = 1280
+STAGES = ["decode", "heuristics", "edges", "contours", "columns"]
+
+# 5/6-bit channels expanded back to 8 bits as Skia does for RGB_565
+_RGB565_LUT = np.empty((3, 256), dtype=np.uint8)
+for _bits, _lut in zip((5, 6, 5), _RGB565_LUT):
+    _v = np.arange(256) >> (8 - _bits)
+    _lut[:] = (_v << (8 - _bits)) | (_v >> (2 * _bits - 8))
+
+
+def load_snapshot(path, rgb565=True):
+    """Decode an image as the scanner does, as BGR. None if unreadable"""
+    import cv2
+    from PIL import Image
+
+    path = str(path)
+    try:
+        # Header only, like inJustDecodeBounds
+        with Image.open(path) as header:
+            max_dim = max(header.size)
+    except OSError:
+        return None
+    # inSampleSize = highestOneBit(maxDim / 1024); libjpeg scales by it while decoding
+    sample = 1 << max(0, (max_dim // TARGET_MAX_DIM).bit_length() - 1)
+    flags = {1: cv2.IMREAD_COLOR, 2: cv2.IMREAD_REDUCED_COLOR_2,
+             4: cv2.IMREAD_REDUCED_COLOR_4}.get(sample, cv2.IMREAD_REDUCED_COLOR_8)
+    img = cv2.imread(path, flags)
+    if img is None:
+        return None
+    if rgb565:
+        b, g, r = cv2.split(img)
+        img = cv2.merge((cv2.LUT(b, _RGB565_LUT[2]), cv2.LUT(g, _RGB565_LUT[1]), cv2.LUT(r, _RGB565_LUT[0])))
+    return img
+
+
+def estimate_heuristics(img, step=SAMPLE_STEP):
+    """(edge_ratio, white_ratio) over a step-px grid of a BGR image.
+
+    An edge is a luma jump above EDGE_DELTA between horizontally adjacent
+    samples; white is luma above WHITE_LEVEL.
+    """
+    grid = img[::step, ::step].astype(np.float32)
+    luma = (np.float32(0.299) * grid[..., 2] + np.float32(0.587) * grid[..., 1]
+            + np.float32(0.114) * grid[..., 0]).astype(np.int32)
+    samples = luma.size
+    if not samples:
+        return 0.0, 0.0
+    edges = np.count_nonzero(np.abs(np.diff(luma, axis=1)) > EDGE_DELTA)
+    white = np.count_nonzero(luma > WHITE_LEVEL)
+    return float(edges / samples), float(white / samples)
+
+
+def _bounding_boxes(contours):
+    """(x0, y0, x1, y1) of every contour in one pass over all points"""
+    lengths = np.fromiter((len(c) for c in contours), dtype=np.int64, count=len(contours))
+    points = np.concatenate(contours).reshape(-1, 2)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    lo = np.minimum.reduceat(points, starts, axis=0)
+    hi = np.maximum.reduceat(points, starts, axis=0)
+    return np.hstack([lo, hi])
+
+
+def detect_cards(img, timings=None):
+    """(columns, card_contours, contours) from the scanner's contour pass"""
+    import cv2
+
+    t0 = time.perf_counter()
+    h, w = img.shape[:2]
+    if w > CONTOUR_MAX_WIDTH:
+        img = cv2.resize(img, (CONTOUR_MAX_WIDTH, int(CONTOUR_MAX_WIDTH / w * h)), interpolation=cv2.INTER_LINEAR)
+        h, w = img.shape[:2]
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    gray = cv2.GaussianBlur(gray, (5, 5), 0)
+    edges = cv2.Canny(gray, 60, 120)
+    t1 = time.perf_counter()
+
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    xs = []
+    if contours:
+        # The approximated polygon's vertices are contour points, so its
+        # bounding box is never larger: most noise is rejected here
+        # without running approxPolyDP on it
+        boxes = _bounding_boxes(contours)
+        areas = (boxes[:, 2] - boxes[:, 0] + 1) * (boxes[:, 3] - boxes[:, 1] + 1)
+        max_area = w * h * 0.25
+        for i in np.flatnonzero(areas > 1000):
+            c = contours[i]
+            approx = cv2.approxPolyDP(c, 0.02 * cv2.arcLength(c, True), True)
+            if len(approx) != 4:
+                continue
+            x, _, bw, bh = cv2.boundingRect(approx)
+            area = bw * bh
+            aspect = max(bw, bh) / max(1, min(bw, bh))
+            if 1000 < area < max_area and 1.2 <= aspect <= 2.2:
+                xs.append(x)
+    t2 = time.perf_counter()
+
+    # Columns: sorted x positions split wherever the gap exceeds width / 20
+    xs = np.sort(np.asarray(xs, dtype=np.float64))
+    columns = int(np.count_nonzero(np.diff(xs) > w / 20.0)) + 1 if len(xs) else 0
+    if timings is not None:
+        timings["edges"] = t1 - t0
+        timings["contours"] = t2 - t1
+        timings["columns"] = time.perf_counter() - t2
+    return columns, len(xs), len(contours)
+
+
+def partial_reasons(edge_ratio, white_ratio, columns):
+    """Why the app would flag this capture as a partial game"""
+    reasons = []
+    if edge_ratio < MIN_EDGE_RATIO:
+        reasons.append("edges")
+    if white_ratio < MIN_WHITE_RATIO:
+        reasons.append("white")
+    if columns < MIN_COLUMNS:
+        reasons.append("columns")
+    return reasons
+
+
+def screen_image(path, rgb565=True):
+    """All scanner checks for one image, as a JSON-ready record"""
+    timings = {}
+    t0 = time.perf_counter()
+    img = load_snapshot(path, rgb565)
+    timings["decode"] = time.perf_counter() - t0
+    if img is None:
+        return {"image": str(path), "error": "unreadable"}
+
+    t0 = time.perf_counter()
+    edge_ratio, white_ratio = estimate_heuristics(img)
+    timings["heuristics"] = time.perf_counter() - t0
+    columns, cards, contours = detect_cards(img, timings)
+
+    reasons = partial_reasons(edge_ratio, white_ratio, columns)
+    return {
+        "image": str(path),
+        "width": img.shape[1],
+        "height": img.shape[0],
+        "edge_ratio": round(edge_ratio, 4),
+        "white_ratio": round(white_ratio, 4),
+        "contours": contours,
+        "cards": cards,
+        "columns": columns,
+        "partial": bool(reasons),
+        "reasons": reasons,
+        "ms": {stage: round(timings[stage] * 1000, 3) for stage in STAGES},
+    }
+
+
+def _init_worker():
+    import cv2
+    # One image per core already saturates the machine
+    cv2.setNumThreads(1)
+
+
+def _screen_job(args):
+    path, rgb565 = args
+    try:
+        return screen_image(path, rgb565)
+    except Exception as e:
+        return {"image": str(path), "error": str(e)}
+
+
+def screen_images(paths, workers=None, rgb565=True, output=None):
+    """Screen images in a process pool, streaming records to output (JSONL)"""
+    paths = [str(p) for p in paths]
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, min(64, len(paths) // (workers * 4)))
+    records = []
+    out = open(output, 'w') if output else None
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            for record in pool.map(_screen_job, [(p, rgb565) for p in paths], chunksize=chunksize):
+                records.append(record)
+                if out:
+                    out.write(json.dumps(record) + "\n")
+    finally:
+        if out:
+            out.close()
+    return records
+
+
+def print_report(records, elapsed, workers):
+    ok = [r for r in records if "error" not in r]
+    partial = [r for r in ok if r["partial"]]
+    print(f"📊 {len(records)} images in {elapsed:.1f}s on {workers} workers "
+          f"({len(records) / max(elapsed, 1e-9):.1f} images/s)")
+    if len(ok) < len(records):
+        print(f"⚠️  {len(records) - len(ok)} unreadable")
+    if not ok:
+        return
+    print(f"   usable {len(ok) - len(partial)}, partial {len(partial)}")
+    for reason in ("edges", "white", "columns"):
+        count = sum(reason in r["reasons"] for r in partial)
+        if count:
+            print(f"     {reason:8s} {count}")
+
+    for key in ("edge_ratio", "white_ratio", "contours", "cards", "columns"):
+        values = np.array([r[key] for r in ok], dtype=np.float64)
+        print(f"   {key:12s} mean {values.mean():8.3f}   min {values.min():8.3f}   max {values.max():8.3f}")
+
+    print("   Stage cost per image (ms):")
+    for stage in STAGES:
+        ms = np.array([r["ms"][stage] for r in ok])
+        print(f"     {stage:10s} p50 {np.percentile(ms, 50):7.2f}   p95 {np.percentile(ms, 95):7.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SolSolve scanner heuristics over image folders")
+    parser.add_argument("--image-dir", type=str, required=True, help="Directory of captures")
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: all cores)")
+    parser.add_argument("--output", type=str, default=None, help=f"Per-image JSONL (default: <image-dir>/{RESULTS_NAME})")
+    parser.add_argument("--keep-dir", type=str, default=None, help="Place captures not flagged partial here")
+    parser.add_argument("--link-mode", choices=LINK_MODES, default="auto", help="How to place kept captures")
+    parser.add_argument("--no-rgb565", action="store_true", help="Keep full colour depth instead of matching the app")
+
+    args = parser.parse_args()
+
+    image_files = find_images(args.image_dir)
+    if not image_files:
+        print(f"❌ No images found in {args.image_dir}")
+        sys.exit(1)
+
+    output = args.output or Path(args.image_dir) / RESULTS_NAME
+    workers = args.workers or os.cpu_count() or 1
+    print(f"🔍 Screening {len(image_files)} images...")
+    start = time.perf_counter()
+    records = screen_images(image_files, workers, not args.no_rgb565, output)
+    print_report(records, time.perf_counter() - start, workers)
+    print(f"✓ Results saved to {output}")
+
+    if args.keep_dir:
+        keep_dir = Path(args.keep_dir)
+        keep_dir.mkdir(parents=True, exist_ok=True)
+        kept = 0
+        for r in records:
+            if "error" in r or r["partial"]:
+                continue
+            src = Path(r["image"])
+            place_file(src, keep_dir / src.name, args.link_mode)
+            kept += 1
+        print(f"✓ {kept} usable captures placed in {keep_dir}")
+
+
+if __name__ == "__main__":
+    main()
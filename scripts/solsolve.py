@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+SolSolve Command Line
+
+One entry point for the helper scripts. Each subcommand forwards its
+arguments to the script's own parser, and a script's module (with
+TensorFlow, ultralytics, cv2, ...) is only imported by the subcommand
+that runs it, so `--help` and setup commands start instantly.
+
+Usage:
+    python solsolve.py prepare --image-dir raw_images
+    python solsolve.py extract-video game.mp4 --scene-threshold 6
+    python solsolve.py train --data-path training_data --train-rank
+    python solsolve.py quick-start --data-dir training_data
+    python solsolve.py sample-config
+    python solsolve.py startup-benchmark
+"""
+
+import os
+import sys
+import time
+import argparse
+import importlib
+import subprocess
+import tempfile
+
+# name: (module, arguments put before the user's, summary)
+COMMANDS = {
+    "setup": ("data_collection_helper", ["--setup"], "Create the data collection folder layout"),
+    "prepare": ("prepare_training_data", [], "Organize images into a stable train/val split"),
+    "extract-video": ("data_collection_helper", ["--extract-video"], "Extract frames from a recording"),
+    "train": ("train_models", [], "Train the detector and classifiers"),
+    "quick-start": ("quick_start", [], "Run the whole training pipeline"),
+    "sample-config": ("data_collection_helper", ["--sample-config"], "Write a sample config.json"),
+}
+
+# Commands that must stay fast: (arguments, whether to run in a scratch directory)
+STARTUP_CASES = [
+    (["--help"], False),
+    (["setup"], True),
+    (["sample-config"], True),
+    (["prepare", "--help"], False),
+    (["extract-video", "--help"], False),
+    (["train", "--help"], False),
+    (["quick-start", "--help"], False),
+]
+HEAVY_MODULES = ["tensorflow", "ultralytics", "torch", "cv2", "PIL", "yaml", "numpy"]
+DEFAULT_BUDGET_MS = 200
+
+
+def print_commands():
+    print("SolSolve helper scripts\n")
+    print("Usage: python solsolve.py <command> [options]   (<command> --help for its options)\n")
+    for name, (_, _, summary) in COMMANDS.items():
+        print(f"  {name:<18} {summary}")
+    print(f"  {'startup-benchmark':<18} Time how fast lightweight commands start")
+
+
+def run_command(name, argv):
+    """Import the command's module and run its main() with argv"""
+    module_name, prefix, _ = COMMANDS[name]
+    if "-h" in argv or "--help" in argv:
+        # The prefix flag may expect a value, which --help would not satisfy
+        prefix = []
+    module = importlib.import_module(module_name)
+    sys.argv = [f"solsolve {name}"] + prefix + list(argv)
+    return module.main()
+
+
+def _heavy_imports(argv, cwd):
+    """Heavy top-level modules a command imports, from -X importtime"""
+    result = subprocess.run([sys.executable, "-X", "importtime", os.path.abspath(__file__)] + argv,
+                            cwd=cwd, capture_output=True, text=True)
+    found = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        module = line.rsplit("|", 1)[-1].strip()
+        if module in HEAVY_MODULES:
+            found.add(module)
+    return sorted(found, key=HEAVY_MODULES.index)
+
+
+def startup_benchmark(runs=5, budget_ms=DEFAULT_BUDGET_MS):
+    """Median wall-clock start-to-exit time of lightweight commands. True if all are within budget"""
+    script = os.path.abspath(__file__)
+    print(f"⏱️  Startup time over {runs} runs (budget {budget_ms:.0f} ms)")
+    print(f"   {'command':<28} {'p50 ms':>8} {'min ms':>8}   heavy imports")
+    within_budget = True
+    for argv, scratch in STARTUP_CASES:
+        with tempfile.TemporaryDirectory() as tmp:
+            cwd = tmp if scratch else None
+            times = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                subprocess.run([sys.executable, script] + argv, cwd=cwd,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                times.append((time.perf_counter() - start) * 1000)
+            heavy = _heavy_imports(argv, cwd)
+        times.sort()
+        p50 = times[len(times) // 2]
+        ok = p50 <= budget_ms
+        within_budget &= ok
+        print(f"{'   ' if ok else '❌ '}{' '.join(argv):<28} {p50:>8.1f} {times[0]:>8.1f}   "
+              f"{', '.join(heavy) or '-'}")
+    print("✓ All commands within budget" if within_budget else "❌ Some commands are over budget")
+    return within_budget
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] in ("-h", "--help"):
+        print_commands()
+        return
+
+    name, argv = sys.argv[1], sys.argv[2:]
+    if name == "startup-benchmark":
+        parser = argparse.ArgumentParser(prog="solsolve startup-benchmark",
+                                         description="Time how fast lightweight commands start")
+        parser.add_argument("--runs", type=int, default=5, help="Runs per command")
+        parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Allowed p50 per command")
+        args = parser.parse_args(argv)
+        if not startup_benchmark(args.runs, args.budget_ms):
+            sys.exit(1)
+        return
+
+    if name not in COMMANDS:
+        print(f"❌ Unknown command: {name}\n")
+        print_commands()
+        sys.exit(2)
+    run_command(name, argv)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+SolSolve Klondike Draw-3 Solver
+
+Solves a seeded deal (or a layout from a JSON file) and prints the steps
+in the app's wording, or benchmarks nodes/sec over a seeded corpus.
+
+Layout JSON: {"tableau": [["K♣"], ["5♦", "4♥"], ...], "down": [0, 1, ...],
+"foundation": [null, "A♦", null, null], "stock": [...], "waste": [...]}
+
+Usage:
+    python solve_klondike.py --seed 7
+    python solve_klondike.py --layout state.json --time-limit 5
+    python solve_klondike.py --benchmark --deals 100 --max-nodes 100000
+"""
+
+import sys
+import json
+import argparse
+
+import numpy as np
+
+from klondike import KlondikeState, deal, solve
+from klondike.search import DEFAULT_WEIGHT, DEFAULT_HIDDEN_WEIGHT, DEFAULT_TABLE_SIZE
+
+
+def load_layout(path):
+    with open(path) as f:
+        layout = json.load(f)
+    return KlondikeState.from_piles(layout["tableau"], layout.get("down"), layout.get("foundation"),
+                                    layout.get("stock", []), layout.get("waste", []))
+
+
+def solve_and_print(state, **budget):
+    print(state)
+    result = solve(state, **budget)
+    print()
+    if not result.solved:
+        print(f"❌ No solution found ({result.reason}, {result.nodes} nodes, {result.seconds:.2f}s)")
+        return False
+    for i, step in enumerate(result.moves, 1):
+        print(f"{i:3d}. {step}")
+    print(f"\n✓ Solved in {result.num_moves} moves ({len(result.moves)} steps), "
+          f"{result.nodes} nodes, {result.seconds:.2f}s")
+    return True
+
+
+def benchmark(deals=50, start_seed=0, output=None, **budget):
+    """Solve a seeded corpus and report nodes/sec and solve rate"""
+    print(f"⏱️  Solving {deals} deals (seeds {start_seed}..{start_seed + deals - 1})...")
+    rows = []
+    for seed in range(start_seed, start_seed + deals):
+        result = solve(deal(seed), **budget)
+        rows.append({"seed": seed, "solved": result.solved, "moves": result.num_moves,
+                     "nodes": result.nodes, "seconds": round(result.seconds, 4), "reason": result.reason})
+
+    nodes = sum(r["nodes"] for r in rows)
+    seconds = sum(r["seconds"] for r in rows)
+    solved = [r for r in rows if r["solved"]]
+    summary = {
+        "deals": deals,
+        "solved": len(solved),
+        "exhausted": sum(r["reason"] == "exhausted" for r in rows),
+        "budget_exceeded": sum(r["reason"] in ("node budget", "time budget") for r in rows),
+        "nodes": nodes,
+        "seconds": round(seconds, 2),
+        "nodes_per_sec": round(nodes / seconds) if seconds else 0,
+        "mean_moves": round(float(np.mean([r["moves"] for r in solved])), 1) if solved else None,
+        "p50_solve_ms": round(float(np.percentile([r["seconds"] for r in solved], 50)) * 1000, 1) if solved else None,
+        "budget": budget,
+    }
+
+    print(f"📊 Solved {summary['solved']}/{deals}, {summary['exhausted']} with no solution, "
+          f"{summary['budget_exceeded']} over budget")
+    print(f"   {nodes} nodes in {seconds:.1f}s: {summary['nodes_per_sec']} nodes/sec")
+    if solved:
+        print(f"   mean solution {summary['mean_moves']} moves, p50 solve time {summary['p50_solve_ms']} ms")
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump({"summary": summary, "deals": rows}, f, indent=2)
+        print(f"✓ Results saved to {output}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SolSolve Klondike Draw-3 solver")
+    parser.add_argument("--seed", type=int, default=None, help="Solve the seeded deal")
+    parser.add_argument("--layout", type=str, default=None, help="Solve a layout from a JSON file")
+    parser.add_argument("--benchmark", action="store_true", help="Benchmark over a seeded corpus")
+    parser.add_argument("--deals", type=int, default=50, help="Deals in the benchmark corpus")
+    parser.add_argument("--start-seed", type=int, default=0, help="First seed of the corpus")
+    parser.add_argument("--output", type=str, default=None, help="Benchmark results JSON")
+    parser.add_argument("--max-nodes", type=int, default=200_000, help="Node budget per deal")
+    parser.add_argument("--time-limit", type=float, default=10.0, help="Seconds per deal (0 = no limit)")
+    parser.add_argument("--weight", type=float, default=DEFAULT_WEIGHT, help="Heuristic weight (1 = optimal A*)")
+    parser.add_argument("--hidden-weight", type=float, default=DEFAULT_HIDDEN_WEIGHT,
+                        help="Heuristic cost per face-down card (0 with --weight 1 = optimal A*)")
+    parser.add_argument("--table-size", type=int, default=DEFAULT_TABLE_SIZE, help="Transposition table entries")
+
+    args = parser.parse_args()
+
+    budget = {"max_nodes": args.max_nodes, "time_limit": args.time_limit, "weight": args.weight,
+              "hidden_weight": args.hidden_weight, "table_size": args.table_size}
+    if args.benchmark:
+        benchmark(args.deals, args.start_seed, args.output, **budget)
+    elif args.layout:
+        try:
+            state = load_layout(args.layout)
+        except ValueError as e:
+            print(f"❌ Invalid layout: {e}")
+            sys.exit(1)
+        if not solve_and_print(state, **budget):
+            sys.exit(1)
+    elif args.seed is not None:
+        if not solve_and_print(deal(args.seed), **budget):
+            sys.exit(1)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
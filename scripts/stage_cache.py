@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+SolSolve Stage Cache
+
+Lets training stages be skipped when nothing they depend on changed:
+1. A stage key hashes the stage's input files (content hashes from the
+   dataset catalog), hyperparameters and the training code
+2. Exported artifacts are kept in a content-addressed store and the
+   least recently used stages are evicted once it outgrows its limit
+
+Usage:
+    python stage_cache.py --cache-dir trained_models/.stage_cache            # list cached stages
+    python stage_cache.py --cache-dir trained_models/.stage_cache --clear
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import argparse
+from pathlib import Path
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_SIZE = 2 * 1024 ** 3
+# Objects younger than this may belong to a store still running in
+# another process (parallel classifier workers share the cache)
+ORPHAN_GRACE_SECONDS = 3600
+
+
+def stage_key(stage, file_hashes, params, code):
+    """Fingerprint of everything a stage's output depends on"""
+    payload = json.dumps({"version": CACHE_VERSION, "stage": stage, "files": file_hashes,
+                          "params": params, "code": code}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def code_version(paths, extra=None):
+    """Hash of source files (and e.g. library versions) that shape a stage's output"""
+    digest = hashlib.sha256()
+    for path in sorted(str(p) for p in paths):
+        digest.update(Path(path).name.encode("utf-8"))
+        digest.update(Path(path).read_bytes())
+    digest.update(json.dumps(extra or {}, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class StageCache:
+    """Content-addressed store of stage artifacts, bounded in bytes.
+
+    objects/<sha256[:2]>/<sha256> holds artifact contents, shared between
+    stages; stages/<key>.json maps artifact names to objects. A stage's
+    mtime is its last use, which decides eviction order.
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_CACHE_SIZE):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.objects_dir = self.cache_dir / "objects"
+        self.stages_dir = self.cache_dir / "stages"
+
+    def _object_path(self, digest):
+        return self.objects_dir / digest[:2] / digest
+
+    def _stage_path(self, key):
+        return self.stages_dir / f"{key}.json"
+
+    def lookup(self, key):
+        """The stage entry for key if all its artifacts are present, else None"""
+        path = self._stage_path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("version") != CACHE_VERSION:
+            return None
+        if not all(self._object_path(a["sha256"]).exists() for a in entry["artifacts"].values()):
+            return None
+        os.utime(path)
+        return entry
+
+    def restore(self, entry, output_dir):
+        """Copy a stage's artifacts into output_dir. Returns their names"""
+        output_dir = Path(output_dir)
+        for name, artifact in entry["artifacts"].items():
+            # Copied, not linked: trainers rewrite outputs in place
+            tmp_path = output_dir / f".{name}.{os.getpid()}.tmp"
+            shutil.copyfile(self._object_path(artifact["sha256"]), tmp_path)
+            os.replace(tmp_path, output_dir / name)
+        return sorted(entry["artifacts"])
+
+    def store(self, key, stage, paths):
+        """Add artifact files under a stage key, then evict down to the size limit"""
+        artifacts = {}
+        for path in paths:
+            path = Path(path)
+            digest = hashlib.sha256(path.read_bytes()).hexdigest()
+            obj = self._object_path(digest)
+            if not obj.exists():
+                obj.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = obj.with_name(f".{digest}.{os.getpid()}.tmp")
+                shutil.copyfile(path, tmp_path)
+                os.replace(tmp_path, obj)
+            else:
+                # Reused: mark it in use so a concurrent evict() keeps it
+                os.utime(obj)
+            artifacts[path.name] = {"sha256": digest, "size": obj.stat().st_size}
+
+        entry = {"version": CACHE_VERSION, "stage": stage, "created": time.time(), "artifacts": artifacts}
+        self.stages_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.stages_dir / f".{key}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f, indent=1)
+        os.replace(tmp_path, self._stage_path(key))
+        self.evict()
+        return entry
+
+    def entries(self):
+        """[(last used, key, entry)] oldest first"""
+        found = []
+        for path in self.stages_dir.glob("*.json") if self.stages_dir.exists() else []:
+            try:
+                with open(path) as f:
+                    found.append((path.stat().st_mtime, path.stem, json.load(f)))
+            except (OSError, ValueError):
+                continue
+        return sorted(found, key=lambda item: item[0])
+
+    def evict(self):
+        """Drop least recently used stages (never the newest) until under max_bytes"""
+        entries = self.entries()
+        refs = {}
+        for _, _, entry in entries:
+            for artifact in entry["artifacts"].values():
+                refs[artifact["sha256"]] = refs.get(artifact["sha256"], 0) + 1
+
+        total = 0
+        cutoff = time.time() - ORPHAN_GRACE_SECONDS
+        for obj in self.objects_dir.glob("*/*") if self.objects_dir.exists() else []:
+            if obj.name.startswith("."):
+                continue
+            try:
+                stat = obj.stat()
+            except FileNotFoundError:
+                continue
+            if obj.name not in refs and stat.st_mtime < cutoff:
+                # Left behind by an interrupted store or an older eviction
+                obj.unlink(missing_ok=True)
+                continue
+            total += stat.st_size
+
+        removed = 0
+        for _, key, entry in entries[:-1]:
+            if total <= self.max_bytes:
+                break
+            self._stage_path(key).unlink(missing_ok=True)
+            removed += 1
+            for artifact in entry["artifacts"].values():
+                refs[artifact["sha256"]] -= 1
+                if refs[artifact["sha256"]] == 0:
+                    # A recent object may be going into a concurrent store; it is
+                    # swept as an orphan once past the grace period if not
+                    obj = self._object_path(artifact["sha256"])
+                    if self._older_than(obj, cutoff):
+                        obj.unlink(missing_ok=True)
+                    total -= artifact["size"]
+        return removed
+
+    @staticmethod
+    def _older_than(obj, cutoff):
+        try:
+            return obj.stat().st_mtime < cutoff
+        except FileNotFoundError:
+            return False
+
+    def size(self):
+        return sum(p.stat().st_size for p in self.objects_dir.glob("*/*")) if self.objects_dir.exists() else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear the SolSolve training stage cache")
+    parser.add_argument("--cache-dir", type=str, default="trained_models/.stage_cache", help="Cache directory")
+    parser.add_argument("--clear", action="store_true", help="Delete the whole cache")
+
+    args = parser.parse_args()
+
+    cache = StageCache(args.cache_dir)
+    if args.clear:
+        shutil.rmtree(cache.cache_dir, ignore_errors=True)
+        print(f"✓ Cleared {cache.cache_dir}")
+        return
+
+    entries = cache.entries()
+    print(f"📦 {len(entries)} cached stages, {cache.size() / (1024 * 1024):.1f} MB in {cache.cache_dir}")
+    for used, key, entry in reversed(entries):
+        names = ", ".join(sorted(entry["artifacts"]))
+        print(f"   {entry['stage']:<8} {key[:12]}  last used {time.strftime('%Y-%m-%d %H:%M', time.localtime(used))}  {names}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+SolSolve Classifier Architecture Sweep
+
+Trains compact variants of a classifier and keeps the ones worth using:
+1. Every combination of input size and architecture (or a random sample
+   of them) is trained on the same split and exported to float16 TFLite
+2. Each is measured on the validation split: top-1 accuracy and per-crop
+   latency in the local TFLite interpreter (1 thread)
+3. The Pareto front, where no other variant is both more accurate and
+   faster, is printed and saved
+
+Architectures are named <conv>-w<width>: "standard" or "separable"
+(depthwise-separable) convolutions with every layer's channels scaled by
+width. standard-w1 at 64 is the default model.
+
+Usage:
+    python sweep_classifiers.py --data-dir training_data --model rank
+    python sweep_classifiers.py --data-dir training_data --model suit --sample 6 --epochs 20
+    python sweep_classifiers.py --data-dir training_data --model rank --apply auto --models-dir trained_models
+"""
+
+import sys
+import json
+import random
+import argparse
+import itertools
+from pathlib import Path
+
+from train_models import SolSolveTrainer, CLASSIFIER_TYPES, parse_architecture
+
+DEFAULT_INPUT_SIZES = [32, 48, 64]
+DEFAULT_ARCHITECTURES = ["standard-w1", "standard-w0.5", "separable-w1", "separable-w0.5"]
+
+
+def candidate_grid(input_sizes, architectures, sample=None, seed=42):
+    """[(input size, architecture)] for the full grid, or a seeded random sample of it"""
+    grid = list(itertools.product(input_sizes, architectures))
+    if sample and sample < len(grid):
+        grid = random.Random(seed).sample(grid, sample)
+    return grid
+
+
+def pareto_front(results, accuracy_key="top1_accuracy", latency_key="latency_ms_p50"):
+    """Results no other result beats on both accuracy and latency, fastest first"""
+    front = []
+    for r in results:
+        dominated = any(o[accuracy_key] >= r[accuracy_key] and o[latency_key] <= r[latency_key]
+                        and (o[accuracy_key] > r[accuracy_key] or o[latency_key] < r[latency_key])
+                        for o in results)
+        if not dominated:
+            front.append(r)
+    return sorted(front, key=lambda r: r[latency_key])
+
+
+def pick_candidate(front, tolerance):
+    """Fastest front member within tolerance of the best top-1 accuracy"""
+    best = max(r["top1_accuracy"] for r in front)
+    return next(r for r in front if r["top1_accuracy"] >= best - tolerance)
+
+
+def print_results(results, front):
+    on_front = {r["name"] for r in front}
+    print(f"\n📊 {len(results)} candidates ({len(front)} on the Pareto front, marked *):")
+    print(f"   {'candidate':<24} {'top-1':>7} {'p50 ms':>8} {'p90 ms':>8} {'size':>8} {'params':>8}")
+    for r in sorted(results, key=lambda r: r["latency_ms_p50"]):
+        mark = "*" if r["name"] in on_front else " "
+        print(f" {mark} {r['name']:<24} {r['top1_accuracy']:>7.3f} {r['latency_ms_p50']:>8.3f} "
+              f"{r['latency_ms_p90']:>8.3f} {r['size_kb']:>6.0f}KB {r['params']:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep classifier input sizes and architectures for accuracy vs latency")
+    parser.add_argument("--data-dir", type=str, required=True, help="Directory with rank_data/, suit_data/ or card52_data/")
+    parser.add_argument("--model", choices=CLASSIFIER_TYPES, required=True, help="Classifier to sweep")
+    parser.add_argument("--input-sizes", type=int, nargs="+", default=DEFAULT_INPUT_SIZES, help="Input sizes in pixels")
+    parser.add_argument("--archs", nargs="+", default=DEFAULT_ARCHITECTURES,
+                        help="Architectures <conv>-w<width>, conv standard or separable")
+    parser.add_argument("--sample", type=int, default=None, help="Train a random sample of this many grid points")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the split and the sample")
+    parser.add_argument("--epochs", type=int, default=None, help="Max epochs per candidate (default: the trainer's)")
+    parser.add_argument("--use-shards", action="store_true", help="Train from memory-mapped crop shards")
+    parser.add_argument("--threads", type=int, default=None, help="TensorFlow intra-op threads")
+    parser.add_argument("--apply", type=str, default=None,
+                        help="Install a candidate as <model>.tflite and write its inputSize to config.json: "
+                             "a candidate name, or 'auto' for the fastest front member within --tolerance")
+    parser.add_argument("--tolerance", type=float, default=0.01,
+                        help="Top-1 accuracy 'auto' may give up against the most accurate candidate")
+    parser.add_argument("--models-dir", type=str, default=None,
+                        help="Where --apply installs the model and updates config.json (default: --data-dir)")
+
+    args = parser.parse_args()
+    for name in args.archs:
+        try:
+            parse_architecture(name)
+        except ValueError as e:
+            parser.error(str(e))
+
+    candidates = candidate_grid(args.input_sizes, args.archs, args.sample, args.seed)
+    print(f"🎯 Sweeping {len(candidates)} {args.model} classifier candidates")
+    trainer = SolSolveTrainer(args.data_dir, args.data_dir, seed=args.seed, use_shards=args.use_shards,
+                              threads=args.threads, use_cache=False)
+    labels, results = trainer.sweep_classifier(args.model, candidates, args.epochs)
+    if not results:
+        sys.exit(1)
+
+    front = pareto_front(results)
+    print_results(results, front)
+    sweep_dir = Path(args.data_dir) / f"sweep_{args.model}"
+    with open(sweep_dir / "pareto.json", 'w') as f:
+        json.dump({"model_type": args.model, "labels": labels, "front": front}, f, indent=2)
+    print(f"\n✓ Pareto front saved to {sweep_dir / 'pareto.json'}")
+
+    if args.apply:
+        if args.apply == "auto":
+            chosen = pick_candidate(front, args.tolerance)
+        else:
+            chosen = next((r for r in results if r["name"] == args.apply), None)
+            if chosen is None:
+                print(f"❌ No candidate named {args.apply}")
+                sys.exit(1)
+        models_dir = args.models_dir or args.data_dir
+        Path(models_dir).mkdir(parents=True, exist_ok=True)
+        print(f"🎯 Applying {chosen['name']} (top-1 {chosen['top1_accuracy']:.3f}, "
+              f"p50 {chosen['latency_ms_p50']:.3f} ms/crop)")
+        SolSolveTrainer(args.data_dir, models_dir).adopt_classifier(
+            args.model, sweep_dir / chosen["file"], labels, chosen["input_size"], chosen["architecture"])
+        print(f"   Retrain it with: python train_models.py --train-{args.model} "
+              f"--classifier-input-size {chosen['input_size']} --classifier-arch {chosen['architecture']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+"""
+SolSolve Synthetic Table Renderer
+
+Renders legal Klondike Draw-3 tables with exact labels, so the detector
+and classifiers can be trained before (or alongside) hand-labeled data:
+1. Deals a seeded game and plays random legal moves to a mid-game state
+2. Composites card faces/backs with NumPy: fanned tableau columns, stock,
+   the three-card waste fan and foundations, on a random background
+3. Randomizes scale, fan offsets, perspective and lighting
+4. Writes the image, its YOLO labels for the four detector classes, and
+   the corner crop of every fully-wide face-up card into card52_data/,
+   rank_data/ and suit_data/
+
+Card sprites are drawn procedurally unless --sprites points to a
+directory of <code>.png faces (AS.png, 10H.png, ...) and back.png.
+Images are fanned out over a process pool in chunks.
+
+Usage:
+    python synthesize_data.py --output-dir training_data --count 2000
+    python synthesize_data.py --output-dir synthetic_data --count 10000 --sprites my_deck/
+"""
+
+import os
+import time
+import random
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from dataset_utils import stable_split, place_file
+from corner_crops import corner_rois, extract_crops, CROP_SIZE, SUIT_NAMES, CORNER_HEIGHT_FRAC
+
+DETECTOR_LABELS = ["card_face_up", "card_back", "pile_slot_tableau", "pile_slot_foundation"]
+FACE_UP, CARD_BACK, SLOT_TABLEAU, SLOT_FOUNDATION = range(4)
+
+RANK_LABELS = ["A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K"]
+SUIT_LETTERS = "CDHS"
+SPRITE_W, SPRITE_H = 200, 280
+
+CANVAS_SIZES = [(720, 1280), (1080, 1920), (1280, 720), (900, 1600)]
+BACK_COLORS = [(150, 60, 20), (40, 40, 170), (60, 110, 30), (90, 30, 90)]
+TABLE_COLORS = [(40, 110, 30), (35, 80, 20), (110, 70, 20), (60, 60, 60), (30, 30, 90), (200, 200, 200)]
+
+_SPRITE_CACHE = {}
+_NOISE = []
+
+
+def card_code(card):
+    """klondike card id → card52 code, e.g. 10H"""
+    return RANK_LABELS[card % 13] + SUIT_LETTERS[card // 13]
+
+
+def _draw_suit(img, suit, cx, cy, size, color):
+    """Fill a club, diamond, heart or spade centred at (cx, cy)"""
+    import cv2
+
+    def pt(dx, dy):
+        return (int(round(cx + dx * size)), int(round(cy + dy * size)))
+
+    r = max(1, int(round(size * 0.5)))
+    if suit == 1:
+        cv2.fillPoly(img, [np.array([pt(0, -1), pt(0.72, 0), pt(0, 1), pt(-0.72, 0)])], color, cv2.LINE_AA)
+    elif suit == 2:
+        cv2.circle(img, pt(-0.45, -0.3), r, color, -1, cv2.LINE_AA)
+        cv2.circle(img, pt(0.45, -0.3), r, color, -1, cv2.LINE_AA)
+        cv2.fillPoly(img, [np.array([pt(-0.93, -0.1), pt(0.93, -0.1), pt(0, 1)])], color, cv2.LINE_AA)
+    else:
+        if suit == 3:
+            cv2.fillPoly(img, [np.array([pt(0, -1), pt(-0.93, 0.2), pt(0.93, 0.2)])], color, cv2.LINE_AA)
+            cv2.circle(img, pt(-0.45, 0.25), r, color, -1, cv2.LINE_AA)
+            cv2.circle(img, pt(0.45, 0.25), r, color, -1, cv2.LINE_AA)
+        else:
+            r = max(1, int(round(size * 0.42)))
+            for dx, dy in ((0, -0.45), (-0.48, 0.15), (0.48, 0.15)):
+                cv2.circle(img, pt(dx, dy), r, color, -1, cv2.LINE_AA)
+        cv2.fillPoly(img, [np.array([pt(0, 0.2), pt(-0.35, 1), pt(0.35, 1)])], color, cv2.LINE_AA)
+
+
+def _round_mask(w, h, radius):
+    mask = np.zeros((h, w), np.uint8)
+    import cv2
+    cv2.rectangle(mask, (radius, 0), (w - radius - 1, h - 1), 255, -1)
+    cv2.rectangle(mask, (0, radius), (w - 1, h - radius - 1), 255, -1)
+    for cx, cy in ((radius, radius), (w - radius - 1, radius), (radius, h - radius - 1), (w - radius - 1, h - radius - 1)):
+        cv2.circle(mask, (cx, cy), radius, 255, -1, cv2.LINE_AA)
+    return mask
+
+
+def render_face(card, font, red):
+    """Procedural card face as a BGR sprite"""
+    import cv2
+
+    rank, suit = card % 13, card // 13
+    color = red if suit in (1, 2) else (20, 20, 20)
+    img = np.full((SPRITE_H, SPRITE_W, 3), 250, np.uint8)
+    w = SPRITE_W
+
+    # Top-left index: rank over suit, inside the corner_rois() window
+    label = RANK_LABELS[rank]
+    scale = cv2.getFontScaleFromHeight(font, int(w * 0.15), 3)
+    (tw, th), _ = cv2.getTextSize(label, font, scale, 3)
+    if tw > w * 0.24:
+        scale *= w * 0.24 / tw
+        (tw, th), _ = cv2.getTextSize(label, font, scale, 3)
+    cx = int(w * 0.15)
+    cv2.putText(img, label, (cx - tw // 2, int(w * 0.05) + th), font, scale, color, 3, cv2.LINE_AA)
+    _draw_suit(img, suit, cx, w * 0.3, w * 0.07, color)
+
+    # Centre: one big pip, or a framed letter for court cards
+    if rank >= 10:
+        cv2.rectangle(img, (int(w * 0.25), int(SPRITE_H * 0.2)), (int(w * 0.75), int(SPRITE_H * 0.8)), color, 3)
+        big = cv2.getFontScaleFromHeight(font, int(w * 0.3), 5)
+        (bw, bh), _ = cv2.getTextSize(label, font, big, 5)
+        cv2.putText(img, label, (w // 2 - bw // 2, SPRITE_H // 2 + bh // 2), font, big, color, 5, cv2.LINE_AA)
+    else:
+        _draw_suit(img, suit, w / 2, SPRITE_H / 2, w * (0.22 if rank == 0 else 0.14), color)
+
+    # Bottom-right index is the top-left one rotated
+    corner = img[:int(w * 0.42), :int(w * 0.3)]
+    img[SPRITE_H - corner.shape[0]:, w - corner.shape[1]:] = corner[::-1, ::-1]
+    cv2.rectangle(img, (0, 0), (w - 1, SPRITE_H - 1), (170, 170, 170), 2)
+    return img
+
+
+def render_back(color):
+    import cv2
+
+    img = np.full((SPRITE_H, SPRITE_W, 3), 245, np.uint8)
+    m = int(SPRITE_W * 0.06)
+    inner = img[m:SPRITE_H - m, m:SPRITE_W - m]
+    inner[:] = color
+    yy, xx = np.mgrid[:inner.shape[0], :inner.shape[1]]
+    lattice = ((xx + yy) // 12 + (xx - yy) // 12) % 2 == 0
+    inner[lattice] = np.clip(np.array(color, np.int16) + 50, 0, 255).astype(np.uint8)
+    cv2.rectangle(img, (0, 0), (SPRITE_W - 1, SPRITE_H - 1), (170, 170, 170), 2)
+    return img
+
+
+def load_sprites(theme, sprite_dir=None):
+    """52 faces + back (index 52) for a theme, cached per worker"""
+    import cv2
+
+    key = (theme, sprite_dir)
+    if key in _SPRITE_CACHE:
+        return _SPRITE_CACHE[key]
+    font, back, red = theme
+    sprites = []
+    for card in range(52):
+        sprite = None
+        if sprite_dir:
+            sprite = cv2.imread(str(Path(sprite_dir) / f"{card_code(card)}.png"), cv2.IMREAD_COLOR)
+        if sprite is None:
+            sprite = render_face(card, font, red)
+        sprites.append(cv2.resize(sprite, (SPRITE_W, SPRITE_H), interpolation=cv2.INTER_AREA))
+    back_sprite = cv2.imread(str(Path(sprite_dir) / "back.png"), cv2.IMREAD_COLOR) if sprite_dir else None
+    if back_sprite is None:
+        back_sprite = render_back(back)
+    sprites.append(cv2.resize(back_sprite, (SPRITE_W, SPRITE_H), interpolation=cv2.INTER_AREA))
+    _SPRITE_CACHE[key] = np.stack(sprites)
+    return _SPRITE_CACHE[key]
+
+
+def _unit_noise():
+    """One N(0, 1) field per worker, large enough for any canvas"""
+    import cv2
+
+    if not _NOISE:
+        side = max(max(size) for size in CANVAS_SIZES) + 64
+        noise = np.empty((side, side, 3), np.float32)
+        cv2.randn(noise, 0, 1)
+        _NOISE.append(noise)
+    return _NOISE[0]
+
+
+def random_state(rng):
+    """A legal mid-game state: a seeded deal plus random legal moves"""
+    from klondike import deal, generate_moves, apply_move
+
+    state = deal(rng.randrange(1 << 30))
+    for _ in range(rng.randrange(0, 120)):
+        moves = generate_moves(state)
+        if not moves:
+            break
+        state = apply_move(state, rng.choice(moves))
+    return state
+
+
+def _background(rng, h, w):
+    """Table colour with a gradient and a low-frequency felt texture"""
+    import cv2
+
+    base = np.array(rng.choice(TABLE_COLORS), np.float32) * rng.uniform(0.7, 1.2)
+    gx = rng.uniform(-0.25, 0.25) * (np.arange(w, dtype=np.float32) / w - 0.5)
+    gy = rng.uniform(-0.25, 0.25) * (np.arange(h, dtype=np.float32) / h - 0.5)
+    texture = np.empty((h // 4 + 1, w // 4 + 1), np.float32)
+    cv2.randn(texture, 0, rng.uniform(0.01, 0.04))
+    texture = cv2.resize(texture, (w, h), interpolation=cv2.INTER_LINEAR)
+    shade = texture + gx[None, :] + (gy[:, None] + 1)
+    return cv2.merge([cv2.convertScaleAbs(shade, alpha=float(c)) for c in base])
+
+
+def layout_table(state, rng, w, h):
+    """Place every visible card and slot.
+
+    Returns (placements, labels, slots, (card width, card height)):
+    placements are (sprite index, x, y) drawn in order; labels are
+    (class, x0, y0, x1, y1, card or None, full_corner) with pixel boxes
+    of the visible part of each card, full_corner telling whether its
+    whole corner index is visible; slots are the (x, y) of empty pile
+    outlines.
+    """
+    gap = rng.uniform(0.08, 0.25)
+    margin = rng.uniform(0.01, 0.06) * w
+    cw = (w - 2 * margin) / (7 + 6 * gap)
+    ch = cw * rng.uniform(1.36, 1.45)
+    sx = cw * (1 + gap)
+    top = rng.uniform(0.02, 0.2) * h
+    tableau_y = top + ch * rng.uniform(1.15, 1.5)
+
+    placements, labels, slots = [], [], []
+
+    # Stock, waste fan and foundations on the top row
+    stock = len(state.talon) - state.pos
+    slots.append((margin, top))
+    if stock:
+        placements.append((52, margin, top))
+        labels.append((CARD_BACK, margin, top, margin + cw, top + ch, None, True))
+    fan = cw * rng.uniform(0.18, 0.3)
+    shown = state.talon[max(0, state.pos - 3):state.pos]
+    for k, card in enumerate(shown):
+        x = margin + sx + k * fan
+        placements.append((card, x, top))
+        visible = cw if k == len(shown) - 1 else fan
+        labels.append((FACE_UP, x, top, x + visible, top + ch, card, k == len(shown) - 1))
+    for suit in range(4):
+        x = margin + (3 + suit) * sx
+        slots.append((x, top))
+        labels.append((SLOT_FOUNDATION, x, top, x + cw, top + ch, None, True))
+        height = state.found[suit]
+        if height:
+            card = suit * 13 + height - 1
+            placements.append((card, x, top))
+            labels.append((FACE_UP, x, top, x + cw, top + ch, card, True))
+
+    # Tableau fans, compressed if a column would run off the image
+    down_step = ch * rng.uniform(0.06, 0.12)
+    up_step = ch * rng.uniform(0.18, 0.3)
+    for i, (col, hidden) in enumerate(zip(state.cols, state.down)):
+        x = margin + i * sx
+        slots.append((x, tableau_y))
+        labels.append((SLOT_TABLEAU, x, tableau_y, x + cw, tableau_y + ch, None, True))
+        length = hidden * down_step + max(0, len(col) - hidden - 1) * up_step + ch
+        squeeze = min(1.0, (h - tableau_y - 4) / length) if length > 0 else 1.0
+        y = tableau_y
+        for depth, card in enumerate(col):
+            face_up = depth >= hidden
+            step = (up_step if face_up else down_step) * squeeze
+            is_top = depth == len(col) - 1
+            visible = ch if is_top else step
+            placements.append((card if face_up else 52, x, y))
+            # The next card covers the corner unless the fan step clears the index
+            labels.append((FACE_UP if face_up else CARD_BACK, x, y, x + cw, y + visible,
+                           card if face_up else None, is_top or step >= cw * CORNER_HEIGHT_FRAC))
+            y += step
+    return placements, labels, slots, (cw, ch)
+
+
+def composite(canvas, sprites, placements, slots, size, rng):
+    """Paint slot outlines, then cards back to front with rounded corners"""
+    import cv2
+
+    cw, ch = int(round(size[0])), int(round(size[1]))
+    radius = max(2, cw // 12)
+    mask = _round_mask(cw, ch, radius)
+    for x, y in slots:
+        x, y = int(round(x)), int(round(y))
+        cv2.rectangle(canvas, (x, y), (x + cw, y + ch), (200, 200, 200), max(1, cw // 50), cv2.LINE_AA)
+
+    resized = {}
+    shadow = rng.uniform(0.6, 0.85)
+    offset = max(1, cw // 40)
+    hh, ww = canvas.shape[:2]
+    for index, x, y in placements:
+        if index not in resized:
+            resized[index] = cv2.resize(sprites[index], (cw, ch), interpolation=cv2.INTER_AREA)
+        x, y = int(round(x)), int(round(y))
+        x1, y1 = min(x + cw, ww), min(y + ch, hh)
+        if x1 <= x or y1 <= y:
+            continue
+        # Soft drop shadow, then the card; copyTo writes through the views
+        sx1, sy1 = min(x1 + offset, ww), min(y1 + offset, hh)
+        region = canvas[y + offset:sy1, x + offset:sx1]
+        cv2.copyTo(cv2.convertScaleAbs(region, alpha=shadow), mask[:region.shape[0], :region.shape[1]], region)
+        region = canvas[y:y1, x:x1]
+        cv2.copyTo(resized[index][:y1 - y, :x1 - x], mask[:y1 - y, :x1 - x], region)
+    return canvas
+
+
+def augment(image, boxes, rng, perspective=0.06):
+    """Perspective warp plus lighting; boxes (N, 4) xyxy are warped along"""
+    import cv2
+
+    h, w = image.shape[:2]
+    src = np.float32([[0, 0], [w, 0], [w, h], [0, h]])
+    jitter = np.array([[rng.uniform(-1, 1) * perspective * w, rng.uniform(-1, 1) * perspective * h]
+                       for _ in range(4)], np.float32)
+    matrix = cv2.getPerspectiveTransform(src, src + jitter)
+    image = cv2.warpPerspective(image, matrix, (w, h), borderMode=cv2.BORDER_REFLECT)
+
+    if len(boxes):
+        corners = np.stack([boxes[:, [0, 1]], boxes[:, [2, 1]], boxes[:, [2, 3]], boxes[:, [0, 3]]], axis=1)
+        warped = cv2.perspectiveTransform(corners.reshape(-1, 1, 2).astype(np.float32), matrix).reshape(-1, 4, 2)
+        boxes = np.concatenate([warped.min(axis=1), warped.max(axis=1)], axis=1)
+        boxes[:, [0, 2]] = np.clip(boxes[:, [0, 2]], 0, w)
+        boxes[:, [1, 3]] = np.clip(boxes[:, [1, 3]], 0, h)
+
+    # Lighting: directional gradient and vignette (separable, so built
+    # from 1-D profiles), exposure, gamma via a LUT, sensor noise
+    xs = np.arange(w, dtype=np.float32) / w - 0.5
+    ys = np.arange(h, dtype=np.float32) / h - 0.5
+    vignette = rng.uniform(0, 0.7)
+    exposure = rng.uniform(0.75, 1.15)
+    lx = exposure * (rng.uniform(-0.3, 0.3) * xs - vignette * xs ** 2)
+    ly = exposure * (1 + rng.uniform(-0.3, 0.3) * ys - vignette * ys ** 2)
+    out = image.astype(np.float32)
+    out *= (lx[None, :] + ly[:, None])[..., None]
+    sigma = rng.uniform(0, 6)
+    if sigma > 0.5:
+        noise = _unit_noise()
+        oy, ox = rng.randrange(noise.shape[0] - h + 1), rng.randrange(noise.shape[1] - w + 1)
+        cv2.scaleAdd(noise[oy:oy + h, ox:ox + w], sigma, out, dst=out)
+    np.clip(out, 0, 255, out=out)
+    gamma = rng.uniform(0.8, 1.25)
+    lut = (255 * (np.arange(256) / 255) ** gamma).astype(np.uint8)
+    image = cv2.LUT(out.astype(np.uint8), lut)
+    if rng.random() < 0.3:
+        image = cv2.GaussianBlur(image, (3, 3), 0)
+    return image, boxes
+
+
+def render_table(seed, sprite_dir=None, perspective=0.06):
+    """Render one table. Returns (BGR image, labels, crops, crop codes)"""
+    import cv2
+
+    rng = random.Random(seed)
+    w, h = rng.choice(CANVAS_SIZES)
+    fonts = [cv2.FONT_HERSHEY_SIMPLEX, cv2.FONT_HERSHEY_DUPLEX, cv2.FONT_HERSHEY_TRIPLEX, cv2.FONT_HERSHEY_COMPLEX]
+    theme = (rng.choice(fonts), rng.choice(BACK_COLORS), rng.choice([(30, 30, 200), (40, 20, 170)]))
+    sprites = load_sprites(theme, sprite_dir)
+
+    state = random_state(rng)
+    placements, labels, slots, size = layout_table(state, rng, w, h)
+    canvas = composite(_background(rng, h, w), sprites, placements, slots, size, rng)
+
+    boxes = np.array([label[1:5] for label in labels], np.float32).reshape(-1, 4)
+    image, boxes = augment(canvas, boxes, rng, perspective)
+
+    keep = ((boxes[:, 2] - boxes[:, 0]) > 2) & ((boxes[:, 3] - boxes[:, 1]) > 2)
+    yolo = []
+    crop_boxes, codes = [], []
+    for label, box, ok in zip(labels, boxes, keep):
+        if not ok:
+            continue
+        cls, card, full_corner = label[0], label[5], label[6]
+        xc, yc = (box[0] + box[2]) / 2 / w, (box[1] + box[3]) / 2 / h
+        bw, bh = (box[2] - box[0]) / w, (box[3] - box[1]) / h
+        yolo.append((cls, xc, yc, bw, bh))
+        if cls == FACE_UP and full_corner:
+            crop_boxes.append((xc, yc, bw, bh))
+            codes.append(card_code(card))
+
+    crops = extract_crops(image, corner_rois(np.array(crop_boxes, np.float32), w, h), CROP_SIZE) \
+        if crop_boxes else np.zeros((0, CROP_SIZE, CROP_SIZE, 3), np.uint8)
+    return image, yolo, crops, codes
+
+
+def _render_chunk(job):
+    """Render and write a chunk of tables. Returns (images, crops)"""
+    import cv2
+
+    seeds, output_dir, prefix, train_split, split_seed, sprite_dir, perspective, quality = job
+    output_dir = Path(output_dir)
+    cv2.setNumThreads(1)
+    n_images = n_crops = 0
+    for seed in seeds:
+        image, yolo, crops, codes = render_table(seed, sprite_dir, perspective)
+        stem = f"{prefix}_{seed:07d}"
+        split = stable_split(f"{stem}.jpg", train_split, split_seed)
+        det = output_dir / "detection_data"
+        cv2.imwrite(str(det / "images" / split / f"{stem}.jpg"), image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        with open(det / "labels" / split / f"{stem}.txt", 'w') as f:
+            f.writelines(f"{c} {xc:.6f} {yc:.6f} {bw:.6f} {bh:.6f}\n" for c, xc, yc, bw, bh in yolo)
+
+        for k, (crop, code) in enumerate(zip(crops, codes)):
+            name = f"{stem}_{k:02d}.png"
+            card52_path = output_dir / "card52_data" / code / name
+            ok, buf = cv2.imencode(".png", crop)
+            if not ok:
+                continue
+            buf.tofile(str(card52_path))
+            # Same file names as corner_crops.py --derive-rank-suit
+            place_file(card52_path, output_dir / "rank_data" / code[:-1] / f"{code}_{name}", "auto")
+            place_file(card52_path, output_dir / "suit_data" / SUIT_NAMES[code[-1]] / f"{code}_{name}", "auto")
+            n_crops += 1
+        n_images += 1
+    return n_images, n_crops
+
+
+def _write_data_yaml(detection_dir):
+    import yaml
+
+    data_yaml = detection_dir / "data.yaml"
+    if data_yaml.exists():
+        return
+    with open(data_yaml, "w") as f:
+        yaml.dump({"path": str(detection_dir.absolute()), "train": "images/train", "val": "images/val",
+                   "nc": len(DETECTOR_LABELS), "names": DETECTOR_LABELS}, f, default_flow_style=False)
+
+
+def synthesize(output_dir, count=1000, start_seed=0, workers=None, chunk_size=16, prefix="synth",
+               train_split=0.8, split_seed=42, sprite_dir=None, perspective=0.06, quality=90):
+    """Render count tables into a training_data-style tree"""
+    output_dir = Path(output_dir)
+    detection_dir = output_dir / "detection_data"
+    for split in ("train", "val"):
+        (detection_dir / "images" / split).mkdir(parents=True, exist_ok=True)
+        (detection_dir / "labels" / split).mkdir(parents=True, exist_ok=True)
+    for card in range(52):
+        code = card_code(card)
+        (output_dir / "card52_data" / code).mkdir(parents=True, exist_ok=True)
+        (output_dir / "rank_data" / code[:-1]).mkdir(parents=True, exist_ok=True)
+        (output_dir / "suit_data" / SUIT_NAMES[code[-1]]).mkdir(parents=True, exist_ok=True)
+    _write_data_yaml(detection_dir)
+
+    seeds = list(range(start_seed, start_seed + count))
+    jobs = [(seeds[i:i + chunk_size], str(output_dir), prefix, train_split, split_seed,
+             str(sprite_dir) if sprite_dir else None, perspective, quality)
+            for i in range(0, len(seeds), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+
+    print(f"🎨 Rendering {count} synthetic tables on {workers} workers into {output_dir}...")
+    start = time.perf_counter()
+    images = crops = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_render_chunk, job) for job in jobs]
+        for done, future in enumerate(as_completed(futures), 1):
+            n_images, n_crops = future.result()
+            images += n_images
+            crops += n_crops
+            if done % max(1, len(jobs) // 10) == 0 or done == len(jobs):
+                elapsed = time.perf_counter() - start
+                print(f"   {images}/{count} images, {crops} crops ({images / elapsed * 60:.0f} images/min)")
+
+    elapsed = time.perf_counter() - start
+    print(f"✓ {images} images and {crops} corner crops in {elapsed:.1f}s "
+          f"({images / elapsed * 60:.0f} images/min)")
+    return images, crops
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render synthetic labeled Klondike tables")
+    parser.add_argument("--output-dir", type=str, default="synthetic_data", help="Training data directory to write into")
+    parser.add_argument("--count", type=int, default=1000, help="Tables to render")
+    parser.add_argument("--start-seed", type=int, default=0, help="Seed of the first table (use to append more)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=16, help="Tables per worker job")
+    parser.add_argument("--prefix", type=str, default="synth", help="File name prefix")
+    parser.add_argument("--train-split", type=float, default=0.8, help="Fraction of images for training")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the stable train/val split")
+    parser.add_argument("--sprites", type=str, default=None, help="Directory of <code>.png card faces and back.png")
+    parser.add_argument("--perspective", type=float, default=0.06, help="Max corner jitter as a fraction of the image")
+    parser.add_argument("--jpeg-quality", type=int, default=90, help="JPEG quality of rendered images")
+
+    args = parser.parse_args()
+
+    synthesize(args.output_dir, args.count, args.start_seed, args.workers, args.chunk_size, args.prefix,
+               args.train_split, args.seed, args.sprites, args.perspective, args.jpeg_quality)
+
+
+if __name__ == "__main__":
+    main()
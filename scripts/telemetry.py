@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+SolSolve Training Telemetry
+
+Opt-in, structured timing for training and data preparation. A run log
+is a JSONL file; every line is one event of a run:
+- stage: wall time, CPU time and peak RSS of a named step (split,
+  fit, export, ...); the peak is the stage's own on Linux, where the
+  high-water mark can be reset at stage start
+- epoch: samples/sec and how the epoch divides into step time, input
+  wait and everything else (validation, callbacks)
+- probe: input pipeline and model compute rates measured in isolation
+- profile: top functions of a cProfile window, or a TF profiler trace
+
+Nothing is recorded unless a log path is given, and then the overhead
+is a few clock reads per batch.
+
+Usage:
+    python train_models.py --data-path training_data --train-rank --telemetry runs.jsonl
+    python telemetry.py runs.jsonl                      # summarize the last run
+    python telemetry.py runs.jsonl --compare old.jsonl  # stage and epoch deltas between runs
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import contextlib
+from pathlib import Path
+
+_RUN_LOG = None
+
+
+def peak_rss_mb(children=False):
+    """Peak resident set size of this process (or its finished children) in MB"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # ru_maxrss is in KB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(usage.ru_maxrss / scale, 1)
+
+
+def reset_peak_rss():
+    """Reset this process's RSS high-water mark (Linux 4.0+). True if it worked"""
+    try:
+        with open("/proc/self/clear_refs", 'w') as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def hwm_rss_mb():
+    """RSS high-water mark since the last reset_peak_rss() (VmHWM), in MB"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def current_rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return round(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class RunLog:
+    """Appends the events of one run to a JSONL file; a no-op without a path"""
+
+    def __init__(self, path=None, script=None, **fields):
+        self.path = Path(path) if path else None
+        self.run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        self._start = time.perf_counter()
+        # Peak RSS of the open stages, innermost last; a nested stage resets
+        # the high-water mark, so it hands its peak up to the enclosing one
+        self._stage_peaks = []
+        # Resetting the high-water mark also resets ru_maxrss, so the process peak is tracked here
+        self._process_peak = 0.0
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.event("run_start", script=script or Path(sys.argv[0]).name, argv=sys.argv[1:],
+                       host=socket.gethostname(), cpus=os.cpu_count(), **fields)
+
+    def __bool__(self):
+        return self.path is not None
+
+    def event(self, kind, **fields):
+        if not self.path:
+            return
+        record = {"run": self.run_id, "event": kind, "t": round(time.perf_counter() - self._start, 4), **fields}
+        # One short append per event, so concurrent workers can share a log
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record, default=str) + "\n")
+
+    @contextlib.contextmanager
+    def stage(self, name, **fields):
+        """Time a block; extra fields can be added to the yielded dict"""
+        info = dict(fields)
+        if not self.path:
+            yield info
+            return
+        wall, cpu = time.perf_counter(), time.process_time()
+        rss_before = current_rss_mb()
+        self.process_peak_mb()
+        measured = reset_peak_rss() and hwm_rss_mb() is not None
+        self._stage_peaks.append(0.0)
+        ok = False
+        try:
+            yield info
+            ok = True
+        finally:
+            peak = self._stage_peaks.pop()
+            if measured:
+                peak = max(peak, hwm_rss_mb() or 0.0)
+                if self._stage_peaks:
+                    self._stage_peaks[-1] = max(self._stage_peaks[-1], peak)
+                self._process_peak = max(self._process_peak, peak)
+            # Without a resettable high-water mark only the process peak so far is known
+            self.event("stage", name=name, ok=ok,
+                       seconds=round(time.perf_counter() - wall, 4),
+                       cpu_seconds=round(time.process_time() - cpu, 4),
+                       rss_mb=current_rss_mb(), rss_before_mb=rss_before,
+                       peak_rss_mb=peak if measured else None, process_peak_rss_mb=self.process_peak_mb(),
+                       children_peak_rss_mb=peak_rss_mb(children=True),
+                       **info)
+
+    def process_peak_mb(self):
+        """Peak RSS of the process so far, across high-water mark resets"""
+        self._process_peak = max(self._process_peak, peak_rss_mb() or 0.0)
+        return self._process_peak
+
+    def close(self, **fields):
+        if self.path:
+            self.event("run_end", seconds=round(time.perf_counter() - self._start, 4),
+                       peak_rss_mb=self.process_peak_mb(), **fields)
+
+
+def start_run(path=None, script=None, **fields):
+    """Open the process-wide run log (disabled when path is None)"""
+    global _RUN_LOG
+    _RUN_LOG = RunLog(path, script, **fields)
+    return _RUN_LOG
+
+
+def get_log():
+    """The current run log, or a disabled one"""
+    global _RUN_LOG
+    if _RUN_LOG is None:
+        _RUN_LOG = RunLog()
+    return _RUN_LOG
+
+
+class StepTimer:
+    """Per-epoch accounting from batch begin/end timestamps.
+
+    step time is batch begin → end. For ultralytics the gap from one
+    batch's end to the next one's begin is the data loader; Keras pulls
+    the batch inside the step, so there the input wait is step time
+    beyond the model compute timed by the trainer's probe. Everything else
+    in the epoch (validation, callbacks) is "other".
+    """
+
+    def __init__(self, log, model_type, num_samples, compute_step_seconds=None):
+        self.log = log
+        self.model_type = model_type
+        self.num_samples = num_samples
+        self.compute_step_seconds = compute_step_seconds
+
+    def epoch_begin(self):
+        self.epoch_start = time.perf_counter()
+        self.last_end = None
+        self.steps = 0
+        self.step_seconds = 0.0
+        self.gap_seconds = 0.0
+
+    def batch_begin(self):
+        self.batch_start = time.perf_counter()
+        if self.last_end is not None:
+            self.gap_seconds += self.batch_start - self.last_end
+
+    def batch_end(self):
+        self.last_end = time.perf_counter()
+        self.step_seconds += self.last_end - self.batch_start
+        self.steps += 1
+
+    def epoch_end(self, epoch, gap_is_input_wait=False, **fields):
+        elapsed = time.perf_counter() - self.epoch_start
+        record = {
+            "model_type": self.model_type,
+            "epoch": epoch,
+            "seconds": round(elapsed, 4),
+            "steps": self.steps,
+            "samples_per_sec": round(self.num_samples / elapsed, 1) if elapsed > 0 else None,
+            "step_seconds": round(self.step_seconds, 4),
+        }
+        if gap_is_input_wait:
+            record["input_wait_seconds"] = round(self.gap_seconds, 4)
+        elif self.compute_step_seconds is not None:
+            # Keras pulls the batch inside the step: wait = step time beyond pure compute
+            compute = self.compute_step_seconds * self.steps
+            record["compute_seconds"] = round(compute, 4)
+            record["input_wait_seconds"] = round(max(0.0, self.step_seconds - compute), 4)
+        record["other_seconds"] = round(max(0.0, elapsed - self.step_seconds
+                                           - (self.gap_seconds if gap_is_input_wait else 0.0)), 4)
+        record.update(fields)
+        self.log.event("epoch", **record)
+        return record
+
+
+def time_batches(batches, max_batches):
+    """(batches, samples, seconds) to pull up to max_batches (x, y) batches from an iterable"""
+    count = samples = 0
+    start = time.perf_counter()
+    for x, _ in batches:
+        samples += len(x)
+        count += 1
+        if count >= max_batches:
+            break
+    return count, samples, time.perf_counter() - start
+
+
+def time_calls(fn, calls, warmup=2):
+    """Mean seconds per fn() call after warmup calls (tracing, first allocations)"""
+    for _ in range(warmup):
+        fn()
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / max(1, calls)
+
+
+class ProfileWindow:
+    """cProfile or TF profiler capture over steps [start, start + steps)"""
+
+    def __init__(self, log, kind, start, steps, output_dir, name):
+        self.log = log
+        self.kind = kind
+        self.start = start
+        self.stop_at = start + steps
+        self.output_dir = Path(output_dir)
+        self.name = name
+        self.step = 0
+        self.profiler = None
+        self.done = False
+
+    def batch_begin(self):
+        if not self.done and self.profiler is None and self.step == self.start:
+            self._start()
+
+    def batch_end(self):
+        self.step += 1
+        if self.profiler is not None and self.step >= self.stop_at:
+            self.finish()
+
+    def _start(self):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._wall = time.perf_counter()
+        if self.kind == "tf":
+            import tensorflow as tf
+            self.trace_dir = self.output_dir / f"{self.name}_trace"
+            tf.profiler.experimental.start(str(self.trace_dir))
+            self.profiler = "tf"
+        else:
+            import cProfile
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def finish(self):
+        """Stop a running capture (also safe to call when nothing is running)"""
+        if self.profiler is None:
+            return
+        seconds = round(time.perf_counter() - self._wall, 4)
+        steps = self.step - self.start
+        if self.kind == "tf":
+            import tensorflow as tf
+            tf.profiler.experimental.stop()
+            self.log.event("profile", name=self.name, profiler="tf", steps=steps, seconds=seconds,
+                           trace_dir=str(self.trace_dir))
+            print(f"📊 TF profiler trace of {steps} steps: {self.trace_dir} (open with TensorBoard)")
+        else:
+            import pstats
+            self.profiler.disable()
+            path = self.output_dir / f"{self.name}.prof"
+            self.profiler.dump_stats(str(path))
+            stats = pstats.Stats(self.profiler)
+            top = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:25]
+            self.log.event("profile", name=self.name, profiler="cprofile", steps=steps, seconds=seconds,
+                           stats_file=str(path),
+                           top=[{"function": f"{Path(fn).name}:{line}({func})", "calls": nc,
+                                 "tottime": round(tt, 4), "cumtime": round(ct, 4)}
+                                for (fn, line, func), (_, nc, tt, ct, _) in top])
+            print(f"📊 cProfile of {steps} steps: {path}")
+        self.profiler = None
+        self.done = True
+
+
+# ---------------------------------------------------------------- summaries
+
+def load_runs(path):
+    """{run id: [events]} in file order"""
+    runs = {}
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            runs.setdefault(record.get("run"), []).append(record)
+    return runs
+
+
+def summarize_run(events):
+    """Stage totals, per-model epoch means and probes of one run"""
+    start = next((e for e in events if e["event"] == "run_start"), {})
+    end = next((e for e in events if e["event"] == "run_end"), {})
+    stages = {}
+    for e in events:
+        if e["event"] == "stage":
+            s = stages.setdefault(e["name"], {"seconds": 0.0, "cpu_seconds": 0.0, "count": 0, "peak_rss_mb": 0})
+            s["seconds"] += e["seconds"]
+            s["cpu_seconds"] += e.get("cpu_seconds") or 0.0
+            s["count"] += 1
+            s["peak_rss_mb"] = max(s["peak_rss_mb"], e.get("peak_rss_mb") or 0)
+
+    epochs = {}
+    for e in events:
+        if e["event"] == "epoch":
+            epochs.setdefault(e["model_type"], []).append(e)
+    epoch_summary = {}
+    for model_type, rows in epochs.items():
+        # The first epoch includes tracing and cache filling; report it apart
+        steady = rows[1:] or rows
+
+        def mean(key):
+            values = [r[key] for r in steady if r.get(key) is not None]
+            return round(sum(values) / len(values), 4) if values else None
+
+        epoch_summary[model_type] = {
+            "epochs": len(rows),
+            "first_epoch_seconds": rows[0]["seconds"],
+            "seconds": mean("seconds"),
+            "samples_per_sec": mean("samples_per_sec"),
+            "step_seconds": mean("step_seconds"),
+            "input_wait_seconds": mean("input_wait_seconds"),
+            "other_seconds": mean("other_seconds"),
+        }
+    return {
+        "run": start.get("run"),
+        "script": start.get("script"),
+        "argv": start.get("argv"),
+        "seconds": end.get("seconds"),
+        "peak_rss_mb": end.get("peak_rss_mb"),
+        "stages": stages,
+        "epochs": epoch_summary,
+        "probes": [e for e in events if e["event"] == "probe"],
+        "profiles": [e for e in events if e["event"] == "profile"],
+    }
+
+
+def _fmt(value, spec=".2f"):
+    return "-" if value is None else format(value, spec)
+
+
+def print_summary(summary):
+    print(f"📊 Run {summary['run']} ({summary['script']} {' '.join(summary['argv'] or [])})")
+    print(f"   total {_fmt(summary['seconds'], '.1f')}s, peak RSS {_fmt(summary['peak_rss_mb'], '.0f')} MB")
+    if summary["stages"]:
+        print(f"   {'stage':<28} {'seconds':>9} {'cpu s':>9} {'peak MB':>8}")
+        for name, s in summary["stages"].items():
+            print(f"   {name:<28} {s['seconds']:>9.2f} {s['cpu_seconds']:>9.2f} {s['peak_rss_mb']:>8.0f}")
+    for model_type, e in summary["epochs"].items():
+        print(f"   {model_type}: {e['epochs']} epochs, first {e['first_epoch_seconds']:.2f}s, then "
+              f"{_fmt(e['seconds'])}s at {_fmt(e['samples_per_sec'], '.1f')} samples/s "
+              f"(step {_fmt(e['step_seconds'])}s, input wait {_fmt(e['input_wait_seconds'])}s, "
+              f"other {_fmt(e['other_seconds'])}s)")
+    for probe in summary["probes"]:
+        rates = ", ".join(f"{k} {v}" for k, v in probe.items() if k.endswith("_per_sec"))
+        print(f"   probe {probe.get('model_type', '')}: {rates}")
+    for profile in summary["profiles"]:
+        where = profile.get("stats_file") or profile.get("trace_dir")
+        print(f"   {profile['profiler']} capture of {profile['steps']} steps: {where}")
+        for row in profile.get("top", [])[:5]:
+            print(f"      {row['cumtime']:>8.3f}s  {row['function']}")
+
+
+def compare_runs(base, new):
+    """Print stage and epoch deltas from base to new"""
+
+    def delta(a, b):
+        if a is None or b is None:
+            return "-"
+        if not a:
+            return "new"
+        return f"{(b - a) / a * 100:+.0f}%"
+
+    print(f"📊 {base['run']} → {new['run']}")
+    print(f"   {'total':<28} {_fmt(base['seconds']):>9} {_fmt(new['seconds']):>9} "
+          f"{delta(base['seconds'], new['seconds']):>7}")
+    print(f"   {'stage (seconds)':<28} {'before':>9} {'after':>9} {'change':>7}")
+    for name in list(base["stages"]) + [n for n in new["stages"] if n not in base["stages"]]:
+        a = base["stages"].get(name, {}).get("seconds")
+        b = new["stages"].get(name, {}).get("seconds")
+        print(f"   {name:<28} {_fmt(a):>9} {_fmt(b):>9} {delta(a, b):>7}")
+    for model_type in sorted(set(base["epochs"]) | set(new["epochs"])):
+        a, b = base["epochs"].get(model_type, {}), new["epochs"].get(model_type, {})
+        for key in ("samples_per_sec", "step_seconds", "input_wait_seconds", "other_seconds"):
+            label = f"{model_type} {key}"
+            print(f"   {label:<28} {_fmt(a.get(key)):>9} {_fmt(b.get(key)):>9} "
+                  f"{delta(a.get(key), b.get(key)):>7}")
+
+
+def _pick(path, run_id=None):
+    runs = load_runs(path)
+    if not runs:
+        print(f"❌ No runs in {path}")
+        sys.exit(1)
+    if run_id:
+        matches = [r for r in runs if r and r.startswith(run_id)]
+        if not matches:
+            print(f"❌ Run {run_id} not in {path}")
+            sys.exit(1)
+        return summarize_run(runs[matches[-1]])
+    return summarize_run(list(runs.values())[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize or compare SolSolve telemetry run logs")
+    parser.add_argument("log", type=str, help="Run log (JSONL)")
+    parser.add_argument("--run", type=str, default=None, help="Run id prefix (default: the last run in the log)")
+    parser.add_argument("--compare", type=str, default=None,
+                        help="Baseline run log to compare against (its last run, or --base-run)")
+    parser.add_argument("--base-run", type=str, default=None, help="Run id prefix in the baseline log")
+    parser.add_argument("--list", action="store_true", help="List the runs in the log")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+
+    args = parser.parse_args()
+
+    if args.list:
+        for run_id, events in load_runs(args.log).items():
+            start = events[0]
+            print(f"{run_id}  {start.get('script', '')} {' '.join(start.get('argv') or [])}")
+        return
+
+    summary = _pick(args.log, args.run)
+    if args.compare:
+        compare_runs(_pick(args.compare, args.base_run), summary)
+    elif args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_summary(summary)
+
+
+if __name__ == "__main__":
+    main()
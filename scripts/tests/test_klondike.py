@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+from klondike import KlondikeState, deal, solve, generate_moves, apply_move, reachable_positions
+from klondike.cards import card_name
+from klondike.moves import DRAW
+
+
+def _simulate_draws(length, pos):
+    """{position: fewest stock turns} by turning the stock one step at a time"""
+    reached = {pos: 0} if pos else {}
+    q, draws = pos, 0
+    for _ in range(4 * (length // DRAW + 2)):
+        q = min(q + DRAW, length) if q < length else 0
+        draws += 1
+        if q and q not in reached:
+            reached[q] = draws
+    return reached
+
+
+@pytest.mark.parametrize("length", range(25))
+def test_reachable_positions_match_simulation(length):
+    for pos in range(length + 1):
+        assert dict(reachable_positions(length, pos)) == _simulate_draws(length, pos)
+
+
+def _fresh_key(state):
+    return KlondikeState(state.cols, state.down, state.found, state.talon, state.pos).key
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_incremental_key_matches_recomputed(seed):
+    rng = random.Random(seed)
+    state = deal(seed)
+    for _ in range(200):
+        moves = generate_moves(state)
+        if not moves:
+            break
+        state = apply_move(state, rng.choice(moves))
+        assert state.key == _fresh_key(state)
+
+
+def _layout(tableau, down=None):
+    """Tableau in one column; suits it does not use are complete on the foundations"""
+    used = {card[-1] for card in tableau}
+    foundation = [None if suit in used else "K" + suit for suit in "♣♦♥♠"]
+    stock = [card_name(c) for c in range(52) if card_name(c)[-1] in used and card_name(c) not in tableau]
+    return KlondikeState.from_piles([tableau] + [[]] * 6, down and [down] + [0] * 6, foundation, stock)
+
+
+def test_from_piles_rejects_out_of_sequence_runs():
+    with pytest.raises(ValueError):
+        _layout(["A♣", "2♣"])
+    with pytest.raises(ValueError):
+        _layout(["3♥", "2♦"])
+    with pytest.raises(ValueError):
+        _layout(["A♣", "2♥"], down=2)
+    assert _layout(["4♦", "3♣", "2♦"], down=1).hidden == 1
+
+
+def test_from_piles_rejects_oversized_stock():
+    with pytest.raises(ValueError):
+        KlondikeState.from_piles([[]] * 7, stock=[card_name(c) for c in range(52)])
+
+
+def test_unfinishable_board_does_not_hang():
+    # Bypasses from_piles: clubs 3..K stacked out of sequence over an empty talon
+    state = KlondikeState((bytes([0, 1]), bytes(range(12, 1, -1))) + (b"",) * 5,
+                          (0,) * 7, (0, 13, 13, 13), b"", 0)
+    result = solve(state, max_nodes=10_000, time_limit=5)
+    assert not result.solved
@@ -0,0 +1,31 @@
+from sweep_classifiers import pareto_front, pick_candidate
+
+
+def _result(name, accuracy, latency):
+    return {"name": name, "top1_accuracy": accuracy, "latency_ms_p50": latency}
+
+
+RESULTS = [
+    _result("fast", 0.80, 0.10),
+    _result("slow_worse", 0.78, 0.30),   # beaten by fast on both
+    _result("mid", 0.90, 0.20),
+    _result("mid_tie", 0.90, 0.25),      # same accuracy as mid, slower
+    _result("best", 0.95, 0.40),
+    _result("best_slower", 0.95, 0.50),
+]
+
+
+def test_pareto_front_keeps_only_undominated_fastest_first():
+    assert [r["name"] for r in pareto_front(RESULTS)] == ["fast", "mid", "best"]
+
+
+def test_pareto_front_keeps_exact_duplicates():
+    twins = [_result("a", 0.9, 0.2), _result("b", 0.9, 0.2)]
+    assert [r["name"] for r in pareto_front(twins)] == ["a", "b"]
+
+
+def test_pick_candidate_takes_fastest_within_tolerance():
+    front = pareto_front(RESULTS)
+    assert pick_candidate(front, 0.0)["name"] == "best"
+    assert pick_candidate(front, 0.05)["name"] == "mid"
+    assert pick_candidate(front, 0.2)["name"] == "fast"
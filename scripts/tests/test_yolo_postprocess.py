@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from yolo_postprocess import nms, _greedy_nms_reference, decode, synthetic_output
+
+
+def _random_boxes(rng, n, num_classes):
+    """Boxes clustered around a few centers, so suppression chains occur"""
+    centers = rng.uniform(0, 400, size=(max(1, n // 20), 2))
+    xy = centers[rng.integers(len(centers), size=n)] + rng.normal(0, 8, size=(n, 2))
+    wh = rng.uniform(20, 80, size=(n, 2))
+    boxes = np.concatenate([xy - wh / 2, xy + wh / 2], axis=1).astype(np.float32)
+    return boxes, rng.random(n).astype(np.float32), rng.integers(num_classes, size=n)
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("iou_threshold", [0.3, 0.45, 0.7])
+def test_nms_matches_greedy_reference(seed, iou_threshold):
+    rng = np.random.default_rng(seed)
+    boxes, scores, class_ids = _random_boxes(rng, int(rng.integers(1, 200)), 4)
+    expected = _greedy_nms_reference(boxes, scores, class_ids, iou_threshold)
+    np.testing.assert_array_equal(nms(boxes, scores, class_ids, iou_threshold), expected)
+
+
+def test_nms_empty():
+    kept = nms(np.zeros((0, 4), np.float32), np.zeros((0,), np.float32), np.zeros((0,), np.int64))
+    assert kept.shape == (0,)
+
+
+def test_decode_synthetic_output_matches_reference():
+    raw = synthetic_output(candidates=3549, objects=40, seed=3)
+    boxes, scores, class_ids = decode(raw, 416)
+    assert len(scores) and np.all(np.diff(scores) <= 0)
+    assert len(nms(boxes, scores, class_ids)) == len(scores)
@@ -6,6 +6,7 @@ This script trains all three required models locally:
 1. Card detector (YOLOv8)
 2. Rank classifier (13 classes)
 3. Suit classifier (4 classes)
+or, instead of 2 and 3, a single 52-class card classifier (card52)
 
 Usage:
     python train_models.py --data-path /path/to/your/196/images
@@ -13,67 +14,391 @@ Usage:
 
 import os
 import sys
+import time
 import shutil
 import argparse
 import json
 from pathlib import Path
-import cv2
-import numpy as np
-from PIL import Image
-import yaml
+from importlib import metadata
 
-try:
-    from ultralytics import YOLO
-except ImportError:
-    print("Error: ultralytics not installed. Run: pip install ultralytics")
-    sys.exit(1)
+from dataset_utils import find_images, split_class_files, stable_split, sync_split, LINK_MODES
+from dataset_catalog import DatasetCatalog
+from stage_cache import StageCache, stage_key, code_version, DEFAULT_CACHE_SIZE
+from telemetry import start_run, get_log, StepTimer, ProfileWindow, time_batches, time_calls
+from detector_cache import build_image_cache
 
-try:
-    import tensorflow as tf
-except ImportError:
-    print("Error: tensorflow not installed. Run: pip install tensorflow")
-    sys.exit(1)
+# TensorFlow, ultralytics and numpy are loaded on first use, so --help,
+# --setup and cached stages never pay for importing them
+tf = None
+np = None
+ThroughputCallback = None
+
+# Batches timed per part by the telemetry input probe
+PROBE_BATCHES = 20
+
+# Written into a detector run's directory: the stage key it was started
+# with, the last finished epoch and whether training completed
+RUN_STATE_NAME = "solsolve_run.json"
+
+# Classifier outputs follow their sorted class directories; these are the
+# expected classes, used when a model has no saved <type>_labels.json
+RANKS = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
+DEFAULT_LABELS = {
+    "rank": RANKS,
+    "suit": ["clubs", "diamonds", "hearts", "spades"],
+    "card52": [f"{rank}{suit}" for suit in "CDHS" for rank in RANKS]
+}
+CLASSIFIER_TYPES = list(DEFAULT_LABELS)
+
+# Classifier architectures are named "<conv>-w<width>": conv is "standard"
+# or "separable" (depthwise-separable after the first layer) and width
+# scales every layer's channels. standard-w1 is the original model.
+CLASSIFIER_CONVS = ["standard", "separable"]
+DEFAULT_ARCHITECTURE = "standard-w1"
+
+def parse_architecture(name):
+    """'separable-w0.5' → {"conv": "separable", "width": 0.5}"""
+    conv, _, width = name.partition("-w")
+    if conv not in CLASSIFIER_CONVS:
+        raise ValueError(f"Unknown classifier conv '{conv}' (use {' or '.join(CLASSIFIER_CONVS)})")
+    try:
+        width = float(width or 1)
+    except ValueError:
+        raise ValueError(f"Bad width in classifier architecture '{name}'")
+    if width <= 0:
+        raise ValueError(f"Bad width in classifier architecture '{name}'")
+    return {"conv": conv, "width": width}
+
+def architecture_name(architecture):
+    return f"{architecture['conv']}-w{architecture['width']:g}"
+
+# CPU performance profiles. Thread counts of None mean "all cores";
+# "default" leaves TensorFlow and ultralytics at their stock settings.
+PERFORMANCE_PROFILES = {
+    "default": {
+        "intra_op_threads": 0,
+        "inter_op_threads": 0,
+        "jit_compile": False,
+        "mixed_precision": False,
+        "detector_workers": 8,
+        "detector_cache": False
+    },
+    "cpu": {
+        "intra_op_threads": None,
+        "inter_op_threads": 2,
+        "jit_compile": False,
+        "mixed_precision": False,
+        "detector_workers": None,
+        "detector_cache": "ram"
+    },
+    "cpu-xla": {
+        "intra_op_threads": None,
+        "inter_op_threads": 2,
+        "jit_compile": True,
+        "mixed_precision": False,
+        "detector_workers": None,
+        "detector_cache": "ram"
+    },
+    "cpu-xla-bf16": {
+        "intra_op_threads": None,
+        "inter_op_threads": 2,
+        "jit_compile": True,
+        "mixed_precision": True,
+        "detector_workers": None,
+        "detector_cache": "ram"
+    }
+}
+
+def _load_tensorflow():
+    """Import TensorFlow (and numpy) once and define the Keras callback that subclasses it"""
+    global tf, np, ThroughputCallback
+    if tf is not None:
+        return tf
+    try:
+        import tensorflow
+    except ImportError:
+        print("Error: tensorflow not installed. Run: pip install tensorflow")
+        sys.exit(1)
+    import numpy
+    tf, np = tensorflow, numpy
+    
+    class ThroughputCallback(tf.keras.callbacks.Callback):
+        """Record wall time and samples/sec for every training epoch.
+
+        With a telemetry StepTimer, batches are timed as well; with a
+        ProfileWindow, the chosen steps are profiled.
+        """
+        
+        def __init__(self, num_samples, timer=None, window=None):
+            super().__init__()
+            self.num_samples = num_samples
+            self.timer = timer
+            self.window = window
+            self.epochs = []
+            
+        def on_epoch_begin(self, epoch, logs=None):
+            self._start = time.perf_counter()
+            if self.timer:
+                self.timer.epoch_begin()
+        
+        def on_train_batch_begin(self, batch, logs=None):
+            if self.window:
+                self.window.batch_begin()
+            if self.timer:
+                self.timer.batch_begin()
+        
+        def on_train_batch_end(self, batch, logs=None):
+            if self.timer:
+                self.timer.batch_end()
+            if self.window:
+                self.window.batch_end()
+            
+        def on_epoch_end(self, epoch, logs=None):
+            elapsed = time.perf_counter() - self._start
+            self.epochs.append({
+                "epoch": epoch + 1,
+                "seconds": round(elapsed, 3),
+                "samples_per_sec": round(self.num_samples / elapsed, 1) if elapsed > 0 else None
+            })
+            if self.timer:
+                logs = logs or {}
+                self.timer.epoch_end(epoch + 1, **{key: round(float(logs[key]), 4)
+                                                   for key in ("loss", "accuracy", "val_loss", "val_accuracy")
+                                                   if key in logs})
+        
+        def on_train_end(self, logs=None):
+            if self.window:
+                self.window.finish()
+    
+    return tf
+
+def _load_yolo():
+    try:
+        from ultralytics import YOLO
+    except ImportError:
+        print("Error: ultralytics not installed. Run: pip install ultralytics")
+        sys.exit(1)
+    return YOLO
+
+def _package_version(name):
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
 
 class SolSolveTrainer:
-    def __init__(self, data_path, output_dir="trained_models"):
+    def __init__(self, data_path, output_dir="trained_models", seed=42, link_mode="copy", workers=8,
+                 use_shards=False, profile="default", threads=None, classifier_export="float16",
+                 use_cache=True, cache_dir=None, cache_size=DEFAULT_CACHE_SIZE,
+                 telemetry=None, trace=None, trace_start=10, trace_steps=20,
+                 input_size=64, architecture=DEFAULT_ARCHITECTURE, run_name="detector", resume=True,
+                 image_cache=True, thread_budget=None):
         self.data_path = Path(data_path)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        self.seed = seed
+        self.link_mode = link_mode
+        self.workers = workers
+        self.use_shards = use_shards
+        self.classifier_export = classifier_export
+        self.stage_cache = StageCache(cache_dir or self.output_dir / ".stage_cache", cache_size) if use_cache else None
+        self.telemetry = telemetry if telemetry is not None else get_log()
+        self.trace = trace
+        self.trace_start = trace_start
+        self.trace_steps = trace_steps
+        self.run_name = run_name
+        self.resume = resume
+        
+        cpu_count = os.cpu_count() or 1
+        self.profile_name = profile
+        self.profile = dict(PERFORMANCE_PROFILES[profile])
+        if threads is not None:
+            self.profile["intra_op_threads"] = threads
+        # A share of the cores for concurrent jobs: intra-op, inter-op and tf.data pools all stay within it
+        self.data_threads = thread_budget
+        if thread_budget is not None:
+            self.profile["intra_op_threads"] = thread_budget
+            self.profile["inter_op_threads"] = min(2, thread_budget)
+        for key in ("intra_op_threads", "detector_workers"):
+            if self.profile[key] is None:
+                self.profile[key] = cpu_count
         
         # Model configurations
         self.detector_config = {
             "input_size": 416,
             "epochs": 100,
             "batch_size": 16,
-            "patience": 20
+            "patience": 20,
+            "workers": self.profile["detector_workers"],
+            "cache": self.profile["detector_cache"],
+            # Train from detection_data/cache_<input_size>, pre-resized PNGs
+            "image_cache": image_cache,
+            # int8 export sizes; the smallest with mAP@0.5 >= map_floor is kept
+            "export_sizes": [320, 416, 512],
+            "map_floor": 0.85
         }
         
         self.classifier_config = {
-            "input_size": 64,
+            "input_size": input_size,
+            "architecture": parse_architecture(architecture),
             "epochs": 50,
             "batch_size": 32,
             "patience": 15
         }
         
+        self._tf_ready = False
+        self._catalog = None
+        self._catalog_fresh = set()
+        
+    def _ensure_tensorflow(self):
+        """Import TensorFlow and apply the performance profile before its first use"""
+        if not self._tf_ready:
+            _load_tensorflow()
+            self.apply_performance_profile()
+            self._tf_ready = True
+        
+    def apply_performance_profile(self):
+        """Configure TensorFlow threading and precision for the selected profile"""
+        try:
+            tf.config.threading.set_intra_op_parallelism_threads(self.profile["intra_op_threads"])
+            tf.config.threading.set_inter_op_parallelism_threads(self.profile["inter_op_threads"])
+        except RuntimeError:
+            # Thread pools are fixed once the TF runtime has started
+            print("⚠️  TensorFlow already initialized; thread settings unchanged")
+        
+        policy = "mixed_bfloat16" if self.profile["mixed_precision"] else "float32"
+        tf.keras.mixed_precision.set_global_policy(policy)
+        
+        if self.profile_name != "default":
+            print(f"⚙️  Performance profile '{self.profile_name}': "
+                  f"intra-op {self.profile['intra_op_threads']}, inter-op {self.profile['inter_op_threads']}, "
+                  f"XLA {'on' if self.profile['jit_compile'] else 'off'}, {policy}")
+    
+    def _save_throughput(self, model_type, epochs):
+        """Write per-epoch samples/sec for this run"""
+        path = self.output_dir / f"throughput_{model_type}.json"
+        with open(path, 'w') as f:
+            json.dump({"model_type": model_type, "profile": self.profile_name,
+                       "settings": self.profile, "epochs": epochs}, f, indent=2)
+        if epochs:
+            rates = [e["samples_per_sec"] for e in epochs if e["samples_per_sec"]]
+            if rates:
+                print(f"⏱️  {model_type}: median {sorted(rates)[len(rates) // 2]:.1f} samples/sec "
+                      f"(profile '{self.profile_name}', {path.name})")
+        
+    def _code_version(self, *libraries):
+        """Hash of the training code plus the versions of libraries that shape the output"""
+        here = Path(__file__).resolve().parent
+        versions = {name: _package_version(name) for name in ("tensorflow",) + libraries}
+        return code_version([here / "train_models.py", here / "dataset_utils.py", here / "crop_shards.py",
+                             here / "dataset_catalog.py"], versions)
+    
+    def catalog(self, part):
+        """The dataset catalog of output_dir, with part ("detection" or a classifier tree) rescanned once per run"""
+        if self._catalog is None:
+            self._catalog = DatasetCatalog(self.output_dir, workers=self.workers)
+        if part not in self._catalog_fresh:
+            self._catalog.update([part])
+            self._catalog_fresh.add(part)
+        return self._catalog
+    
+    def _detector_key(self, export=True):
+        """Stage key over detection images and labels (hashes from the dataset catalog).
+
+        With export=False the export settings are left out: that key decides
+        whether an interrupted run can be resumed, which they do not affect.
+        """
+        files = self.catalog("detection").detection_hashes()
+        skip = ("workers", "cache", "image_cache") + (() if export else ("export_sizes", "map_floor"))
+        params = {key: value for key, value in self.detector_config.items() if key not in skip}
+        params.update(base_model="yolov8n.pt", seed=self.seed)
+        return stage_key("detector", files, params, self._code_version("ultralytics"))
+    
+    def _classifier_key(self, model_type):
+        """Stage key over a classifier's class tree, hyperparameters and export settings"""
+        files = self.catalog(model_type).crop_hashes(model_type)
+        params = dict(self.classifier_config, seed=self.seed, export=self.classifier_export,
+                      mixed_precision=self.profile["mixed_precision"], jit_compile=self.profile["jit_compile"])
+        return stage_key(model_type, files, params, self._code_version())
+    
+    def _classifier_artifacts(self, model_type):
+        if self.classifier_export == "float16":
+            return [f"{model_type}.tflite", f"{model_type}_labels.json"]
+        variant = "float16" if self.classifier_export == "int8" else "int8"
+        return [f"{model_type}.tflite", f"{model_type}_labels.json", f"{model_type}_{variant}.tflite",
+                f"{model_type}_export_report.json"]
+    
+    def _save_labels(self, model_type, class_names, input_size=None, architecture=None):
+        """Record a classifier's output order and input size for create_config"""
+        with open(self.output_dir / f"{model_type}_labels.json", 'w') as f:
+            json.dump({"model_type": model_type, "labels": list(class_names),
+                       "input_size": input_size or self.classifier_config["input_size"],
+                       "architecture": architecture_name(architecture or self.classifier_config["architecture"])},
+                      f, indent=2)
+    
+    def _classifier_info(self, model_type):
+        """Saved labels and input size of a trained classifier.
+
+        Falls back to the sorted expected classes and the configured input
+        size for models trained before these were saved.
+        """
+        info = {"labels": sorted(DEFAULT_LABELS[model_type]), "input_size": self.classifier_config["input_size"]}
+        path = self.output_dir / f"{model_type}_labels.json"
+        if path.exists():
+            with open(path) as f:
+                info.update(json.load(f))
+        return info
+    
+    def _classifier_labels(self, model_type):
+        return self._classifier_info(model_type)["labels"]
+    
+    def _restore_stage(self, stage, key):
+        """Restore a stage's artifacts if an identical run is cached. True on a hit"""
+        entry = self.stage_cache.lookup(key)
+        if entry is None:
+            return False
+        names = self.stage_cache.restore(entry, self.output_dir)
+        print(f"♻️  {stage}: inputs, settings and code unchanged ({key[:12]}); restored {', '.join(names)} from cache")
+        return True
+    
+    def _store_stage(self, stage, key, names):
+        paths = [self.output_dir / name for name in names]
+        if all(p.exists() for p in paths):
+            self.stage_cache.store(key, stage, paths)
+    
+    def _cache_check(self, stage, make_key):
+        """(key, hit) for a stage, restoring its artifacts on a hit. Key is None without a cache"""
+        if not self.stage_cache:
+            return None, False
+        with self.telemetry.stage(f"{stage}.cache_check") as info:
+            key = make_key()
+            info["hit"] = self._restore_stage(stage, key)
+        return key, info["hit"]
+    
+    def _profile_window(self, name):
+        """ProfileWindow for --trace, or None"""
+        if not self.trace:
+            return None
+        return ProfileWindow(self.telemetry, self.trace, self.trace_start, self.trace_steps,
+                             self.output_dir / "profiles", name)
+    
     def setup_directories(self):
         """Create training directory structure"""
         dirs = [
             "detection_data",
             "rank_data", 
             "suit_data",
+            "card52_data",
             "models"
         ]
         
         for dir_name in dirs:
             (self.output_dir / dir_name).mkdir(exist_ok=True)
             
-        # Create rank subdirectories
-        for rank in ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']:
-            (self.output_dir / "rank_data" / rank).mkdir(exist_ok=True)
-            
-        # Create suit subdirectories
-        for suit in ['clubs', 'diamonds', 'hearts', 'spades']:
-            (self.output_dir / "suit_data" / suit).mkdir(exist_ok=True)
+        # Create rank, suit and card52 class subdirectories
+        for model_type, labels in DEFAULT_LABELS.items():
+            for label in labels:
+                (self.output_dir / f"{model_type}_data" / label).mkdir(exist_ok=True)
             
         print("✓ Directory structure created")
     
@@ -87,30 +412,24 @@ class SolSolveTrainer:
         (detection_dir / "labels" / "train").mkdir(parents=True, exist_ok=True)
         (detection_dir / "labels" / "val").mkdir(parents=True, exist_ok=True)
         
-        # Copy images to training directories
-        image_files = list(self.data_path.glob("*.jpg")) + list(self.data_path.glob("*.png"))
+        # Link or copy images into a stable, seeded train/val split
+        image_files = find_images(self.data_path)
         
         if not image_files:
             print("❌ No images found in data path")
             return False
             
-        # Split into train/val (80/20)
-        np.random.shuffle(image_files)
-        split_idx = int(len(image_files) * 0.8)
-        train_files = image_files[:split_idx]
-        val_files = image_files[split_idx:]
+        with self.telemetry.stage("split", images=len(image_files)):
+            train_count, val_count, stats = sync_split(
+                image_files, detection_dir,
+                train_split=0.8, seed=self.seed, mode=self.link_mode, workers=self.workers
+            )
+        self._catalog_fresh.discard("detection")
         
         print(f"📊 Found {len(image_files)} images")
-        print(f"   Training: {len(train_files)}")
-        print(f"   Validation: {len(val_files)}")
-        
-        # Copy training images
-        for img_file in train_files:
-            shutil.copy2(img_file, detection_dir / "images" / "train" / img_file.name)
-            
-        # Copy validation images  
-        for img_file in val_files:
-            shutil.copy2(img_file, detection_dir / "images" / "val" / img_file.name)
+        print(f"   Training: {train_count}")
+        print(f"   Validation: {val_count}")
+        print(f"   Unchanged: {stats['unchanged']}, placed: {stats['placed']}, removed: {stats['removed']}")
         
         # Create YAML config
         yaml_config = {
@@ -121,6 +440,7 @@ class SolSolveTrainer:
             "names": ["card_face_up", "card_back", "pile_slot_tableau", "pile_slot_foundation"]
         }
         
+        import yaml
         with open(detection_dir / "data.yaml", "w") as f:
             yaml.dump(yaml_config, f, default_flow_style=False)
             
@@ -128,6 +448,8 @@ class SolSolveTrainer:
         print("   Use a tool like LabelImg or Roboflow to create .txt files in labels/train and labels/val")
         print("   Each .txt file should contain: class_id x_center y_center width height")
         print("   Class IDs: 0=card_face_up, 1=card_back, 2=pile_slot_tableau, 3=pile_slot_foundation")
+        print("   Once a first detector is trained, draft the remaining labels with:")
+        print("   python auto_label.py --data-dir training_data --models-dir trained_models")
         
         return True
     
@@ -149,185 +471,967 @@ class SolSolveTrainer:
         if not data_yaml.exists():
             print("❌ Detection data.yaml not found. Run prepare_detection_data() first")
             return False
+        
+        key, hit = self._cache_check("detector", lambda: self._detector_key())
+        if hit:
+            # The restored detector.tflite may be a different size than config.json names
+            self._update_config_entry("detector", inputSize=self._detector_input_size())
+            return True
+        # Resume on training inputs only: a new --detector-sizes or map floor just re-exports
+        run_key = self._detector_key(export=False)
+        
+        YOLO = _load_yolo()
+        
+        train_yaml = data_yaml
+        if self.detector_config["image_cache"]:
+            with self.telemetry.stage("detector.image_cache") as info:
+                cache_yaml, stats = build_image_cache(detection_dir, self.detector_config["input_size"],
+                                                      workers=self.workers,
+                                                      hashes=self.catalog("detection").detection_hashes())
+                info.update(stats)
+            train_yaml = cache_yaml or data_yaml
+        
+        run_dir, checkpoint = self._detector_run(run_key)
+        state = {"key": run_key, "complete": False, "epoch": 0}
+        if checkpoint:
+            state = self._load_run_state(run_dir)
+            print(f"♻️  Resuming detector run '{self.run_name}' after epoch {state['epoch']} "
+                  f"of {self.detector_config['epochs']}")
+            model = YOLO(str(checkpoint))
+        else:
+            print("🚀 Training detection model...")
+            # Initialize YOLOv8 model
+            model = YOLO('yolov8n.pt')  # Start with nano model
+        
+        # Record samples/sec per epoch
+        epochs = []
+        
+        # The gap between one batch's end and the next one's start is the data loader
+        timer = StepTimer(self.telemetry, "detector", 0) if self.telemetry else None
+        window = None
+        if self.trace == "tf":
+            print("⚠️  --trace tf covers TensorFlow only; profiling detector steps with cProfile")
+            window = ProfileWindow(self.telemetry, "cprofile", self.trace_start, self.trace_steps,
+                                   self.output_dir / "profiles", "detector_steps")
+        elif self.trace:
+            window = self._profile_window("detector_steps")
+        
+        def on_train_epoch_start(trainer):
+            trainer._epoch_started = time.perf_counter()
+            if timer:
+                timer.num_samples = len(trainer.train_loader.dataset)
+                timer.epoch_begin()
             
-        print("🚀 Training detection model...")
+        def on_train_epoch_end(trainer):
+            elapsed = time.perf_counter() - trainer._epoch_started
+            num_samples = len(trainer.train_loader.dataset)
+            epochs.append({
+                "epoch": trainer.epoch + 1,
+                "seconds": round(elapsed, 3),
+                "samples_per_sec": round(num_samples / elapsed, 1) if elapsed > 0 else None
+            })
+            if timer:
+                timer.epoch_end(trainer.epoch + 1, gap_is_input_wait=True)
+            state["epoch"] = trainer.epoch + 1
+            self._save_run_state(run_dir, state)
         
-        # Initialize YOLOv8 model
-        model = YOLO('yolov8n.pt')  # Start with nano model
+        def on_train_batch_start(trainer):
+            if window:
+                window.batch_begin()
+            if timer:
+                timer.batch_begin()
+        
+        def on_train_batch_end(trainer):
+            if timer:
+                timer.batch_end()
+            if window:
+                window.batch_end()
+        
+        model.add_callback("on_train_epoch_start", on_train_epoch_start)
+        model.add_callback("on_train_epoch_end", on_train_epoch_end)
+        if timer or window:
+            model.add_callback("on_train_batch_start", on_train_batch_start)
+            model.add_callback("on_train_batch_end", on_train_batch_end)
         
         # Train the model
-        results = model.train(
-            data=str(data_yaml),
-            epochs=self.detector_config["epochs"],
-            imgsz=self.detector_config["input_size"],
-            batch=self.detector_config["batch_size"],
-            patience=self.detector_config["patience"],
-            save=True,
-            project=str(self.output_dir / "models"),
-            name="detector"
-        )
+        with self.telemetry.stage("detector.train", resumed=bool(checkpoint)):
+            try:
+                if checkpoint:
+                    # ultralytics restores the epoch, optimizer and arguments from last.pt
+                    results = model.train(resume=True)
+                else:
+                    run_dir.mkdir(parents=True, exist_ok=True)
+                    self._save_run_state(run_dir, state)
+                    results = model.train(
+                        data=str(train_yaml),
+                        epochs=self.detector_config["epochs"],
+                        imgsz=self.detector_config["input_size"],
+                        batch=self.detector_config["batch_size"],
+                        patience=self.detector_config["patience"],
+                        workers=self.detector_config["workers"],
+                        cache=self.detector_config["cache"],
+                        save=True,
+                        project=str(run_dir.parent),
+                        name=run_dir.name,
+                        exist_ok=True
+                    )
+            finally:
+                if window:
+                    window.finish()
+        state["complete"] = True
+        self._save_run_state(run_dir, state)
+        self._save_throughput("detector", epochs)
         
-        # Export to TFLite
-        best_model = self.output_dir / "models" / "detector" / "weights" / "best.pt"
+        # Export int8 TFLite variants and keep the smallest input size that holds the mAP floor
+        best_model = run_dir / "weights" / "best.pt"
         if best_model.exists():
-            model = YOLO(str(best_model))
-            model.export(format='tflite', int8=True, imgsz=self.detector_config["input_size"])
-            
-            # Copy to output directory
-            tflite_file = best_model.parent / "best.tflite"
-            if tflite_file.exists():
-                shutil.copy2(tflite_file, self.output_dir / "detector.tflite")
-                print("✓ Detection model exported to TFLite")
-            else:
-                print("❌ Failed to export detection model")
+            report = self.export_detector_matrix(best_model)
+            if report and key:
+                self._store_stage("detector", key, self._detector_artifacts(report))
         else:
             print("❌ No best model found after training")
             
         return True
     
-    def train_classifier(self, model_type):
-        """Train rank or suit classifier"""
-        if model_type not in ["rank", "suit"]:
-            print("❌ Invalid model type. Use 'rank' or 'suit'")
-            return False
-            
-        data_dir = self.output_dir / f"{model_type}_data"
-        if not data_dir.exists():
-            print(f"❌ {model_type} data directory not found")
-            return False
-            
-        print(f"🚀 Training {model_type} classifier...")
+    def _load_run_state(self, run_dir):
+        path = run_dir / RUN_STATE_NAME
+        if not path.exists():
+            return {}
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_run_state(self, run_dir, state):
+        path = run_dir / RUN_STATE_NAME
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, path)
+    
+    def _detector_run(self, run_key):
+        """(run directory, last.pt to resume from or None) for the configured run name.
+
+        A run is resumed only if it was interrupted and its data, settings
+        and code are unchanged. Otherwise an existing run directory is moved
+        to <name>.previous so the new run keeps the name.
+        """
+        run_dir = self.output_dir / "models" / self.run_name
+        if not run_dir.exists():
+            return run_dir, None
+        state = self._load_run_state(run_dir)
+        checkpoint = run_dir / "weights" / "last.pt"
+        if not self.resume:
+            reason = "--no-resume"
+        elif state.get("complete"):
+            reason = "it finished"
+        elif not checkpoint.exists():
+            reason = "no checkpoint"
+        elif state.get("key") != run_key:
+            reason = "data, settings or code changed since it stopped"
+        else:
+            return run_dir, checkpoint
+        previous = run_dir.with_name(f"{run_dir.name}.previous")
+        if previous.exists():
+            shutil.rmtree(previous)
+        run_dir.rename(previous)
+        print(f"🗂️  Starting detector run '{self.run_name}' over ({reason}); old run moved to {previous.name}")
+        return run_dir, None
+    
+    def _detector_artifacts(self, report):
+        return (["detector.tflite", "detector_export_report.json"]
+                + [variant["file"] for variant in report["variants"]])
+    
+    def _export_detector_int8(self, best_model, input_size, data_yaml):
+        """Export best.pt to int8 TFLite at one input size, calibrated on the val images. Returns its path"""
+        YOLO = _load_yolo()
+        # data= points calibration at our validation split instead of ultralytics' sample dataset
+        exported = YOLO(str(best_model)).export(format='tflite', int8=True, imgsz=input_size, data=str(data_yaml))
+        exported = Path(str(exported)) if exported else None
+        if exported is None or exported.suffix != ".tflite":
+            # Older ultralytics versions return the export folder or nothing
+            candidates = sorted(best_model.parent.glob("*_saved_model/*int8*.tflite")) or [best_model.parent / "best.tflite"]
+            exported = candidates[0]
+        if not exported.exists():
+            return None
+        path = self.output_dir / f"detector_{input_size}.tflite"
+        shutil.copy2(exported, path)
+        return path
+    
+    def export_detector_matrix(self, best_model=None, sizes=None, map_floor=None):
+        """Export calibrated int8 detectors at several input sizes and keep the smallest good one.
+
+        Each size is exported to detector_<size>.tflite with the validation
+        images as calibration data, then measured for mAP on the validation
+        split and for CPU latency (1 thread). The smallest size whose mAP@0.5
+        reaches map_floor becomes detector.tflite and its inputSize goes into
+        config.json; without labeled validation images the configured input
+        size is kept. Returns the report saved to detector_export_report.json.
+        """
+        from evaluate_models import evaluate_detector
+        from benchmark_models import _isolated, _measure_model
         
-        # Count samples per class
-        class_counts = {}
-        for class_dir in data_dir.iterdir():
-            if class_dir.is_dir():
-                class_counts[class_dir.name] = len(list(class_dir.glob("*.jpg")) + list(class_dir.glob("*.png")))
+        detection_dir = self.output_dir / "detection_data"
+        best_model = Path(best_model or self.output_dir / "models" / self.run_name / "weights" / "best.pt")
+        sizes = sorted(sizes or self.detector_config["export_sizes"])
+        map_floor = self.detector_config["map_floor"] if map_floor is None else map_floor
+        if not best_model.exists():
+            print(f"❌ {best_model} not found")
+            return None
         
-        if not class_counts:
-            print(f"❌ No training data found in {data_dir}")
-            return False
+        variants = []
+        labels = ["card_face_up", "card_back", "pile_slot_tableau", "pile_slot_foundation"]
+        for size in sizes:
+            print(f"📦 Exporting int8 detector at {size}x{size}...")
+            with self.telemetry.stage("detector.export", input_size=size):
+                path = self._export_detector_int8(best_model, size, detection_dir / "data.yaml")
+            if path is None:
+                print(f"❌ Failed to export the detector at {size}")
+                continue
             
-        print(f"📊 {model_type} class distribution:")
-        for class_name, count in class_counts.items():
-            print(f"   {class_name}: {count} samples")
+            variant = {"input_size": size, "file": path.name, "size_kb": round(path.stat().st_size / 1024, 1)}
+            config = {"detector": {"file": path.name, "labels": labels, "inputSize": size,
+                                   "confidenceThreshold": 0.35, "nmsIoU": 0.45}}
+            with self.telemetry.stage("detector.export_eval", input_size=size):
+                with open(self.output_dir / f"detector_{size}_eval.jsonl", 'w') as out:
+                    summary = evaluate_detector(self.output_dir, self.output_dir, config,
+                                                os.cpu_count() or 1, 1, 8, out)
+                latency = _isolated(_measure_model, {"path": str(path), "threads": 1, "xnnpack": True,
+                                                     "batch": 1, "warmup": 5, "runs": 50})
+            if summary:
+                variant.update(map50=summary["map50"], map50_95=summary["map50_95"])
+            variant.update(latency_ms_p50=latency["p50_ms"], latency_ms_p90=latency["p90_ms"])
+            variants.append(variant)
         
-        # Create simple CNN model
-        num_classes = len(class_counts)
-        input_shape = (self.classifier_config["input_size"], self.classifier_config["input_size"], 3)
+        if not variants:
+            print("❌ Failed to export the detection model")
+            return None
+        
+        measured = [v for v in variants if "map50" in v]
+        passing = [v for v in measured if v["map50"] >= map_floor]
+        if passing:
+            selected = passing[0]
+            reason = f"smallest size with mAP@0.5 >= {map_floor}"
+        elif measured:
+            selected = max(measured, key=lambda v: v["map50"])
+            reason = f"no size reaches mAP@0.5 {map_floor}; most accurate"
+            print(f"⚠️  No detector size reaches mAP@0.5 {map_floor}; keeping the most accurate")
+        else:
+            configured = self.detector_config["input_size"]
+            selected = min(variants, key=lambda v: abs(v["input_size"] - configured))
+            reason = "no labeled validation images; configured input size"
+            print("⚠️  No labeled validation images to measure mAP; keeping the configured input size")
+        
+        print("📊 Detector export matrix (int8, calibrated on the val images):")
+        print(f"   {'size':>5} {'model':>9} {'mAP@0.5':>8} {'mAP@.5:.95':>11} {'p50 ms':>8} {'p90 ms':>8}")
+        for v in variants:
+            mark = "*" if v is selected else " "
+            map50 = f"{v['map50']:.3f}" if "map50" in v else "n/a"
+            map50_95 = f"{v['map50_95']:.3f}" if "map50_95" in v else "n/a"
+            print(f" {mark} {v['input_size']:>5} {v['size_kb']:>7.0f}KB {map50:>8} {map50_95:>11} "
+                  f"{v['latency_ms_p50']:>8.2f} {v['latency_ms_p90']:>8.2f}")
+        
+        shutil.copyfile(self.output_dir / selected["file"], self.output_dir / "detector.tflite")
+        report = {"map_floor": map_floor, "selected": selected["input_size"], "reason": reason, "variants": variants}
+        with open(self.output_dir / "detector_export_report.json", 'w') as f:
+            json.dump(report, f, indent=2)
+        self._update_config_entry("detector", inputSize=selected["input_size"])
+        print(f"✓ detector.tflite: {selected['input_size']}x{selected['input_size']} ({reason})")
+        return report
+    
+    def _detector_input_size(self):
+        """Input size picked by the last export matrix, else the configured one"""
+        path = self.output_dir / "detector_export_report.json"
+        if path.exists():
+            with open(path) as f:
+                return json.load(f)["selected"]
+        return self.detector_config["input_size"]
+    
+    def _update_config_entry(self, name, **fields):
+        """Set fields of one model in an existing config.json (other entries and thresholds are kept)"""
+        config_path = self.output_dir / "config.json"
+        if not config_path.exists():
+            return False
+        with open(config_path) as f:
+            config = json.load(f)
+        config.setdefault(name, {"confidenceThreshold": 0.6}).update(fields)
+        with open(config_path, 'w') as f:
+            json.dump(config, f, indent=2)
+        return True
+    
+    def _build_classifier(self, num_classes, input_size, architecture=None):
+        """Create the small CNN used for rank/suit classification"""
+        input_shape = (input_size, input_size, 3)
+        architecture = architecture or self.classifier_config["architecture"]
+        filters = [max(8, int(round(n * architecture["width"]))) for n in (32, 64, 64, 128)]
+        conv = tf.keras.layers.SeparableConv2D if architecture["conv"] == "separable" else tf.keras.layers.Conv2D
         
         model = tf.keras.Sequential([
-            tf.keras.layers.Conv2D(32, 3, activation='relu', input_shape=input_shape),
+            tf.keras.layers.Conv2D(filters[0], 3, activation='relu', input_shape=input_shape),
             tf.keras.layers.MaxPooling2D(),
-            tf.keras.layers.Conv2D(64, 3, activation='relu'),
+            conv(filters[1], 3, activation='relu'),
             tf.keras.layers.MaxPooling2D(),
-            tf.keras.layers.Conv2D(64, 3, activation='relu'),
+            conv(filters[2], 3, activation='relu'),
             tf.keras.layers.GlobalAveragePooling2D(),
             tf.keras.layers.Dropout(0.5),
-            tf.keras.layers.Dense(128, activation='relu'),
+            tf.keras.layers.Dense(filters[3], activation='relu'),
             tf.keras.layers.Dropout(0.3),
-            tf.keras.layers.Dense(num_classes, activation='softmax')
+            # Keep the softmax in float32 under mixed precision
+            tf.keras.layers.Dense(num_classes, activation='softmax', dtype='float32')
         ])
         
         model.compile(
             optimizer='adam',
             loss='categorical_crossentropy',
-            metrics=['accuracy']
+            metrics=['accuracy'],
+            jit_compile=self.profile["jit_compile"]
         )
-        
-        # Data augmentation
-        data_augmentation = tf.keras.Sequential([
+        return model
+    
+    def _export_float32(self, model, num_classes, input_size):
+        """Return a float32 copy of a mixed-precision model for TFLite export"""
+        if not self.profile["mixed_precision"]:
+            return model
+        tf.keras.mixed_precision.set_global_policy("float32")
+        export_model = self._build_classifier(num_classes, input_size)
+        export_model.set_weights(model.get_weights())
+        tf.keras.mixed_precision.set_global_policy("mixed_bfloat16")
+        return export_model
+    
+    def _build_augmentation(self):
+        """Keras augmentation layers, applied batched inside the tf.data graph"""
+        return tf.keras.Sequential([
             tf.keras.layers.RandomFlip("horizontal"),
             tf.keras.layers.RandomRotation(0.1),
             tf.keras.layers.RandomZoom(0.1),
             tf.keras.layers.RandomBrightness(0.2),
         ])
+    
+    def _load_classifier_data(self, model_type, data_dir):
+        """Return (class names, train source, val source) for a classifier.
+
+        A source is either a (paths, labels) pair of file lists or, with
+        use_shards, a (rows, labels, shard images) triple of (shard, row)
+        pairs into the memory-mapped shards. Either way source[1] holds the
+        labels. The train/val split is the stable per-file split from
+        dataset_utils.
+        """
+        from crop_shards import pack_shards, load_rows
         
-        # Create data generators
-        train_datagen = tf.keras.preprocessing.image.ImageDataGenerator(
-            preprocessing_function=data_augmentation,
-            rescale=1./255,
-            validation_split=0.2
-        )
+        input_size = self.classifier_config["input_size"]
+        if self.use_shards:
+            # Pack new crops (incremental) and read the memory-mapped shards
+            shard_dir = self.output_dir / (f"{model_type}_shards" if input_size == 64 else f"{model_type}_shards_{input_size}")
+            pack_shards(data_dir, shard_dir, size=input_size)
+            class_names, images, rows, labels, names = load_rows(shard_dir)
+            if not class_names:
+                return [], None, None
+            is_train = np.array([stable_split(name, 0.8, self.seed) == "train" for name in names], dtype=bool)
+            return (class_names,
+                    (rows[is_train], labels[is_train], images),
+                    (rows[~is_train], labels[~is_train], images))
         
-        train_generator = train_datagen.flow_from_directory(
-            str(data_dir),
-            target_size=(self.classifier_config["input_size"], self.classifier_config["input_size"]),
-            batch_size=self.classifier_config["batch_size"],
-            class_mode='categorical',
-            subset='training'
-        )
+        class_names, files = self.catalog(model_type).class_files(model_type)
+        train_files, val_files = split_class_files(files, 0.2, self.seed)
         
-        validation_generator = train_datagen.flow_from_directory(
-            str(data_dir),
-            target_size=(self.classifier_config["input_size"], self.classifier_config["input_size"]),
-            batch_size=self.classifier_config["batch_size"],
-            class_mode='categorical',
-            subset='validation'
-        )
+        def as_source(items):
+            return ([str(data_dir / rel) for rel, _ in items],
+                    np.array([class_id for _, class_id in items], dtype=np.int32))
+        
+        return class_names, as_source(train_files), as_source(val_files)
+    
+    def _make_dataset(self, source, num_classes, training, from_arrays=False, cache=True, input_size=None):
+        """Build a tf.data pipeline: parallel decode → cache → shuffle → batch → augment → prefetch"""
+        AUTOTUNE = tf.data.AUTOTUNE
+        input_size = input_size or self.classifier_config["input_size"]
+        batch_size = self.classifier_config["batch_size"]
+        
+        def decode(path, label):
+            image = tf.io.decode_image(tf.io.read_file(path), channels=3, expand_animations=False)
+            image = tf.image.resize(image, (input_size, input_size))
+            return image, label
+        
+        if from_arrays:
+            rows, labels, images = source
+            dataset = tf.data.Dataset.from_tensor_slices(np.arange(len(labels)))
+            
+            def gather(idx):
+                # Read the batch shard by shard, in row order within each memmap
+                batch = rows[idx]
+                x = np.empty((len(idx), input_size, input_size, 3), dtype=np.uint8)
+                for shard in np.unique(batch[:, 0]):
+                    at = np.flatnonzero(batch[:, 0] == shard)
+                    at = at[np.argsort(batch[at, 1])]
+                    x[at] = images[shard][batch[at, 1]]
+                return x, labels[idx]
+            
+            def gather_batch(idx):
+                x, y = tf.numpy_function(gather, [idx], [tf.uint8, tf.int32])
+                x.set_shape((None, input_size, input_size, 3))
+                y.set_shape((None,))
+                return tf.cast(x, tf.float32), y
+            
+            if training:
+                dataset = dataset.shuffle(len(labels), seed=self.seed, reshuffle_each_iteration=True)
+            dataset = dataset.batch(batch_size).map(gather_batch, num_parallel_calls=AUTOTUNE)
+        else:
+            paths, labels = source
+            dataset = tf.data.Dataset.from_tensor_slices((paths, labels))
+            dataset = dataset.map(decode, num_parallel_calls=AUTOTUNE)
+            if cache:
+                dataset = dataset.cache()
+            if training:
+                dataset = dataset.shuffle(max(1, len(labels)), seed=self.seed, reshuffle_each_iteration=True)
+            dataset = dataset.batch(batch_size)
+        
+        if training:
+            augmentation = self._build_augmentation()
+            dataset = dataset.map(lambda x, y: (augmentation(x, training=True), y),
+                                  num_parallel_calls=AUTOTUNE)
+        
+        dataset = dataset.map(lambda x, y: (x / 255.0, tf.one_hot(y, num_classes)),
+                              num_parallel_calls=AUTOTUNE)
+        if self.data_threads:
+            options = tf.data.Options()
+            options.threading.private_threadpool_size = self.data_threads
+            dataset = dataset.with_options(options)
+        return dataset.prefetch(AUTOTUNE)
+    
+    def _probe_classifier(self, model_type, train_source, num_classes, batches=PROBE_BATCHES):
+        """Time decoding, decoding + augmentation and model steps apart, on a throwaway model.
+
+        Returns the seconds per training step of the model alone, which
+        splits the fit's step time into compute and input wait.
+        """
+        input_size = self.classifier_config["input_size"]
+        batch_size = self.classifier_config["batch_size"]
+        rates = {}
+        for name, training in (("decode", False), ("augmented", True)):
+            # Uncached, so every batch pays the decode the first epoch pays
+            dataset = self._make_dataset(train_source, num_classes, training=training,
+                                         from_arrays=self.use_shards, cache=False)
+            count, samples, seconds = time_batches(dataset, batches)
+            rates[name] = samples / seconds if seconds > 0 else None
+        
+        x, y = next(iter(self._make_dataset(train_source, num_classes, training=False,
+                                            from_arrays=self.use_shards, cache=False)))
+        model = self._build_classifier(num_classes, input_size)
+        step_seconds = time_calls(lambda: model.train_on_batch(x, y), batches)
+        compute_rate = len(x) / step_seconds if step_seconds > 0 else None
+        
+        self.telemetry.event("probe", model_type=model_type, batches=batches, batch_size=batch_size,
+                             decode_samples_per_sec=round(rates["decode"], 1) if rates["decode"] else None,
+                             augmented_samples_per_sec=round(rates["augmented"], 1) if rates["augmented"] else None,
+                             compute_samples_per_sec=round(compute_rate, 1) if compute_rate else None,
+                             compute_step_seconds=round(step_seconds, 5))
+        print(f"🔍 {model_type} probe: decode {rates['decode'] or 0:.0f}/s, decode + augment "
+              f"{rates['augmented'] or 0:.0f}/s, model steps {compute_rate or 0:.0f} samples/s")
+        if rates["augmented"] and compute_rate and rates["augmented"] < compute_rate:
+            print("   The input pipeline is slower than the model until the decode cache is filled")
+        # Scale to the step a full batch takes; partial last batches make this an upper bound
+        return step_seconds * min(batch_size, len(train_source[1])) / len(x)
+    
+    def train_classifier(self, model_type):
+        """Train rank or suit classifier"""
+        if model_type not in CLASSIFIER_TYPES:
+            print("❌ Invalid model type. Use 'rank', 'suit' or 'card52'")
+            return False
+            
+        data_dir = self.output_dir / f"{model_type}_data"
+        if not data_dir.exists():
+            print(f"❌ {model_type} data directory not found")
+            return False
+        
+        key, hit = self._cache_check(model_type, lambda: self._classifier_key(model_type))
+        if hit:
+            return True
+        
+        with self.telemetry.stage(f"{model_type}.import_tensorflow"):
+            self._ensure_tensorflow()
+        print(f"🚀 Training {model_type} classifier...")
+        
+        input_size = self.classifier_config["input_size"]
+        with self.telemetry.stage(f"{model_type}.load_data") as info:
+            class_names, train_source, val_source = self._load_classifier_data(model_type, data_dir)
+            info["shards"] = self.use_shards
+        
+        if not class_names or len(train_source[1]) == 0:
+            print(f"❌ No training data found in {data_dir}")
+            return False
+        
+        # Count samples per class
+        counts = np.bincount(np.concatenate([train_source[1], val_source[1]]), minlength=len(class_names))
+        class_counts = dict(zip(class_names, counts.tolist()))
+            
+        print(f"📊 {model_type} class distribution:")
+        for class_name, count in class_counts.items():
+            print(f"   {class_name}: {count} samples")
+        print(f"   Training: {len(train_source[1])}, validation: {len(val_source[1])}")
+        empty = [name for name, count in class_counts.items() if count == 0]
+        if empty:
+            print(f"⚠️  No samples for {', '.join(empty)}; the model will never predict them")
+        
+        # Create simple CNN model
+        num_classes = len(class_counts)
+        model = self._build_classifier(num_classes, input_size)
+        
+        train_dataset = self._make_dataset(train_source, num_classes, training=True, from_arrays=self.use_shards)
+        validation_dataset = self._make_dataset(val_source, num_classes, training=False, from_arrays=self.use_shards)
+        
+        timer = None
+        if self.telemetry:
+            with self.telemetry.stage(f"{model_type}.probe"):
+                compute_step_seconds = self._probe_classifier(model_type, train_source, num_classes)
+            timer = StepTimer(self.telemetry, model_type, len(train_source[1]), compute_step_seconds)
+        throughput = ThroughputCallback(len(train_source[1]), timer, self._profile_window(f"{model_type}_steps"))
         
         # Train the model
-        history = model.fit(
-            train_generator,
-            epochs=self.classifier_config["epochs"],
-            validation_data=validation_generator,
-            callbacks=[
-                tf.keras.callbacks.EarlyStopping(
-                    patience=self.classifier_config["patience"],
-                    restore_best_weights=True
-                ),
-                tf.keras.callbacks.ReduceLROnPlateau(
-                    factor=0.5,
-                    patience=5,
-                    min_lr=1e-7
-                )
-            ]
-        )
+        with self.telemetry.stage(f"{model_type}.fit", train_samples=len(train_source[1])):
+            history = model.fit(
+                train_dataset,
+                epochs=self.classifier_config["epochs"],
+                validation_data=validation_dataset,
+                callbacks=[
+                    throughput,
+                    tf.keras.callbacks.EarlyStopping(
+                        patience=self.classifier_config["patience"],
+                        restore_best_weights=True
+                    ),
+                    tf.keras.callbacks.ReduceLROnPlateau(
+                        factor=0.5,
+                        patience=5,
+                        min_lr=1e-7
+                    )
+                ]
+            )
+        
+        self._save_throughput(model_type, throughput.epochs)
+        self._save_labels(model_type, class_names)
         
         # Export to TFLite
+        with self.telemetry.stage(f"{model_type}.export", variant="float16"):
+            export_model = self._export_float32(model, num_classes, input_size)
+            float16_model = self._convert_float16(export_model)
+        
+        if self.classifier_export == "float16":
+            self._write_tflite(model_type, float16_model)
+            print(f"✓ {model_type} classifier exported to TFLite")
+            if key:
+                self._store_stage(model_type, key, self._classifier_artifacts(model_type))
+            return True
+        
+        with self.telemetry.stage(f"{model_type}.export", variant="int8"):
+            int8_model = self._convert_int8(export_model, train_source)
+        if self.classifier_export == "int8":
+            self._write_tflite(model_type, int8_model)
+            self._write_tflite(f"{model_type}_float16", float16_model)
+        else:
+            self._write_tflite(model_type, float16_model)
+            self._write_tflite(f"{model_type}_int8", int8_model)
+        print(f"✓ {model_type} classifier exported to TFLite (float16 + int8)")
+        
+        with self.telemetry.stage(f"{model_type}.export_report"):
+            self._export_report(model_type, num_classes, val_source,
+                                {"float16": float16_model, "int8": int8_model})
+        if key:
+            self._store_stage(model_type, key, self._classifier_artifacts(model_type))
+        return True
+    
+    def _write_tflite(self, name, tflite_model):
+        """Save TFLite model bytes to <output_dir>/<name>.tflite"""
+        tflite_path = self.output_dir / f"{name}.tflite"
+        with open(tflite_path, 'wb') as f:
+            f.write(tflite_model)
+        return tflite_path
+    
+    def _convert_float16(self, model):
+        """float16 weights, float compute"""
         converter = tf.lite.TFLiteConverter.from_keras_model(model)
         converter.optimizations = [tf.lite.Optimize.DEFAULT]
         converter.target_spec.supported_types = [tf.float16]
+        return converter.convert()
+    
+    def _convert_int8(self, model, train_source, num_calibration=200):
+        """Full-integer model (int8 in/out) calibrated on training crops"""
+        calibration = self._make_dataset(train_source, model.output_shape[-1], training=False,
+                                         from_arrays=self.use_shards).unbatch()
         
-        tflite_model = converter.convert()
+        def representative_dataset():
+            for image, _ in calibration.take(num_calibration):
+                yield [tf.expand_dims(image, 0)]
         
-        # Save TFLite model
-        tflite_path = self.output_dir / f"{model_type}.tflite"
-        with open(tflite_path, 'wb') as f:
+        converter = tf.lite.TFLiteConverter.from_keras_model(model)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+        return converter.convert()
+    
+    def _run_tflite(self, tflite_model, images):
+        """(top-1 class per crop, per-crop latency in ms) through the TFLite interpreter, 1 thread"""
+        interpreter = tf.lite.Interpreter(model_content=tflite_model, num_threads=1)
+        interpreter.allocate_tensors()
+        input_detail = interpreter.get_input_details()[0]
+        output_detail = interpreter.get_output_details()[0]
+        
+        if input_detail["dtype"] == np.int8:
+            scale, zero_point = input_detail["quantization"]
+            inputs = np.clip(np.round(images / scale + zero_point), -128, 127).astype(np.int8)
+        else:
+            inputs = images.astype(input_detail["dtype"])
+        
+        predictions = np.zeros(len(inputs), dtype=np.int64)
+        latencies = []
+        for i, image in enumerate(inputs):
+            interpreter.set_tensor(input_detail["index"], image[None])
+            start = time.perf_counter()
+            interpreter.invoke()
+            latencies.append((time.perf_counter() - start) * 1000)
+            predictions[i] = np.argmax(interpreter.get_tensor(output_detail["index"])[0])
+        return predictions, np.array(latencies)
+    
+    def _evaluate_tflite(self, tflite_model, images, labels):
+        """Top-1 accuracy and per-crop CPU latency through the TFLite interpreter"""
+        predictions, latencies = self._run_tflite(tflite_model, images)
+        return {
+            "size_kb": round(len(tflite_model) / 1024, 1),
+            "latency_ms_p50": round(float(np.percentile(latencies, 50)), 3) if len(latencies) else None,
+            "latency_ms_p90": round(float(np.percentile(latencies, 90)), 3) if len(latencies) else None,
+            "top1_accuracy": round(float(np.mean(predictions == labels)), 4) if len(labels) else None
+        }
+    
+    def _validation_arrays(self, val_source, num_classes):
+        """(images, class ids) of the validation split, preprocessed as in training"""
+        images, labels = [], []
+        for x, y in self._make_dataset(val_source, num_classes, training=False, from_arrays=self.use_shards):
+            images.append(x.numpy())
+            labels.append(np.argmax(y.numpy(), axis=1))
+        images = np.concatenate(images) if images else np.zeros((0,), np.float32)
+        labels = np.concatenate(labels) if labels else np.zeros((0,), np.int64)
+        return images, labels
+    
+    def _export_report(self, model_type, num_classes, val_source, models):
+        """Compare exported variants on the validation split and save the report"""
+        images, labels = self._validation_arrays(val_source, num_classes)
+        
+        report = {"model_type": model_type, "validation_crops": int(len(labels)), "variants": {}}
+        print(f"📊 {model_type} export comparison ({len(labels)} validation crops):")
+        print(f"   {'variant':<8} {'size':>9} {'p50 ms/crop':>12} {'top-1':>7}")
+        for name, tflite_model in models.items():
+            result = self._evaluate_tflite(tflite_model, images, labels)
+            report["variants"][name] = result
+            accuracy = f"{result['top1_accuracy']:.3f}" if result["top1_accuracy"] is not None else "n/a"
+            latency = f"{result['latency_ms_p50']:.3f}" if result["latency_ms_p50"] is not None else "n/a"
+            print(f"   {name:<8} {result['size_kb']:>7.1f}KB {latency:>12} {accuracy:>7}")
+        
+        with open(self.output_dir / f"{model_type}_export_report.json", 'w') as f:
+            json.dump(report, f, indent=2)
+        return report
+    
+    def sweep_classifier(self, model_type, candidates, epochs=None, results_path=None):
+        """Train, export and measure a classifier for each (input size, architecture name) candidate.
+
+        Each candidate is exported as float16 TFLite to
+        <output_dir>/sweep_<model_type>/<name>.tflite and measured on the
+        validation split: top-1 accuracy and per-crop latency in the TFLite
+        interpreter (1 thread). Results are saved after every candidate and
+        reused by the next run while the candidate's fingerprint (crops,
+        seed, shards and training settings) is unchanged, so an interrupted
+        sweep resumes. Returns (class names, [candidate results]).
+        """
+        data_dir = self.output_dir / f"{model_type}_data"
+        if not data_dir.exists():
+            print(f"❌ {model_type} data directory not found")
+            return None, []
+        
+        self._ensure_tensorflow()
+        sweep_dir = self.output_dir / f"sweep_{model_type}"
+        sweep_dir.mkdir(exist_ok=True)
+        results_path = Path(results_path) if results_path else sweep_dir / "results.json"
+        done = {}
+        if results_path.exists():
+            with open(results_path) as f:
+                done = {r["name"]: r for r in json.load(f)["candidates"] if (sweep_dir / r["file"]).exists()}
+        
+        base_config = self.classifier_config
+        class_names, results = None, []
+        try:
+            for i, (input_size, architecture) in enumerate(candidates, 1):
+                architecture = parse_architecture(architecture)
+                name = f"{architecture_name(architecture)}-{input_size}"
+                self.classifier_config = dict(base_config, input_size=input_size, architecture=architecture,
+                                              epochs=epochs or base_config["epochs"])
+                class_names, train_source, val_source = self._load_classifier_data(model_type, data_dir)
+                if not class_names or len(train_source[1]) == 0:
+                    print(f"❌ No training data found in {data_dir}")
+                    return None, []
+                fingerprint = self._sweep_fingerprint(model_type)
+                if name in done and done[name].get("fingerprint") == fingerprint:
+                    print(f"♻️  [{i}/{len(candidates)}] {name}: measured in an earlier sweep")
+                    results.append(done[name])
+                    continue
+                
+                with self.telemetry.stage(f"sweep.{model_type}.{name}"):
+                    result = self._sweep_candidate(name, class_names, train_source, val_source, sweep_dir)
+                result["fingerprint"] = fingerprint
+                results.append(result)
+                print(f"   [{i}/{len(candidates)}] {name:<24} top-1 {result['top1_accuracy']:.3f}  "
+                      f"p50 {result['latency_ms_p50']:.3f} ms/crop  {result['size_kb']:.0f}KB  "
+                      f"{result['params']} params  ({result['train_seconds']:.0f}s)")
+                
+                # One entry per name: a retrained candidate replaces its stale measurement
+                current = {r["name"] for r in results}
+                with open(results_path, 'w') as f:
+                    json.dump({"model_type": model_type, "labels": class_names,
+                               "candidates": results + [r for n, r in done.items() if n not in current]},
+                              f, indent=2)
+        finally:
+            self.classifier_config = base_config
+        return class_names, results
+    
+    def _sweep_fingerprint(self, model_type):
+        """What a sweep measurement depends on: the crops (and so the split), seed, shards and current config"""
+        params = dict(self.classifier_config, seed=self.seed, use_shards=self.use_shards)
+        return stage_key(f"sweep_{model_type}", self.catalog(model_type).crop_hashes(model_type), params, None)
+    
+    def _sweep_candidate(self, name, class_names, train_source, val_source, sweep_dir):
+        """Train one sweep candidate with the current classifier_config, export and measure it"""
+        input_size = self.classifier_config["input_size"]
+        num_classes = len(class_names)
+        model = self._build_classifier(num_classes, input_size)
+        
+        start = time.perf_counter()
+        history = model.fit(
+            self._make_dataset(train_source, num_classes, training=True, from_arrays=self.use_shards),
+            epochs=self.classifier_config["epochs"],
+            validation_data=self._make_dataset(val_source, num_classes, training=False, from_arrays=self.use_shards),
+            verbose=0,
+            callbacks=[
+                tf.keras.callbacks.EarlyStopping(patience=self.classifier_config["patience"], restore_best_weights=True),
+                tf.keras.callbacks.ReduceLROnPlateau(factor=0.5, patience=5, min_lr=1e-7)
+            ]
+        )
+        train_seconds = time.perf_counter() - start
+        
+        tflite_model = self._convert_float16(self._export_float32(model, num_classes, input_size))
+        path = sweep_dir / f"{name}.tflite"
+        with open(path, 'wb') as f:
             f.write(tflite_model)
-            
-        print(f"✓ {model_type} classifier exported to TFLite")
+        
+        images, labels = self._validation_arrays(val_source, num_classes)
+        return {
+            "name": name,
+            "file": path.name,
+            "input_size": input_size,
+            "architecture": architecture_name(self.classifier_config["architecture"]),
+            "params": int(model.count_params()),
+            "epochs": len(history.history["loss"]),
+            "epochs_limit": self.classifier_config["epochs"],
+            "train_seconds": round(train_seconds, 1),
+            **self._evaluate_tflite(tflite_model, images, labels)
+        }
+    
+    def adopt_classifier(self, model_type, tflite_path, labels, input_size, architecture):
+        """Install a classifier trained elsewhere (e.g. a sweep candidate) as <model_type>.tflite.
+
+        Its labels and input size are saved and written into config.json;
+        an existing config keeps its other entries and thresholds.
+        """
+        shutil.copyfile(tflite_path, self.output_dir / f"{model_type}.tflite")
+        self._save_labels(model_type, labels, input_size, parse_architecture(architecture))
+        
+        if not self._update_config_entry(model_type, file=f"{model_type}.tflite", labels=list(labels),
+                                         inputSize=input_size):
+            return self.create_config()
+        print(f"✓ {model_type}.tflite and config.json updated: {architecture} at {input_size}x{input_size}")
         return True
     
-    def create_config(self):
-        """Create config.json for the trained models"""
+    def compare_input_pipelines(self, model_type, epochs=1):
+        """Time training epochs with ImageDataGenerator vs the tf.data pipeline.
+
+        Both runs use a fresh model on the same class tree. Results are
+        printed and saved to <model_type>_input_pipeline.json.
+        """
+        data_dir = self.output_dir / f"{model_type}_data"
+        if not data_dir.exists():
+            print(f"❌ {model_type} data directory not found")
+            return None
+        
+        self._ensure_tensorflow()
+        input_size = self.classifier_config["input_size"]
+        batch_size = self.classifier_config["batch_size"]
+        class_names, train_source, val_source = self._load_classifier_data(model_type, data_dir)
+        if not class_names:
+            print(f"❌ No training data found in {data_dir}")
+            return None
+        num_classes = len(class_names)
+        
+        def time_fit(dataset, steps=None):
+            model = self._build_classifier(num_classes, input_size)
+            start = time.perf_counter()
+            model.fit(dataset, epochs=epochs, steps_per_epoch=steps, verbose=0)
+            return (time.perf_counter() - start) / epochs
+        
+        results = {"model_type": model_type, "epochs": epochs, "batch_size": batch_size}
+        
+        legacy_cls = getattr(tf.keras.preprocessing.image, "ImageDataGenerator", None)
+        if legacy_cls is not None and not self.use_shards:
+            augmentation = self._build_augmentation()
+            legacy = legacy_cls(preprocessing_function=augmentation, rescale=1./255, validation_split=0.2)
+            generator = legacy.flow_from_directory(
+                str(data_dir), target_size=(input_size, input_size), batch_size=batch_size,
+                class_mode='categorical', subset='training'
+            )
+            results["image_data_generator_epoch_s"] = time_fit(generator, len(generator))
+        else:
+            print("⚠️  ImageDataGenerator unavailable (or shards in use); timing tf.data only")
+        
+        dataset = self._make_dataset(train_source, num_classes, training=True, from_arrays=self.use_shards)
+        # First epoch fills the decode cache; time the steady state as well
+        results["tf_data_first_epoch_s"] = time_fit(dataset)
+        results["tf_data_epoch_s"] = time_fit(dataset)
+        
+        print(f"⏱️  {model_type} epoch time:")
+        for key in ("image_data_generator_epoch_s", "tf_data_first_epoch_s", "tf_data_epoch_s"):
+            if key in results:
+                print(f"   {key}: {results[key]:.2f}s")
+        if "image_data_generator_epoch_s" in results and results["tf_data_epoch_s"] > 0:
+            print(f"   speedup: {results['image_data_generator_epoch_s'] / results['tf_data_epoch_s']:.1f}x")
+        
+        with open(self.output_dir / f"{model_type}_input_pipeline.json", 'w') as f:
+            json.dump(results, f, indent=2)
+        return results
+    
+    def compare_card52(self, snapshot_crops=30):
+        """Latency and accuracy of card52.tflite vs rank.tflite + suit.tflite on the same crops.
+
+        The crops are card52's validation split. rank_data/ and suit_data/
+        filled from card52_data/ hold the same crops under other names, so
+        accuracy is also reported on the crops neither rank nor suit
+        trained on. Results are printed and saved to card52_comparison.json.
+        """
+        from corner_crops import SUIT_NAMES
+        
+        missing = [f"{name}.tflite" for name in CLASSIFIER_TYPES if not (self.output_dir / f"{name}.tflite").exists()]
+        data_dir = self.output_dir / "card52_data"
+        if missing or not data_dir.exists():
+            print(f"❌ Comparison needs {', '.join(missing or ['card52_data/'])} in {self.output_dir}")
+            return None
+        
+        self._ensure_tensorflow()
+        class_names, files = self.catalog("card52").class_files("card52")
+        _, val_files = split_class_files(files, 0.2, self.seed)
+        if not val_files:
+            print(f"❌ No validation crops in {data_dir}")
+            return None
+        
+        paths = [str(data_dir / rel) for rel, _ in val_files]
+        codes = [class_names[class_id] for _, class_id in val_files]
+        images = {}
+        
+        # Crops rank or suit saw in training, under their derived names
+        crops = {kind: self.catalog(kind).crop_hashes(kind) for kind in ("rank", "suit")}
+        seen = np.zeros(len(val_files), dtype=bool)
+        for i, (rel, _) in enumerate(val_files):
+            code, name = rel.split("/", 1)
+            derived = [("rank", f"{code[:-1]}/{code}_{name}"), ("suit", f"{SUIT_NAMES.get(code[-1:], '')}/{code}_{name}")]
+            seen[i] = any(path in crops[kind] and stable_split(path, 0.8, self.seed) == "train"
+                          for kind, path in derived)
+        
+        models, predicted, latencies = {}, {}, {}
+        for name in CLASSIFIER_TYPES:
+            models[name] = (self.output_dir / f"{name}.tflite").read_bytes()
+            info = self._classifier_info(name)
+            size = info["input_size"]
+            if size not in images:
+                images[size] = np.concatenate([x.numpy() for x, _ in self._make_dataset(
+                    (paths, np.zeros(len(paths), dtype=np.int32)), 1, training=False, input_size=size)])
+            indices, latencies[name] = self._run_tflite(models[name], images[size])
+            predicted[name] = [info["labels"][i] for i in indices]
+        
+        suit_codes = {suit_name: letter for letter, suit_name in SUIT_NAMES.items()}
+        pair = [rank + suit_codes.get(suit, "?") for rank, suit in zip(predicted["rank"], predicted["suit"])]
+        
+        def accuracy(values, mask=None):
+            correct = np.array([value == code for value, code in zip(values, codes)])
+            if mask is not None:
+                correct = correct[mask]
+            return round(float(correct.mean()), 4) if len(correct) else None
+        
+        def summarize(names, values):
+            per_crop = sum(latencies[name] for name in names)
+            return {
+                "models": names,
+                "invokes_per_crop": len(names),
+                "size_kb": round(sum(len(models[name]) for name in names) / 1024, 1),
+                "latency_ms_p50": round(float(np.percentile(per_crop, 50)), 3),
+                "latency_ms_p90": round(float(np.percentile(per_crop, 90)), 3),
+                f"snapshot_ms_{snapshot_crops}_crops": round(float(np.mean(per_crop)) * snapshot_crops, 2),
+                "top1_accuracy": accuracy(values),
+                "top1_accuracy_unseen": accuracy(values, ~seen)
+            }
+        
+        report = {
+            "validation_crops": len(codes),
+            "unseen_by_rank_suit": int((~seen).sum()),
+            "card52": summarize(["card52"], predicted["card52"]),
+            "rank_suit": summarize(["rank", "suit"], pair),
+            "rank_accuracy": accuracy([p + c[-1] for p, c in zip(predicted["rank"], codes)]),
+            "suit_accuracy": accuracy([c[:-1] + suit_codes.get(p, "?") for p, c in zip(predicted["suit"], codes)])
+        }
+        
+        print(f"📊 card52 vs rank + suit on {len(codes)} card52 validation crops "
+              f"({report['unseen_by_rank_suit']} unseen by rank/suit training):")
+        print(f"   {'models':<12} {'invokes':>7} {'size':>9} {'p50 ms/crop':>12} {f'{snapshot_crops} crops ms':>13} "
+              f"{'top-1':>7} {'unseen':>7}")
+        for label, key in (("card52", "card52"), ("rank + suit", "rank_suit")):
+            r = report[key]
+            unseen = f"{r['top1_accuracy_unseen']:.3f}" if r["top1_accuracy_unseen"] is not None else "n/a"
+            print(f"   {label:<12} {r['invokes_per_crop']:>7} {r['size_kb']:>7.1f}KB {r['latency_ms_p50']:>12.3f} "
+                  f"{r[f'snapshot_ms_{snapshot_crops}_crops']:>13.2f} {r['top1_accuracy']:>7.3f} {unseen:>7}")
+        
+        with open(self.output_dir / "card52_comparison.json", 'w') as f:
+            json.dump(report, f, indent=2)
+        return report
+    
+    def create_config(self, classifiers=None):
+        """Create config.json for the trained models.
+
+        Lists the given classifiers, or every one with an exported
+        .tflite (rank and suit if none is). Labels follow each model's
+        saved class order.
+        """
+        if classifiers is None:
+            classifiers = [name for name in CLASSIFIER_TYPES if (self.output_dir / f"{name}.tflite").exists()]
+            classifiers = classifiers or ["rank", "suit"]
+        
         config = {
             "detector": {
                 "file": "detector.tflite",
                 "labels": ["card_face_up", "card_back", "pile_slot_tableau", "pile_slot_foundation"],
-                "inputSize": self.detector_config["input_size"],
+                "inputSize": self._detector_input_size(),
                 "confidenceThreshold": 0.35,
                 "nmsIoU": 0.45
-            },
-            "rank": {
-                "file": "rank.tflite",
-                "labels": ["A","2","3","4","5","6","7","8","9","10","J","Q","K"],
-                "inputSize": self.classifier_config["input_size"],
-                "confidenceThreshold": 0.6
-            },
-            "suit": {
-                "file": "suit.tflite",
-                "labels": ["clubs","diamonds","hearts","spades"],
-                "inputSize": self.classifier_config["input_size"],
-                "confidenceThreshold": 0.6
             }
         }
+        for name in classifiers:
+            info = self._classifier_info(name)
+            config[name] = {
+                "file": f"{name}.tflite",
+                "labels": info["labels"],
+                "inputSize": info["input_size"],
+                "confidenceThreshold": 0.6
+            }
         
         config_path = self.output_dir / "config.json"
         with open(config_path, 'w') as f:
             json.dump(config, f, indent=2)
             
-        print("✓ Config.json created")
+        print(f"✓ Config.json created ({', '.join(classifiers)})")
+        if "card52" in classifiers and "rank" in classifiers:
+            print("   The app uses card52 when config.json lists it; rank and suit are kept as a fallback")
         return True
     
     def run_full_training(self):
@@ -361,13 +1465,75 @@ def main():
     parser.add_argument("--output-dir", type=str, default="trained_models", help="Output directory for trained models")
     parser.add_argument("--setup", action="store_true", help="Setup training environment")
     parser.add_argument("--train-detector", action="store_true", help="Train detection model")
+    parser.add_argument("--export-detector", action="store_true",
+                        help="Re-run the int8 detector export matrix on the trained best.pt")
+    parser.add_argument("--detector-sizes", type=int, nargs="+", default=None,
+                        help="Detector input sizes to export and measure (default: 320 416 512)")
+    parser.add_argument("--detector-map-floor", type=float, default=None,
+                        help="Keep the smallest detector size with at least this mAP@0.5 (default: 0.85)")
+    parser.add_argument("--run-name", type=str, default="detector",
+                        help="Detector run under <output-dir>/models/; an interrupted run of this name is resumed")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="Start the detector run over even if it was interrupted (the old one is kept as <name>.previous)")
+    parser.add_argument("--no-image-cache", action="store_true",
+                        help="Train the detector on the full-resolution split instead of the pre-resized image cache")
     parser.add_argument("--train-rank", action="store_true", help="Train rank classifier")
     parser.add_argument("--train-suit", action="store_true", help="Train suit classifier")
+    parser.add_argument("--train-card52", action="store_true", help="Train the single 52-class card classifier")
+    parser.add_argument("--compare-card52", action="store_true",
+                        help="Compare card52 with rank + suit (latency, size, accuracy) on card52's validation crops")
+    parser.add_argument("--create-config", action="store_true",
+                        help="Write config.json for the detector and every exported classifier")
     parser.add_argument("--full-pipeline", action="store_true", help="Run complete training pipeline")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the stable train/val split")
+    parser.add_argument("--link-mode", choices=LINK_MODES, default="copy",
+                        help="How to place images: copy, hardlink, reflink, or auto (hardlink → reflink → copy)")
+    parser.add_argument("--workers", type=int, default=8, help="Threads used for hashing and copying")
+    parser.add_argument("--use-shards", action="store_true",
+                        help="Pack classifier crops into memory-mapped shards and train from them")
+    parser.add_argument("--profile", choices=list(PERFORMANCE_PROFILES), default="default",
+                        help="CPU performance profile: thread pools, XLA and bfloat16 mixed precision")
+    parser.add_argument("--threads", type=int, default=None, help="Override intra-op threads of the profile")
+    parser.add_argument("--classifier-input-size", type=int, default=64, help="Classifier input size in pixels")
+    parser.add_argument("--classifier-arch", type=str, default=DEFAULT_ARCHITECTURE,
+                        help="Classifier architecture <conv>-w<width>, e.g. separable-w0.5 (see sweep_classifiers.py)")
+    parser.add_argument("--classifier-export", choices=["float16", "int8", "both"], default="float16",
+                        help="Classifier TFLite export: float16, full-integer int8, or both (with a comparison report)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always retrain, even if inputs, settings and code match a cached stage")
+    parser.add_argument("--cache-dir", type=str, default=None,
+                        help="Stage cache directory (default: <output-dir>/.stage_cache)")
+    parser.add_argument("--cache-size-gb", type=float, default=DEFAULT_CACHE_SIZE / 1024 ** 3,
+                        help="Evict least recently used cached stages beyond this size")
+    parser.add_argument("--compare-input-pipeline", choices=CLASSIFIER_TYPES,
+                        help="Time an epoch with ImageDataGenerator vs tf.data for this classifier")
+    parser.add_argument("--telemetry", type=str, default=None,
+                        help="Append stage, epoch and input-probe timings to this JSONL run log")
+    parser.add_argument("--trace", choices=["cprofile", "tf"], default=None,
+                        help="Profile a window of training steps with cProfile or the TF profiler")
+    parser.add_argument("--trace-start", type=int, default=10, help="First step of the profiled window")
+    parser.add_argument("--trace-steps", type=int, default=20, help="Number of profiled steps")
     
     args = parser.parse_args()
+    try:
+        parse_architecture(args.classifier_arch)
+    except ValueError as e:
+        parser.error(str(e))
     
-    trainer = SolSolveTrainer(args.data_path, args.output_dir)
+    log = start_run(args.telemetry, profile=args.profile)
+    trainer = SolSolveTrainer(args.data_path, args.output_dir, seed=args.seed, link_mode=args.link_mode,
+                              workers=args.workers, use_shards=args.use_shards, profile=args.profile,
+                              threads=args.threads, classifier_export=args.classifier_export,
+                              use_cache=not args.no_cache, cache_dir=args.cache_dir,
+                              cache_size=int(args.cache_size_gb * 1024 ** 3),
+                              telemetry=log, trace=args.trace, trace_start=args.trace_start,
+                              trace_steps=args.trace_steps, input_size=args.classifier_input_size,
+                              architecture=args.classifier_arch, run_name=args.run_name,
+                              resume=not args.no_resume, image_cache=not args.no_image_cache)
+    if args.detector_sizes:
+        trainer.detector_config["export_sizes"] = args.detector_sizes
+    if args.detector_map_floor is not None:
+        trainer.detector_config["map_floor"] = args.detector_map_floor
     
     if args.setup or args.full_pipeline:
         trainer.run_full_training()
@@ -375,14 +1541,34 @@ def main():
     if args.train_detector:
         trainer.train_detector()
         
+    if args.export_detector:
+        trainer.export_detector_matrix()
+    
     if args.train_rank:
         trainer.train_classifier("rank")
         
     if args.train_suit:
         trainer.train_classifier("suit")
     
-    if not any([args.setup, args.train_detector, args.train_rank, args.train_suit, args.full_pipeline]):
+    if args.train_card52:
+        trainer.train_classifier("card52")
+    
+    if args.compare_card52:
+        trainer.compare_card52()
+    
+    if args.create_config:
+        trainer.create_config()
+    
+    if args.compare_input_pipeline:
+        trainer.compare_input_pipelines(args.compare_input_pipeline)
+    
+    if not any([args.setup, args.train_detector, args.export_detector, args.train_rank, args.train_suit, args.train_card52,
+                args.full_pipeline, args.compare_card52, args.create_config, args.compare_input_pipeline]):
         print("No training action specified. Use --help for options.")
+    
+    log.close()
+    if log:
+        print(f"📊 Telemetry appended to {log.path} (summarize with: python telemetry.py {log.path})")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+SolSolve YOLOv8 Post-processing
+
+Pure-NumPy decoding of the raw detector.tflite output ([1, 4 + nc, N],
+as exported by ultralytics):
+1. Dequantize int8/uint8 outputs
+2. Threshold on the best class score (confidenceThreshold)
+3. Convert xywh to xyxy pixels at the detector inputSize
+4. Class-aware NMS (nmsIoU) from vectorized IoU matrices
+
+NMS gives the same result as greedy NMS without a per-box Python loop:
+per class, suppression is solved as a fixed point over the "a higher-
+scoring box overlaps me" matrix, which settles after a few passes.
+
+Usage:
+    python yolo_postprocess.py --benchmark
+    python yolo_postprocess.py --benchmark --candidates 3549 --objects 40
+"""
+
+import json
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_CONFIDENCE = 0.35
+DEFAULT_NMS_IOU = 0.45
+MAX_CANDIDATES = 1024
+
+
+def load_thresholds(config_path):
+    """Return (inputSize, confidenceThreshold, nmsIoU) from a config.json"""
+    with open(config_path) as f:
+        detector = json.load(f)["detector"]
+    return (int(detector["inputSize"]),
+            float(detector.get("confidenceThreshold", DEFAULT_CONFIDENCE)),
+            float(detector.get("nmsIoU", DEFAULT_NMS_IOU)))
+
+
+def dequantize(raw, quantization=None):
+    """int8/uint8 tensor → float32 using (scale, zero_point)"""
+    if raw.dtype in (np.int8, np.uint8) and quantization and quantization[0]:
+        scale, zero_point = quantization
+        return (raw.astype(np.float32) - zero_point) * np.float32(scale)
+    return raw.astype(np.float32, copy=False)
+
+
+def box_iou_matrix(a, b):
+    """Pairwise IoU of xyxy boxes: (N, 4) x (M, 4) → (N, M)"""
+    # Contiguous coordinate columns keep the outer ops on fast paths
+    ax1, ay1, ax2, ay2 = (np.ascontiguousarray(a[:, k]) for k in range(4))
+    bx1, by1, bx2, by2 = (np.ascontiguousarray(b[:, k]) for k in range(4))
+    w = np.minimum.outer(ax2, bx2) - np.maximum.outer(ax1, bx1)
+    np.maximum(w, 0, out=w)
+    h = np.minimum.outer(ay2, by2) - np.maximum.outer(ay1, by1)
+    np.maximum(h, 0, out=h)
+    inter = w * h
+    union = np.add.outer((ax2 - ax1) * (ay2 - ay1), (bx2 - bx1) * (by2 - by1)) - inter
+    return inter / np.maximum(union, 1e-9)
+
+
+def _nms_single_class(boxes, iou_threshold):
+    """Greedy NMS for boxes sorted by descending score. Returns a keep mask"""
+    # suppresses[j, i]: higher-scoring box j overlaps lower-scoring box i
+    suppresses = np.triu(box_iou_matrix(boxes, boxes) > iou_threshold, k=1)
+    suppressed_any = suppresses.any(axis=0)
+    keep = ~suppressed_any
+    if not suppressed_any.any():
+        return keep
+
+    # Greedy NMS keeps i iff no *kept* higher box suppresses it. Iterate
+    # that rule to its fixed point; each pass fixes one more level of the
+    # suppression chain, so this settles in a handful of passes.
+    suppressors = np.flatnonzero(suppresses.any(axis=1))
+    suppresses = suppresses[suppressors]
+    for _ in range(len(boxes)):
+        updated = ~(suppresses & keep[suppressors, None]).any(axis=0)
+        if np.array_equal(updated, keep):
+            break
+        keep = updated
+    return keep
+
+
+def nms(boxes, scores, class_ids, iou_threshold=DEFAULT_NMS_IOU):
+    """Class-aware NMS. Returns indices of kept boxes, highest score first"""
+    if len(scores) == 0:
+        return np.zeros((0,), dtype=np.int64)
+    # Sort by class, then score: each class is one contiguous block and
+    # boxes of different classes never need an IoU
+    order = np.lexsort((-scores, class_ids))
+    sorted_classes = class_ids[order]
+    bounds = np.flatnonzero(np.diff(sorted_classes)) + 1
+    keep = np.concatenate([
+        _nms_single_class(boxes[block], iou_threshold)
+        for block in np.split(order, bounds)
+    ])
+    kept = order[keep]
+    return kept[np.argsort(-scores[kept], kind="stable")]
+
+
+def decode(raw, input_size, conf_threshold=DEFAULT_CONFIDENCE, iou_threshold=DEFAULT_NMS_IOU,
+           quantization=None, max_candidates=MAX_CANDIDATES):
+    """Raw YOLOv8 output → (boxes xyxy in input pixels, scores, class ids)"""
+    preds = dequantize(np.asarray(raw), quantization)
+    if preds.ndim == 3:
+        preds = preds[0]
+    # [4 + nc, N] → [N, 4 + nc]
+    if preds.shape[0] < preds.shape[1]:
+        preds = preds.T
+
+    class_scores = preds[:, 4:]
+    class_ids = np.argmax(class_scores, axis=1)
+    scores = np.take_along_axis(class_scores, class_ids[:, None], axis=1)[:, 0]
+    keep = np.flatnonzero(scores >= conf_threshold)
+    if len(keep) > max_candidates:
+        keep = keep[np.argpartition(-scores[keep], max_candidates)[:max_candidates]]
+    xywh, scores, class_ids = preds[keep, :4], scores[keep], class_ids[keep]
+    if len(scores) == 0:
+        return np.zeros((0, 4), np.float32), scores, class_ids
+
+    # Recent ultralytics exports emit coordinates normalized to [0, 1]
+    if xywh.max() <= 2.0:
+        xywh = xywh * np.float32(input_size)
+    half = xywh[:, 2:] / 2
+    boxes = np.concatenate([xywh[:, :2] - half, xywh[:, :2] + half], axis=1)
+
+    kept = nms(boxes, scores, class_ids, iou_threshold)
+    return boxes[kept], scores[kept], class_ids[kept]
+
+
+def _greedy_nms_reference(boxes, scores, class_ids, iou_threshold):
+    """Textbook per-box greedy NMS, used to check the vectorized version"""
+    order = list(np.argsort(-scores, kind="stable"))
+    kept = []
+    while order:
+        i = order.pop(0)
+        kept.append(i)
+        ious = box_iou_matrix(boxes[i:i + 1], boxes[order])[0] if order else []
+        order = [j for j, iou in zip(order, ious) if not (iou > iou_threshold and class_ids[j] == class_ids[i])]
+    return np.array(kept, dtype=np.int64)
+
+
+def synthetic_output(candidates=3549, objects=40, per_object=8, num_classes=4, input_size=416, seed=0):
+    """A [1, 4 + nc, N] output with clusters of overlapping hits per object"""
+    rng = np.random.default_rng(seed)
+    preds = np.zeros((4 + num_classes, candidates), dtype=np.float32)
+    preds[:2] = rng.random((2, candidates))
+    preds[2:4] = rng.uniform(0.02, 0.1, (2, candidates))
+    preds[4:] = rng.random((num_classes, candidates)) * 0.3
+
+    centers = rng.uniform(0.1, 0.9, (objects, 2))
+    sizes = rng.uniform(0.05, 0.15, (objects, 2))
+    hits = rng.choice(candidates, objects * per_object, replace=False).reshape(objects, per_object)
+    for k in range(objects):
+        idx = hits[k]
+        preds[:2, idx] = (centers[k, :, None] + rng.normal(0, 0.005, (2, per_object)))
+        preds[2:4, idx] = (sizes[k, :, None] * rng.uniform(0.9, 1.1, (2, per_object)))
+        preds[4 + k % num_classes, idx] = rng.uniform(0.4, 0.95, per_object)
+    return preds[None]
+
+
+def benchmark(candidates=3549, objects=40, per_object=8, runs=200, input_size=416,
+              conf_threshold=DEFAULT_CONFIDENCE, iou_threshold=DEFAULT_NMS_IOU):
+    """Time decode() on a synthetic output and check NMS against greedy NMS"""
+    raw = synthetic_output(candidates, objects, per_object, input_size=input_size)
+    quant = (1.0 / 255, -128)
+    raw_int8 = np.clip(np.round(raw / quant[0] + quant[1]), -128, 127).astype(np.int8)
+
+    results = {}
+    for name, tensor, q in (("float32", raw, None), ("int8", raw_int8, quant)):
+        decode(tensor, input_size, conf_threshold, iou_threshold, q)
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            boxes, scores, class_ids = decode(tensor, input_size, conf_threshold, iou_threshold, q)
+            times.append((time.perf_counter() - start) * 1000)
+        results[name] = (np.percentile(times, 50), np.percentile(times, 99), len(scores))
+
+    # Verify against the textbook implementation on the same candidates
+    preds = raw[0].T
+    scores = preds[:, 4:].max(axis=1)
+    mask = scores >= conf_threshold
+    xywh = preds[mask, :4] * input_size
+    boxes = np.concatenate([xywh[:, :2] - xywh[:, 2:] / 2, xywh[:, :2] + xywh[:, 2:] / 2], axis=1)
+    class_ids = preds[mask, 4:].argmax(axis=1)
+    fast = nms(boxes, scores[mask], class_ids, iou_threshold)
+    reference = _greedy_nms_reference(boxes, scores[mask], class_ids, iou_threshold)
+    matches = set(fast.tolist()) == set(reference.tolist())
+
+    print(f"⏱️  decode + NMS, {candidates} candidates ({int(mask.sum())} above {conf_threshold}), {runs} runs:")
+    for name, (p50, p99, kept) in results.items():
+        print(f"   {name:<8} p50 {p50:.3f} ms, p99 {p99:.3f} ms, {kept} boxes kept")
+    print(f"   matches greedy NMS: {'yes' if matches else 'NO'}")
+    return results, matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SolSolve YOLOv8 output decoding")
+    parser.add_argument("--benchmark", action="store_true", help="Run the decode/NMS micro-benchmark")
+    parser.add_argument("--config", type=str, default=None, help="config.json to read thresholds from")
+    parser.add_argument("--candidates", type=int, default=3549, help="Raw candidate boxes (3549 at 416px)")
+    parser.add_argument("--objects", type=int, default=40, help="Objects in the synthetic output")
+    parser.add_argument("--per-object", type=int, default=8, help="Overlapping hits per object")
+    parser.add_argument("--runs", type=int, default=200, help="Timed runs")
+
+    args = parser.parse_args()
+
+    input_size, conf, iou = 416, DEFAULT_CONFIDENCE, DEFAULT_NMS_IOU
+    if args.config:
+        input_size, conf, iou = load_thresholds(Path(args.config))
+
+    if args.benchmark:
+        benchmark(args.candidates, args.objects, args.per_object, args.runs, input_size, conf, iou)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()